@@ -11,7 +11,8 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
-from data import load_won_deal, load_retention, load_all_deal
+from data import load_deal_facts, render_refresh_notice, data_version
+from shared_frame import share
 from config import PART_STRUCTURE
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -31,21 +32,16 @@ FMT_LABELS = [
 ]
 ROW_ORDER = ["전체", *FMT_LABELS, "기타", "미기재"]
 
-# 생성 기준(출강 전용)에서 사용할 성사 가능성 맵
-STAT_MAP = {
-    "확정": "확정",
-    "높음": "높음",
-    "낮음": "낮음",
-    "LOW":  "낮음",
-    "LOST": "LOST",
-    "LOST/중단": "LOST",
-}
-
 DETAIL_COLS_ORDER = [
     "생성 날짜", "기업명", "기업 규모", "이름",
     "과정포맷(대)", "카테고리(대)", "담당자_name",
     "상태", "성사 가능성", "수주 예정일(종합)", "수주 예정액(종합)"
 ]
+# 저장소에서 읽을 컬럼 (상세 표 + 필터/집계용 파생 컬럼)
+LOAD_COLS = DETAIL_COLS_ORDER + [
+    "생성년도", "생성월", "생성일", "수주예정년도", "수주예정월",
+    "팀", "is_retention", "status",
+]
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 유틸
@@ -100,87 +96,37 @@ def _format_bucket(fmt_val: str) -> str:
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 데이터 로더 (캐시)
-@st.cache_data(show_spinner=False)
-def _load_won_2025():
+# 담당자/기업명/포맷 정리, 리텐션 여부, 상태 맵은 data.load_deal_facts()에서 계산된 값을 그대로 사용
+# 파트 페이지가 여러 개라 렌더마다 사본을 만들지 않도록, 데이터 버전별 읽기 전용 공유 프레임으로 캐시
+# (아래 _show_* 는 입력을 필터한 사본만 수정한다)
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_won_2025(version: tuple):
     """상단(수주예정 기준, Won)용 데이터"""
-    won = load_won_deal().copy()
-    for c in ["수주예정년도", "수주예정월", "수주 예정액(종합)"]:
-        if c in won.columns:
-            won[c] = pd.to_numeric(won[c], errors="coerce")
-    won["담당자_name"] = won["담당자_name"].astype(str).map(_norm_name)
-    won["과정포맷(대)"] = won.get("과정포맷(대)", "").astype(str).str.strip()
-    won["기업명"] = won.get("기업명", "").astype(str).str.strip()
-
-    # 상태=Won, 2025 수주예정
-    if "상태" in won.columns:
-        won = won[won["상태"].astype(str).str.strip().str.lower() == "won"]
+    won = load_deal_facts("won", columns=LOAD_COLS, close_years=YEAR, shared=True, compact=True)
     won = won[
-        (won["수주예정년도"] == YEAR)
+        (won["상태"].astype(str).str.lower() == "won")
+        & (won["수주예정년도"] == YEAR)
         & (won["수주예정월"].between(1, 12, inclusive="both"))
-    ].copy()
-
-    # 리텐션 세트
-    ret = load_retention().copy()
-    ret_set = set(ret.get("기업명", pd.Series([], dtype=str)).astype(str).str.strip().tolist())
-    won["is_retention"] = won["기업명"].isin(ret_set)
-
-    won["수주 예정액(종합)"] = won["수주 예정액(종합)"].fillna(0.0).astype(float)
-    return won
+    ]
+    return share(won, copy=False)
 
-@st.cache_data(show_spinner=False)
-def _load_all_for_chulgang():
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_all_for_chulgang(version: tuple):
     """하단(생성년도/월 기준)용 데이터(포맷별 전용 파생에 사용)."""
-    df = load_all_deal().copy()
-    df["담당자_name"] = df.get("담당자_name", "").astype(str).map(_norm_name)
-    df["기업명"] = df.get("기업명", "").astype(str).str.strip()
-    df["기업 규모"] = df.get("기업 규모", "").astype(str).str.strip()
-    df["과정포맷(대)"] = df.get("과정포맷(대)", "").astype(str).str.strip()
-    df["카테고리(대)"] = df.get("카테고리(대)", "").astype(str).str.strip()
-    df["성사 가능성"] = df.get("성사 가능성", "").astype(str).str.strip()
-
-    # 숫자화
-    df["생성년도"] = pd.to_numeric(df.get("생성년도"), errors="coerce")
-    df["생성월"]  = pd.to_numeric(df.get("생성월"),  errors="coerce")
-    df["수주 예정액(종합)"] = pd.to_numeric(df.get("수주 예정액(종합)"), errors="coerce").fillna(0.0)
-
-    # 2025 생성, 유효 월
-    df = df[
+    df = load_deal_facts("all", columns=LOAD_COLS, years=YEAR, shared=True, compact=True)
+    return share(df[
         (df["생성년도"] == YEAR)
         & (df["생성월"].between(1, 12, inclusive="both"))
-    ].copy()
+    ], copy=False)
 
-    # 리텐션 세트
-    ret = load_retention().copy()
-    ret_set = set(ret.get("기업명", pd.Series([], dtype=str)).astype(str).str.strip().tolist())
-    df["is_retention"] = df["기업명"].isin(ret_set)
-
-    # 상태 맵
-    df["status"] = df["성사 가능성"].map(STAT_MAP).fillna("기타")
-    return df
-
-@st.cache_data(show_spinner=False)
-def _load_all_for_prob(prob_value: str):
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _load_all_for_prob(prob_value: str, version: tuple):
     """
     상단 상세용 데이터(생성년도 필터 없음).
     prob_value: '낮음' 또는 '높음'
     """
-    df = load_all_deal().copy()
-    df["담당자_name"] = df.get("담당자_name", "").astype(str).map(_norm_name)
-    df["기업명"]      = df.get("기업명",      "").astype(str).str.strip()
-    df["기업 규모"]    = df.get("기업 규모",    "").astype(str).str.strip()
-    df["과정포맷(대)"] = df.get("과정포맷(대)", "").astype(str).str.strip()
-    df["카테고리(대)"]  = df.get("카테고리(대)",  "").astype(str).str.strip()
-    df["성사 가능성"]  = df.get("성사 가능성",  "").astype(str).str.strip()
-
-    if "수주 예정일(종합)" in df.columns:
-        df["수주 예정일(종합)"] = pd.to_datetime(df["수주 예정일(종합)"], errors="coerce")
-
-    df = df[df["성사 가능성"] == prob_value].copy()
-
-    ret = load_retention().copy()
-    ret_set = set(ret.get("기업명", pd.Series([], dtype=str)).astype(str).str.strip().tolist())
-    df["is_retention"] = df["기업명"].isin(ret_set)
-    return df
+    df = load_deal_facts("all", columns=LOAD_COLS, shared=True, compact=True)
+    return share(df[df["성사 가능성"] == prob_value], copy=False)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 테이블 빌더
@@ -193,7 +139,7 @@ def _build_table_won(df: pd.DataFrame) -> pd.DataFrame:
         return out
 
     df = df.copy()
-    df["bucket"] = df["과정포맷(대)"].map(_format_bucket)
+    df["bucket"] = df["과정포맷(대)"].astype(str).map(_format_bucket)
 
     rows = []
     for kind in ROW_ORDER:
@@ -352,15 +298,17 @@ def _show_two_tables_chulgang_creation_ai(df_in: pd.DataFrame, title_prefix: str
 # 진입점
 def render_part(team_name: str, part_name: str):
     _apply_compact_layout()  # 좌우 여백 축소
+    render_refresh_notice()  # 백그라운드 재적재 중이면 안내
 
     # 멤버 수집
     members = [_norm_name(n) for n in PART_STRUCTURE[team_name][part_name]]
 
     # 데이터 적재
-    won          = _load_won_2025()
-    alldeal      = _load_all_for_chulgang()
-    alldeal_low  = _load_all_for_prob("낮음")
-    alldeal_high = _load_all_for_prob("높음")
+    version      = data_version()
+    won          = _load_won_2025(version)
+    alldeal      = _load_all_for_chulgang(version)
+    alldeal_low  = _load_all_for_prob("낮음", version)
+    alldeal_high = _load_all_for_prob("높음", version)
 
     # ─────────── 상위 탭: ['전체', '낮음높음', <개별 이름들>...] ───────────
     top_tabs = st.tabs(["전체", "낮음높음", *members])
@@ -0,0 +1,181 @@
+# calendar_dim.py
+"""
+공통 달력 차원 (일 → ISO 주 / 한국 기준 주 라벨 / 월 / 분기 / 영업일)
+────────────────────────────────────────
+· CAL_START ~ CAL_END(기본 2020-01-01 ~ 2030-12-31, DEALS_CALENDAR_START/END로 조정)를
+  일자당 한 행으로 프로세스에서 1회 계산해 읽기 전용(SharedFrame)으로 캐시
+· 날짜 → 정수 일 오프셋만 구하면 주/월/분기 버킷은 배열 인덱싱 (행마다 Timestamp 계산 없음)
+· 주는 월~일, '오늘'은 한국 시간(Asia/Seoul) 기준. 영업일 = 월~금 (holidays 패키지가 있으면 한국 공휴일 제외)
+· 사용 법:   from calendar_dim import calendar, day_pos, lookup, week_window, month_overlap_days
+             cal = calendar()                        # index=date, 컬럼은 CAL_COLUMNS
+             s_idx = day_pos(df["시작"], START)       # START 기준 일 오프셋 (Int64, NaT → <NA>)
+             df["분기"] = lookup(df["체결일"], "quarter_label")
+             starts, ends, labels = week_window()    # 금주 기준 앞뒤 4주 (월~일)
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from shared_frame import share
+
+try:
+    import holidays as _holidays
+except Exception:  # pragma: no cover - holidays 없으면 주말만 비영업일
+    _holidays = None
+
+KST = ZoneInfo("Asia/Seoul")
+CAL_START = pd.Timestamp(os.getenv("DEALS_CALENDAR_START", "2020-01-01"))
+CAL_END = pd.Timestamp(os.getenv("DEALS_CALENDAR_END", "2030-12-31"))
+
+CAL_COLUMNS = [
+    "pos",              # CAL_START 기준 일 오프셋 (int32)
+    "year", "month", "day", "weekday",   # weekday: 월=0 … 일=6
+    "iso_year", "iso_week",
+    "week_start",       # 그 주 월요일
+    "week_idx",         # CAL_START가 속한 주 기준 주 번호
+    "week_label",       # "YYYY-MM-DD ~ MM-DD" (월~일, 리소스 페이지 주간 표 형식)
+    "month_key",        # YYYYMM (int)
+    "month_label",      # "YYYY-MM"
+    "quarter",          # 1~4
+    "quarter_key",      # YYYYQ (int, 예: 20251)
+    "quarter_label",    # "YYYYQn" (Period("Q") 문자열과 동일)
+    "is_business_day",
+]
+
+
+def today_kst() -> pd.Timestamp:
+    """한국 시간 기준 오늘 (시각 없는 Timestamp)."""
+    return pd.Timestamp(datetime.now(KST).date())
+
+
+def _holiday_dates(start: pd.Timestamp, end: pd.Timestamp) -> np.ndarray:
+    if _holidays is None:
+        return np.array([], dtype="datetime64[D]")
+    kr = _holidays.country_holidays("KR", years=range(start.year, end.year + 1))
+    return np.array(sorted(kr), dtype="datetime64[D]")
+
+
+@functools.lru_cache(maxsize=4)
+def _build(start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    idx = pd.date_range(start, end, freq="D", name="date")
+    days = idx.values.astype("datetime64[D]")
+    iso = idx.isocalendar()
+    weekday = idx.weekday.to_numpy()
+    week_start = idx - pd.to_timedelta(weekday, unit="D")
+    year, month, quarter = idx.year.to_numpy(), idx.month.to_numpy(), idx.quarter.to_numpy()
+
+    # 라벨은 주/월/분기 단위로 한 번씩만 포맷해 펼친다
+    ws_codes, ws_uniq = pd.factorize(week_start)
+    we_uniq = ws_uniq + pd.Timedelta(days=6)
+    week_labels = np.array([f"{a:%Y-%m-%d} ~ {b:%m-%d}" for a, b in zip(ws_uniq, we_uniq)], dtype=object)
+    month_key = year * 100 + month
+    mk_codes, mk_uniq = pd.factorize(month_key)
+    month_labels = np.array([f"{k // 100:04d}-{k % 100:02d}" for k in mk_uniq], dtype=object)
+    quarter_key = year * 10 + quarter
+    qk_codes, qk_uniq = pd.factorize(quarter_key)
+    quarter_labels = np.array([f"{k // 10:04d}Q{k % 10}" for k in qk_uniq], dtype=object)
+
+    cal = pd.DataFrame({
+        "pos": np.arange(len(idx), dtype=np.int32),
+        "year": year.astype(np.int16),
+        "month": month.astype(np.int8),
+        "day": idx.day.to_numpy().astype(np.int8),
+        "weekday": weekday.astype(np.int8),
+        "iso_year": iso["year"].to_numpy().astype(np.int16),
+        "iso_week": iso["week"].to_numpy().astype(np.int8),
+        "week_start": week_start,
+        "week_idx": ((week_start - week_start[0]).days // 7).to_numpy().astype(np.int32),
+        "week_label": week_labels[ws_codes],
+        "month_key": month_key.astype(np.int32),
+        "month_label": month_labels[mk_codes],
+        "quarter": quarter.astype(np.int8),
+        "quarter_key": quarter_key.astype(np.int32),
+        "quarter_label": quarter_labels[qk_codes],
+        "is_business_day": (weekday < 5) & ~np.isin(days, _holiday_dates(start, end)),
+    }, index=idx)
+    return share(cal, copy=False)
+
+
+def calendar(start=None, end=None) -> pd.DataFrame:
+    """
+    일자별 달력 차원 (index=date, 컬럼 CAL_COLUMNS). 읽기 전용 공유 프레임이므로
+    수정이 필요하면 .copy(). 범위를 주지 않으면 CAL_START ~ CAL_END.
+    """
+    return _build(pd.Timestamp(start or CAL_START).normalize(),
+                  pd.Timestamp(end or CAL_END).normalize())
+
+
+def _days(dates) -> tuple[np.ndarray, np.ndarray]:
+    """날짜들 → (1970-01-01 기준 일수 int64, 유효 마스크). 시각은 버림."""
+    arr = pd.to_datetime(pd.Series(dates) if np.ndim(dates) else pd.Series([dates]),
+                         errors="coerce").to_numpy(dtype="datetime64[D]")
+    valid = ~np.isnat(arr)
+    return np.where(valid, arr.astype(np.int64), 0), valid
+
+
+def _epoch_day(ts) -> int:
+    return int(np.datetime64(pd.Timestamp(ts).normalize(), "D").astype(np.int64))
+
+
+def day_pos(dates, origin=None) -> pd.arrays.IntegerArray:
+    """origin(기본 CAL_START) 기준 정수 일 오프셋 (Int64, NaT → <NA>). origin 이전 날짜는 음수."""
+    days, valid = _days(dates)
+    out = pd.array(days - _epoch_day(origin or CAL_START), dtype="Int64")
+    out[~valid] = pd.NA
+    return out
+
+
+def lookup(dates, field: str) -> pd.Series:
+    """날짜들의 달력 속성 (범위 밖·NaT는 결측). Series를 주면 같은 index로 돌려준다."""
+    cal = calendar()
+    days, valid = _days(dates)
+    pos = days - _epoch_day(cal.index[0])
+    valid &= (pos >= 0) & (pos < len(cal))
+    col = cal[field]
+    values = pd.Series(col.to_numpy()[np.where(valid, pos, 0)], dtype=col.dtype).where(valid)
+    if isinstance(dates, pd.Series):
+        values.index = dates.index
+    return values
+
+
+def week_window(before: int = 4, after: int = 4, today=None):
+    """금주(월~일, 한국 기준)를 가운데 두고 앞뒤 주 → (주 시작 목록, 주 끝 목록, 라벨 목록)."""
+    t = pd.Timestamp(today).normalize() if today is not None else today_kst()
+    w0 = t - pd.Timedelta(days=t.weekday())
+    starts = [w0 + pd.Timedelta(weeks=k) for k in range(-before, after + 1)]
+    ends = [ws + pd.Timedelta(days=6) for ws in starts]
+    labels = lookup(pd.Series(starts), "week_label")
+    labels = [lab if isinstance(lab, str) else f"{ws:%Y-%m-%d} ~ {we:%m-%d}"   # 달력 범위 밖
+              for lab, ws, we in zip(labels, starts, ends)]
+    return starts, ends, labels
+
+
+@functools.lru_cache(maxsize=32)
+def _month_bounds(year: int) -> tuple[np.ndarray, np.ndarray]:
+    cal = calendar()
+    rows = cal[cal["year"] == year]
+    if rows["month"].nunique() != 12:
+        raise ValueError(f"{year}년이 달력 범위({cal.index[0]:%Y-%m-%d} ~ {cal.index[-1]:%Y-%m-%d}) 밖입니다. "
+                         "DEALS_CALENDAR_START/END를 확인하세요.")
+    base = _epoch_day(cal.index[0])
+    grp = rows.groupby("month")["pos"]
+    return grp.min().to_numpy(np.int64) + base, grp.max().to_numpy(np.int64) + base
+
+
+def month_overlap_days(starts, ends, year: int) -> np.ndarray:
+    """
+    기간 [start, end]가 year의 각 월과 겹치는 일수 → (행 수, 12) int 배열.
+    NaT이거나 start > end면 0.
+    """
+    s, s_ok = _days(starts)
+    e, e_ok = _days(ends)
+    first, last = _month_bounds(int(year))
+    days = np.minimum(e[:, None], last) - np.maximum(s[:, None], first) + 1
+    return np.where((s_ok & e_ok)[:, None], days.clip(min=0), 0)
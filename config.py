@@ -73,6 +73,18 @@ NAME2PART[name_key] = "기업교육그룹장"
 # 팀 목록
 TEAMS = list(TEAM_RAW.keys())
 
+# ────────── 딜 상태 ──────────
+
+# 성사 가능성 → 체결률 집계용 상태 (매핑 밖의 값은 '기타')
+STAT_MAP = {
+    '확정': '확정',
+    '높음': '높음',
+    '낮음': '낮음',
+    'LOW': '낮음',
+    'LOST': 'LOST',
+    'LOST/중단': 'LOST',
+}
+
 # ────────── 헬퍼 함수 ──────────
 
 def get_team_members(team_name: str) -> list[str]:
@@ -1,233 +1,142 @@
 # data.py
 """
-TXT ↔ SQLite 로드 + Streamlit 로더
+Streamlit 로더 (data_core 위의 얇은 어댑터)
 ────────────────────────────────────────
-· TXT 수정 → data.py import 시 자동 DB 재생성 & 캐시 무효화
+· 적재·세대 교체·변경 감시·저장소 읽기는 모두 data_core (Streamlit 없이 동작, 배치/CLI는 그쪽을 직접 사용)
+· 여기서는 data_core.read 결과를 st.cache_data(호출마다 사본) / st.cache_resource(shared=True)로
+  캐시하고, 페이지용 안내(render_refresh_notice)만 더한다
+· TXT 수정 → 감시 스레드가 감지해 백그라운드에서 새 세대(DB 사본 + 스냅샷)로 재적재 후 한 번에 교체,
+  그동안은 이전 세대를 서빙 (최초 실행만 동기 적재). 로더 호출 경로에는 stat이 없다
 · 사용 법:   from data import (
-      load_all_deal, load_won_deal, load_retention, load_accounting
+      load_all_deal, load_won_deal, load_retention, load_accounting,
+      load_deal_facts,        # 담당자/팀/리텐션/상태가 정규화된 공통 팩트
+      render_refresh_notice,  # 페이지 상단 '데이터 갱신 중' 안내
+      load_deal_cube,         # 적재 시 미리 집계한 월별 건수/금액 큐브
+      cube_monthly,           # 큐브 → 월별 전체/확정+높음/낮음/LOST 건수·금액 (체결률 표)
+      get_deals_by_company, get_deals_by_course, get_deals_by_id,   # 키 조회 (일치하는 행만)
+      data_version,           # 페이지 자체 캐시의 키 (재적재되면 바뀜)
+      reload_now,             # 배포 직후 즉시 재확인 (감시 이벤트를 기다리지 않음)
   )
+  load_all_deal(columns=[...]) 처럼 필요한 컬럼만 읽을 수 있다 (컬럼 조합별 캐시)
+  load_all_deal(shared=True) 는 사본 없이 프로세스 공유 읽기 전용 프레임을 돌려준다
+  load_all_deal(compact=True) 는 문자열 컬럼을 category / Arrow 문자열로 (memory_report() 참고)
+· 배포 시 사전 적재:  python -m data prepare [--check]   (data_core.main과 같음)
 """
 
-import pathlib, sys, sqlite3, re, os
+import sys
+
 import pandas as pd
 import streamlit as st
 
-# ─────────────────────────── TXT → DB
-BASE = pathlib.Path(__file__).parent
-FILES = {
-    "all_deal":   BASE / "all deal.txt",
-    "won_deal":   BASE / "won deal.txt",
-    "retention":  BASE / "retention corp.txt",
-    "accounting": BASE / "accounting data.txt",
-}
-DB = "deals.db"
-
-SCHEMA_SQL = """
-PRAGMA journal_mode=WAL;
-PRAGMA synchronous=NORMAL;
-DROP INDEX IF EXISTS idx_all_deal_name;
-DROP INDEX IF EXISTS idx_won_deal_name;
-CREATE INDEX IF NOT EXISTS idx_all_deal_name ON all_deal ("담당자_name");
-CREATE INDEX IF NOT EXISTS idx_won_deal_name ON won_deal ("담당자_name");
-"""
+import data_core as core
+from data_core import (  # noqa: F401 (재노출)
+    FILES, FILTER_COLS, CUBES, CUBE_DIMS, CUBE_FILTER_COLS, FACT_TABLES, LAST_BUILD,
+    SHARED_MAX_ENTRIES, LOOKUP_MAX_ENTRIES,
+    load_to_db, build_report, rejection_report, memory_report, cube_monthly,
+    reload_now, data_refreshing,
+    share, SharedFrame, SharedFrameMutationError,
+)
 
-def _read_txt(path: pathlib.Path) -> pd.DataFrame:
-    return pd.read_csv(path, sep="\t").dropna(how="all")
 
-# ─────────────────────────── accounting 전용 전처리
-def _pre_accounting(df_raw: pd.DataFrame) -> pd.DataFrame:
+# ─────────────────────────── 캐시 (Streamlit)
+# st.cache_data는 호출마다 사본을 역직렬화한다. shared=True면 데이터 버전·컬럼·필터 조합마다
+# 프로세스에 하나만 만들어 모든 세션이 같은 SharedFrame을 읽는다 (제자리 수정 시 예외).
+@st.cache_data
+def _load(name: str, sig: tuple, columns: tuple | None = None, where: tuple = (),
+          compact: bool = False) -> pd.DataFrame:
+    return core.read(name, sig, columns, where, compact)
+
+@st.cache_resource(max_entries=SHARED_MAX_ENTRIES, show_spinner=False)
+def _shared(name: str, sig: tuple, columns: tuple | None = None,
+            where: tuple = (), compact: bool = False) -> SharedFrame:
+    return share(core.read(name, sig, columns, where, compact), copy=False)
+
+@st.cache_data(max_entries=LOOKUP_MAX_ENTRIES)
+def _load_keys(table: str, sig: tuple, col: str, keys: tuple,
+               columns: tuple | None = None) -> pd.DataFrame:
+    return core.read_keys(table, sig, col, keys, columns)
+
+def _frame(name: str, columns, where: tuple, compact: bool, shared: bool) -> pd.DataFrame:
+    loader = _shared if shared else _load
+    return loader(name, core.signature(), core.normalize_columns(columns), where, compact)
+
+def _lookup(by: str, values, kind: str, columns) -> pd.DataFrame:
+    table, col, keys, columns = core.lookup_args(by, values, kind, columns)
+    return _load_keys(table, core.signature(), col, keys, columns)
+
+# ─────────────────────────── 사용자 API
+# columns=[...]: 필요한 컬럼만 저장소에서 읽는다 (없는 컬럼은 무시, 컬럼 조합별로 따로 캐시)
+# 딜 로더 필터(저장소 단계 적용, 일치하는 행만 읽음. 스칼라 또는 리스트):
+#   years=생성년도, close_years=수주예정년도, status=상태, customer_type=고객사 유형,
+#   owners=담당자_name, formats=과정포맷(대)
+# shared=True:  호출마다 사본 대신 프로세스 공유 읽기 전용 프레임 (수정하려면 .copy())
+# compact=True: 문자열 컬럼을 category(스키마 categories) / Arrow 문자열로 (==, isin 그대로 동작,
+#               category 컬럼에 새 값 대입·fillna(새 값)는 astype(str) 후에)
+def load_all_deal(columns: list[str] | None = None, shared: bool = False,
+                  compact: bool = False, **filters) -> pd.DataFrame:
+    return _frame("all_deal", columns, core.build_where(filters), compact, shared)
+
+def load_won_deal(columns: list[str] | None = None, shared: bool = False,
+                  compact: bool = False, **filters) -> pd.DataFrame:
+    return _frame("won_deal", columns, core.build_where(filters), compact, shared)
+
+def load_retention(columns: list[str] | None = None, shared: bool = False,
+                   compact: bool = False) -> pd.DataFrame:
+    return _frame("retention", columns, (), compact, shared)
+
+def load_accounting(columns: list[str] | None = None, shared: bool = False,
+                    compact: bool = False) -> pd.DataFrame:
+    return _frame("accounting", columns, (), compact, shared)
+
+def data_version() -> tuple:
+    """서빙 중인 데이터 버전. 페이지에서 파생 결과를 직접 캐시할 때 키로 쓴다."""
+    return core.signature()
+
+def render_refresh_notice() -> None:
     """
-    accounting data.txt를 DB에 넣기 전에 컬럼/타입/파생값을 표준화합니다.
-    - 헤더 공백/한글 BOM 제거 및 통일
-    - 금액/일수 등 숫자형 변환(음수 기호 보존, 단독 하이픈만 결측→0)
-    - 날짜형 변환
-    - '매출집계월' → 집계년/집계월/월초 파생
-    - '코스 ID' 별칭, 표준 수강 시작/종료 파생
-    - '사업 구분' 별칭, '포맷' 보장
-    - 교육과정명 '(B2B_SMB)' 포함 행 제외
+    재적재 중이면 페이지 상단에 안내를 띄운다. 페이지 본문(캐시 함수 밖)에서 호출.
+    (st.cache_data 함수 안에서 st 요소를 그리면 캐시 재생 시 오류가 나므로 로더와 분리)
     """
-    df = df_raw.copy()
-
-    # 1) 헤더 정리
-    clean_cols = []
-    for c in df.columns:
-        cc = str(c).replace("\ufeff", "").strip()
-        cc = re.sub(r"\s+", "", cc)
-        clean_cols.append(cc)
-    df.columns = clean_cols
-
-    # 2) 스키마 통일
-    keep_order = [
-        "매출집계월","결제일자","코스ID","계약금액","금액검증","사업구분","교육과정명",
-        "카테고리","포맷","코스개강일","코스개강일2","코스종강일","수익인식방법","코스일수","일수당결제금액"
-    ]
-    for k in keep_order:
-        if k not in df.columns:
-            df[k] = pd.NA
-    df = df[keep_order]
-
-    # 3) 숫자형 변환(음수 기호 보존)
-    def _to_num(s: pd.Series) -> pd.Series:
-        x = (
-            s.astype(str)
-             .str.replace(",", "", regex=False)
-             .str.replace(" ", "", regex=False)
-             .str.replace(r"[−–—]", "-", regex=True)
-             .str.strip()
-        )
-        x = x.replace({"": pd.NA})
-        x = x.where(~x.isin({"-", "--"}), pd.NA)
-        return pd.to_numeric(x, errors="coerce").fillna(0)
-
-    df["계약금액"] = _to_num(df["계약금액"])
-    df["코스일수"] = _to_num(df["코스일수"]).astype("Int64")
-    df["일수당결제금액"] = _to_num(df["일수당결제금액"])
-
-    # 4) 불리언
-    df["금액검증"] = (
-        df["금액검증"].astype(str).str.strip().str.upper().map({"TRUE": True, "FALSE": False})
-    ).fillna(False)
-
-    # 5) 날짜
-    for dcol in ["결제일자","코스개강일","코스개강일2","코스종강일"]:
-        df[dcol] = pd.to_datetime(df[dcol], errors="coerce")
-
-    # 6) 매출집계월 파싱
-    def _parse_kr_month(x):
-        s = str(x)
-        m = re.search(r"(\d{2,4})\s*년\s*(\d{1,2})\s*월", s)
-        if not m:
-            return pd.Series([pd.NA, pd.NA, pd.NaT], index=["집계년","집계월","집계월_월초"])
-        y = int(m.group(1))
-        if y < 100:
-            y += 2000
-        mm = int(m.group(2))
-        return pd.Series([y, mm, pd.Timestamp(year=y, month=mm, day=1)], index=["집계년","집계월","집계월_월초"])
-
-    extra = df["매출집계월"].apply(_parse_kr_month)
-    df = pd.concat([df, extra], axis=1)
-
-    # 7) 키/수강일 파생
-    df["코스ID"] = pd.to_numeric(df["코스ID"], errors="coerce")
-    df["코스 ID"] = df["코스ID"].astype("Int64")
-    df["코스 ID(str)"] = df["코스 ID"].astype(str)
-    df["수강시작일"] = df["코스개강일2"].combine_first(df["코스개강일"])
-    df["수강종료일"] = df["코스종강일"]
-
-    # 8) 별칭/포맷 보장
-    df["사업 구분"] = df["사업구분"]
-    if "포맷" not in df.columns:
-        df["포맷"] = pd.NA
-
-    # 9) 교육과정명 필터
-    df = df[~df["교육과정명"].astype(str).str.contains("(B2B_SMB)", regex=False, na=False)]
-
-    # 10) 표시용 별칭
-    df["코스 개강일2"] = df["코스개강일2"]
-    df["코스 종강일"] = df["코스종강일"]
-
-    return df
-
-def load_to_db() -> None:
-    con = sqlite3.connect(DB)
-    try:
-        for table, txt in FILES.items():
-            if not txt.exists():
-                sys.stderr.write(f"[WARN] {txt} not found – skip\n")
-                continue
-            df = _read_txt(txt)
-            if table == "accounting":
-                df = _pre_accounting(df)
-            df.to_sql(table, con, if_exists="replace", index=False)
-
-        # 인덱스
-        con.executescript(SCHEMA_SQL)
-        try:
-            con.execute('CREATE INDEX IF NOT EXISTS idx_acc_course ON accounting ("코스 ID")')
-            con.execute('CREATE INDEX IF NOT EXISTS idx_acc_month  ON accounting ("집계년","집계월")')
-        except sqlite3.OperationalError:
-            pass
-
-        con.commit()
-    finally:
-        con.close()
-
-# ─────────────────────────── 캐시 Key (TXT mtime + 코드 변경)
-CODE_SIG = "acc-num-sign-fix-2025-09-10"  # 로직 바꿀 때마다 문자열 변경
-
-def _files_sig() -> tuple:
-    txt_mtimes = tuple(int(os.path.getmtime(p)) if p.exists() else 0 for p in FILES.values())
-    code_mtime = int(os.path.getmtime(__file__))
-    return txt_mtimes + (code_mtime, hash(CODE_SIG))
-
-# ─────────────────────────── SQLite 연결 (자동 최신화)
-@st.cache_resource
-def _conn(sig: tuple) -> sqlite3.Connection:
-    load_to_db()
-    return sqlite3.connect(DB, check_same_thread=False)
-
-# ─────────────────────────── 공통 후처리
-def _post(df: pd.DataFrame) -> pd.DataFrame:
-    if "담당자_name" in df.columns:
-        df["담당자_name"] = df["담당자_name"].str.replace(r"B$", "", regex=True)
-    if "수주 예정액(종합)" in df.columns:
-        df["수주 예정액(종합)"] = pd.to_numeric(
-            df["수주 예정액(종합)"].astype(str).str.replace(",", ""), errors="coerce"
-        ).fillna(0)
-    for col in ["생성년도","생성월","수주예정년도","수주예정월"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    return df
-
-def _post_won(df: pd.DataFrame) -> pd.DataFrame:
-    df = _post(df)
-    if "이름" in df.columns:
-        df = df[~df["이름"].astype(str).str.contains("[비매출입과]", regex=False, na=False)]
-    return df
-
-def _sig() -> tuple:
-    return _files_sig()
-
-@st.cache_data
-def _load_all(sig: tuple) -> pd.DataFrame:
-    return _post(pd.read_sql_query("SELECT * FROM all_deal", _conn(sig)))
-
-@st.cache_data
-def _load_won(sig: tuple) -> pd.DataFrame:
-    return _post_won(pd.read_sql_query("SELECT * FROM won_deal", _conn(sig)))
+    core.signature()
+    if data_refreshing():
+        st.caption("🔄 데이터 갱신 중입니다. 완료될 때까지 이전 데이터로 표시됩니다.")
 
-@st.cache_data
-def _load_ret(sig: tuple) -> pd.DataFrame:
-    return pd.read_sql_query("SELECT * FROM retention", _conn(sig))
-
-def _post_accounting(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    for d in ["결제일자","코스개강일","코스개강일2","코스종강일","수강시작일","수강종료일","집계월_월초","코스 개강일2","코스 종강일"]:
-        if d in out.columns:
-            out[d] = pd.to_datetime(out[d], errors="coerce")
-    for n in ["계약금액","일수당결제금액","코스ID","코스 ID"]:
-        if n in out.columns:
-            out[n] = pd.to_numeric(out[n], errors="coerce")
-    if "사업구분" in out.columns and "사업 구분" not in out.columns:
-        out["사업 구분"] = out["사업구분"]
-    if "포맷" not in out.columns:
-        out["포맷"] = pd.NA
-    return out
+def load_deal_facts(kind: str = "all", columns: list[str] | None = None,
+                    shared: bool = False, compact: bool = False, **filters) -> pd.DataFrame:
+    """
+    정규화된 딜 팩트. kind: 'all'(all_deal) 또는 'won'(won_deal)
+    원본 컬럼 + 팀 / is_retention / status. 데이터 버전별로 1회만 계산된다.
+    columns를 주면 해당 컬럼(파생 컬럼 포함)만 반환. filters·shared·compact는 load_all_deal과 동일.
+    """
+    if kind not in FACT_TABLES:
+        raise KeyError(kind)
+    return _frame(f"facts:{kind}", columns, core.build_where(filters), compact, shared)
 
-@st.cache_data
-def _load_accounting(sig: tuple) -> pd.DataFrame:
-    df = pd.read_sql_query("SELECT * FROM accounting", _conn(sig))
-    return _post_accounting(df)
+def load_deal_cube(columns: list[str] | None = None, shared: bool = False,
+                   compact: bool = False, **filters) -> pd.DataFrame:
+    """
+    적재 시 만들어 둔 월별 집계 큐브 (all_deal 기준, 값은 deals·amount). 페이지 묶음별 큐브(CUBES) 중
+    columns·filters의 차원을 모두 가진 가장 작은 큐브에서 읽는다 (없는 차원 조합이면 KeyError).
+    columns: 남길 차원 — 나머지 차원은 합산된다 (예: ["생성년도", "생성월", "status"]).
+    filters: 슬라이스 (CUBE_FILTER_COLS 키: years, months, owners, teams, customer_type, sizes,
+             formats, categories, conversion, retention, status(상태), stages(성사 가능성), statuses).
+    건수는 Int64, amount는 원 단위 float. 상세 행이 필요하면 load_deal_facts를 쓴다.
+    """
+    return _frame(core.CUBE_TABLE, columns, core.build_where(filters, CUBE_FILTER_COLS), compact, shared)
 
-# 사용자 API
-def load_all_deal() -> pd.DataFrame:
-    return _load_all(_sig())
+# 키 조회 (드릴다운용): 일치하는 행만 인덱스로 읽는다. values는 하나 또는 목록, kind는 'all' / 'won'.
+# 결과 행 순서는 원본 순서. 기업명은 정확히 일치하는 값만 (앞뒤 공백 포함).
+def get_deals_by_company(names, kind: str = "all",
+                         columns: list[str] | None = None) -> pd.DataFrame:
+    return _lookup("company", names, kind, columns)
 
-def load_won_deal() -> pd.DataFrame:
-    return _load_won(_sig())
+def get_deals_by_course(ids, kind: str = "all",
+                        columns: list[str] | None = None) -> pd.DataFrame:
+    return _lookup("course", ids, kind, columns)
 
-def load_retention() -> pd.DataFrame:
-    return _load_ret(_sig())
+def get_deals_by_id(ids, kind: str = "all",
+                    columns: list[str] | None = None) -> pd.DataFrame:
+    return _lookup("id", ids, kind, columns)
 
-def load_accounting() -> pd.DataFrame:
-    return _load_accounting(_sig())
+if __name__ == "__main__":
+    sys.exit(core.main())
@@ -0,0 +1,66 @@
+# data_core/__init__.py
+"""
+TXT ↔ 스냅샷(Arrow IPC) / SQLite 적재·조회 코어 (Streamlit 없이 동작)
+────────────────────────────────────────
+· 적재(load_to_db), 세대 교체, 변경 감시, 저장소 읽기(스냅샷 우선, SQLite 폴백)를 모두 여기서 한다.
+  Streamlit 페이지는 data.py(st.cache_* 어댑터)를 통해 같은 구현을 쓴다
+· 배치·CLI·벤치마크는 이 패키지를 직접 import (streamlit 불필요). 로더 결과는 교체 가능한 캐시
+  (기본: 프로세스 내 LRU, DEALS_CACHE_DIR을 주면 디스크 pickle 캐시를 뒤에 붙임)에 보관
+· 모듈 (아래 순서로만 import, 역방향 없음):
+    schema   등록부(FILES, CUBES), SQLite 스키마/인덱스, dtype 스키마, compact
+    snapshot 세대 디렉터리, 스냅샷(Arrow IPC) 쓰기·읽기
+    store    읽기 전용 연결, SQLite 폴백 SELECT, 필터 정규화, 키 조회
+    ingest   TXT 파싱·전처리, 적재 파이프라인, SQLite 대량 기록, 적재 리포트
+    cube     딜 팩트, 월별 집계 큐브
+    build    변경 감지, load_to_db, 백그라운드 재적재, 변경 감시
+    cache    교체 가능한 로더 캐시, @cached
+    loaders  read / 헤드리스 로더 / memory_report
+    cli      prepare / verify / check_prepared, main (python -m data_core)
+  공개 이름은 모두 여기서 다시 내보내므로 `import data_core as dc` 만으로 쓴다
+· 사용 법:   import data_core as dc
+             dc.reload_now(wait=True)                  # TXT가 바뀌었으면 지금 재적재하고 기다림
+             df = dc.load_all_deal(columns=[...], years=2025)
+             cube = dc.load_deal_cube(["생성월", "status"], years=2025)
+             dc.set_cache(dc.TieredCache(dc.LRUCache(16), dc.DiskCache("/tmp/deals-cache")))
+             @dc.cached                                # 첫 인자가 sig인 파생 계산도 같은 캐시로
+             def monthly(sig, year): ...
+             monthly(dc.data_version(), 2025)
+"""
+
+from .schema import (  # noqa: F401
+    BASE, CODE_SIG, CUBES, CUBE_SCHEMA, DATE_FORMAT, DB, DEAL_SCHEMA, FILES, FILTER_COLS, INDEX_SQL,
+    SCHEMAS, SCHEMA_SQL, STRING_DTYPE, WRITE_SQLITE,
+)
+from .snapshot import GEN_FILE, KEEP_GENERATIONS, SNAPSHOT_DIR  # noqa: F401
+from .store import LOOKUP_COLS, LOOKUP_MAX_ENTRIES, normalize_columns, build_where, read_keys  # noqa: F401
+from .ingest import (  # noqa: F401
+    ACC_DATE_COLS, ACC_KEEP_COLS, ACC_NUM_COLS, BULK_PRAGMAS, INGEST_CHUNK_MIN_MB, INGEST_CHUNK_ROWS,
+    INGEST_EXECUTOR, INGEST_STAGES, INGEST_WORKERS, LAST_BUILD, PRE, SQLITE_DATETIME_FORMAT,
+    build_report, rejection_report,
+)
+from .cube import (  # noqa: F401
+    CUBE_AMOUNT_COL, CUBE_DIMS, CUBE_FILTER_COLS, CUBE_MEASURES, CUBE_SOURCES, CUBE_TABLE,
+    FACT_CATEGORY_COLS, FACT_DERIVED_COLS, FACT_INPUT_COLS, FACT_STRIP_COLS, FACT_TABLES, cube_monthly,
+)
+from .build import (  # noqa: F401
+    PREPARED_FILE, WATCH_DEBOUNCE, WATCH_INTERVAL, content_signature, data_refreshing, load_to_db,
+    reload_now, source_digests, signature,
+)
+from .cache import (  # noqa: F401
+    CACHE_DIR, CACHE_DISK_MB, CACHE_MAX_ENTRIES, DiskCache, LRUCache, MISSING, TieredCache, cached,
+    set_cache,
+)
+from .loaders import (  # noqa: F401
+    SHARED_MAX_ENTRIES, data_version, get_deals_by_company, get_deals_by_course, get_deals_by_id,
+    load_accounting, load_all_deal, load_deal_cube, load_deal_facts, load_retention, load_won_deal,
+    lookup_args, memory_report, read, share, SharedFrame, SharedFrameMutationError,
+)
+from .cli import check_prepared, main, prepare, verify  # noqa: F401
+from . import cache as _cache
+
+
+def __getattr__(name: str):
+    # set_cache()가 바꾼 현재 캐시를 돌려준다 (import 시점 값을 복사해 두지 않음)
+    if name == "CACHE":
+        return _cache.CACHE
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
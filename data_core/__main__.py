@@ -0,0 +1,8 @@
+# data_core/__main__.py
+"""python -m data_core prepare [--check]"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
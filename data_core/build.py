@@ -0,0 +1,425 @@
+# data_core/build.py
+"""
+변경 감지, 새 세대 적재(load_to_db)·교체, 백그라운드 재적재와 변경 감시
+"""
+
+import pathlib, sys, sqlite3, os, hashlib, shutil, threading, time, json
+from concurrent.futures import as_completed
+
+from db_pool import open_readonly
+
+try:
+    import pyarrow as pa
+except Exception:  # pragma: no cover - pyarrow 없는 환경 대응
+    pa = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except Exception:  # pragma: no cover - watchdog 없으면 폴링으로 감시
+    FileSystemEventHandler = object
+    Observer = None
+
+from .schema import CODE_SIG, CUBES, DB, FILES, INDEX_SQL, SCHEMA_SQL, WRITE_SQLITE
+from .snapshot import (
+    GEN_FILE, SNAPSHOT_DIR, _GEN, _carry_snapshot, _current_generation, _gen_dir, _prune_generations,
+    _snapshot_path, _write_generation,
+)
+from .store import _quote
+from .ingest import (
+    BULK_PRAGMAS, LAST_BUILD, _bulk_write, _ingest, _ingest_chunked, _ingest_pool, _log_build, _timed,
+    _use_chunks,
+)
+from .cube import _cube_digest, _materialize_cubes
+
+# ─────────────────────────── 변경 감지 (테이블별 내용 해시)
+def _digest(path: pathlib.Path) -> str:
+    """원본 TXT 내용 + CODE_SIG 해시. mtime만 바뀐 경우(touch, 재배포)는 재적재하지 않는다."""
+    h = hashlib.sha256(CODE_SIG.encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _stored_digests(con: sqlite3.Connection) -> dict:
+    return dict(con.execute("SELECT table_name, digest FROM _meta").fetchall())
+
+def _has_sqlite_table(con: sqlite3.Connection, table: str) -> bool:
+    row = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+    ).fetchone()
+    return row is not None
+
+def _is_current(con: sqlite3.Connection, table: str, digest: str, stored: dict,
+                gen: int) -> bool:
+    if stored.get(table) != digest:
+        return False
+    if pa is not None and not _snapshot_path(table, gen).exists():
+        return False
+    if (WRITE_SQLITE or pa is None) and not _has_sqlite_table(con, table):
+        return False
+    return True
+
+def source_digests() -> dict:
+    """지금 TXT로 적재하면 _meta에 기록될 테이블별 digest (파생 큐브 포함). 없는 TXT는 빠진다."""
+    digests = {t: _digest(p) for t, p in FILES.items() if p.exists()}
+    for table in CUBES:
+        cube = _cube_digest(digests, table)
+        if cube is not None:
+            digests[table] = cube
+    return digests
+
+def content_signature(digests: dict) -> str:
+    """테이블별 digest 묶음의 서명 (같은 TXT + 같은 CODE_SIG → 같은 값)."""
+    return hashlib.sha256(repr(sorted(digests.items())).encode()).hexdigest()
+
+def _stale_tables(gen: int, digests: dict) -> list[str]:
+    """서빙 중인 DB/gen 스냅샷에서 digest가 다르거나 저장소가 빠진 테이블."""
+    try:
+        con = open_readonly(DB)
+    except sqlite3.Error:
+        return sorted(digests)
+    try:
+        stored = _stored_digests(con)
+        return [t for t, d in digests.items() if not _is_current(con, t, d, stored, gen)]
+    except sqlite3.Error:   # _meta 없는 예전 DB
+        return sorted(digests)
+    finally:
+        con.close()
+
+def _discard_build(stage: pathlib.Path, gen: int) -> None:
+    """교체 전에 멈춘 적재의 흔적(deals.db.building, gen-XXXXXX/)을 지운다. 서빙 중인 세대는 건드리지 않는다."""
+    stage.unlink(missing_ok=True)
+    shutil.rmtree(_gen_dir(gen), ignore_errors=True)
+
+def _copy_db(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """현재 DB를 스테이징 파일로 복사 (SQLite backup API → 읽는 중에도 일관된 사본)."""
+    s_con, d_con = sqlite3.connect(src), sqlite3.connect(dst)
+    try:
+        s_con.backup(d_con)
+    finally:
+        d_con.close()
+        s_con.close()
+
+def _retire_wal(path: pathlib.Path) -> None:
+    """
+    교체 전에 기존 DB의 WAL을 비운다. 남은 -wal 프레임이 있으면
+    같은 이름으로 들어온 새 파일에 적용돼 버리기 때문 (WAL 모드였던 이전 DB 대응).
+    """
+    if not path.exists():
+        return
+    con = sqlite3.connect(path)
+    try:
+        con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        con.close()
+
+def load_to_db() -> bool:
+    """
+    원본이 바뀐 테이블만 다시 적재해 새 세대를 만든다. 바뀐 게 있으면 True.
+    - 적재는 DB 사본(deals.db.building)과 새 세대 스냅샷 폴더에서 진행
+      → 그동안 읽는 쪽은 이전 DB/스냅샷을 그대로 사용
+    - 파일별 파싱·전처리·스냅샷 기록은 워커 풀(INGEST_EXECUTOR)에서 동시에, SQLite 기록은
+      끝나는 순서대로 한 연결·한 트랜잭션(_bulk_write, 저널/fsync 끔)에서 하고 인덱스는 마지막에
+      만든다 → 소요 시간은 가장 큰 파일에 가깝다
+    - 끝나면 DB rename + GENERATION 갱신으로 한 번에 교체
+    - 테이블별 digest는 _meta 테이블에 기록, 바뀌지 않은 테이블(및 인덱스)은 그대로 가져간다
+    - INGEST_CHUNK_MIN_MB 이상인 TXT는 청크 모드(_ingest_chunked)로 읽어 메모리를 일정하게 유지
+    - 단계별 소요 시간은 LAST_BUILD / build_report(), 해석 못 한 값은 rejection_report()
+    - all_deal·retention이 준비되면 월별 집계 큐브(CUBES)도 같은 세대로 만든다 (_materialize_cubes)
+    """
+    with _BUILD_LOCK:
+        t_start = time.perf_counter()
+        gen = _current_generation()
+        digests = source_digests()
+        if gen and pathlib.Path(DB).exists() and not _stale_tables(gen, digests):
+            return False   # 서빙 중인 세대가 이미 지금 TXT 그대로 (사본을 만들 필요 없음)
+        _BUILDING.set()
+        try:
+            return _build_generation(gen, digests, t_start)
+        finally:
+            _BUILDING.clear()
+
+def _build_generation(gen: int, digests: dict, t_start: float) -> bool:
+    """load_to_db의 본체: 바뀐 테이블을 새 세대(gen + 1)로 적재하고 교체. _BUILD_LOCK 안에서 호출."""
+    use_snapshot = pa is not None
+    write_sqlite = WRITE_SQLITE or not use_snapshot
+    new_gen = gen + 1
+    live = pathlib.Path(DB)
+    stage = live.with_name(live.name + ".building")
+    stage.unlink(missing_ok=True)
+    try:
+        if live.exists():
+            _copy_db(live, stage)
+
+        stats = {"generation": new_gen, "tables": {}, "rejects": {}}
+        con = sqlite3.connect(stage, isolation_level=None)   # 트랜잭션은 직접 관리
+        try:
+            con.executescript(SCHEMA_SQL + BULK_PRAGMAS)
+            stored = _stored_digests(con)
+            present = {}
+            for table, txt in FILES.items():
+                if txt.exists():
+                    present[table] = txt
+                else:
+                    sys.stderr.write(f"[WARN] {txt} not found – skip\n")
+
+            with _ingest_pool(len(present)) as pool:
+                todo, chunked = {}, []
+                for table, txt in present.items():
+                    if _is_current(con, table, digests[table], stored, gen):
+                        if use_snapshot:
+                            _carry_snapshot(table, gen, new_gen)
+                        continue
+                    if _use_chunks(txt):
+                        chunked.append(table)
+                        continue
+                    todo[pool.submit(_ingest, table, txt, new_gen, use_snapshot)] = table
+
+                rows = {}
+                con.execute("BEGIN")
+                # 큰 파일은 이 스레드에서 청크로 (그동안 나머지 파일은 풀에서 진행)
+                for table in chunked:
+                    rows[table], timings, rejects = _ingest_chunked(
+                        table, present[table], new_gen, use_snapshot, con if write_sqlite else None)
+                    if rejects is not None:
+                        stats["rejects"][table] = rejects
+                    stats["tables"][table] = timings
+                for fut in as_completed(todo):
+                    table = todo[fut]
+                    df, timings, rejects = fut.result()
+                    if rejects is not None and len(rejects):
+                        stats["rejects"][table] = rejects
+                    if write_sqlite:
+                        _timed(timings, "write", _bulk_write, con, table, df)
+                    rows[table] = len(df)
+                    stats["tables"][table] = timings
+
+                # 파생 테이블: 원본 테이블이 확정된 뒤 새 세대 저장소에서 읽어 만든다
+                cubes = []
+                for table in CUBES:
+                    if table not in digests:
+                        continue
+                    if _is_current(con, table, digests[table], stored, gen):
+                        if use_snapshot:
+                            _carry_snapshot(table, gen, new_gen)
+                    else:
+                        cubes.append(table)
+                if cubes:
+                    for table, (n, timings) in _materialize_cubes(
+                            con, new_gen, cubes, use_snapshot, write_sqlite).items():
+                        rows[table], stats["tables"][table] = n, timings
+                # 레지스트리에서 빠진 테이블(예: 예전 단일 deal_cube)은 사본 DB에서도 지운다
+                for table in set(stored) - set(FILES) - set(CUBES):
+                    con.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+                    con.execute("DELETE FROM _meta WHERE table_name = ?", (table,))
+
+            if write_sqlite:
+                for table in rows:
+                    for ddl in INDEX_SQL.get(table, []):
+                        try:
+                            _timed(stats["tables"][table], "index", con.execute, ddl)
+                        except sqlite3.IntegrityError:
+                            # 키 중복(원본 이상) → 일반 인덱스로라도 만들어 조회는 인덱스를 타게
+                            sys.stderr.write(f"[WARN] {table}: duplicate key – {ddl.split(' ON ')[0]} as non-unique\n")
+                            con.execute(ddl.replace("UNIQUE INDEX", "INDEX"))
+                        except sqlite3.OperationalError:
+                            pass
+            con.executemany(
+                "INSERT OR REPLACE INTO _meta (table_name, digest, rows, built_at) "
+                "VALUES (?, ?, ?, datetime('now'))",
+                [(t, digests[t], n) for t, n in rows.items()],
+            )
+            con.execute("COMMIT")
+            con.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            con.close()
+
+        if not stats["tables"]:
+            _discard_build(stage, new_gen)
+            return False
+        _retire_wal(live)
+        os.replace(stage, live)
+    except BaseException:
+        _discard_build(stage, new_gen)   # 실패한 사본 DB·새 세대 스냅샷을 다음 적재까지 남기지 않는다
+        raise
+    _write_generation(new_gen)
+    _prune_generations(new_gen)
+    stats["wall"] = time.perf_counter() - t_start
+    LAST_BUILD.clear()
+    LAST_BUILD.update(stats)
+    _log_build(stats)
+    return True
+
+# ─────────────────────────── 백그라운드 재적재
+# TXT가 바뀌면 적재는 백그라운드 스레드에서 하고, 끝날 때까지 세션들은 이전 세대를 서빙한다.
+_BUILD_LOCK = threading.Lock()
+_BUILDING = threading.Event()   # digest 확인 후 실제 적재가 진행 중일 때만 set (data_refreshing)
+_REFRESH_LOCK = threading.Lock()
+_REFRESH = {"sig": None, "thread": None, "error": None}
+
+def _servable() -> bool:
+    """서빙할 세대(스냅샷 폴더 또는 DB)가 있는지."""
+    gen = _current_generation()
+    return gen > 0 and (_gen_dir(gen).exists() or pathlib.Path(DB).exists())
+
+def _run_refresh(first: bool = False) -> None:
+    """
+    load_to_db() 실행. 실패해도 이전 세대를 계속 서빙하고 경고만 남긴다.
+    first=True(최초 적재)인데 서빙할 세대가 없으면 예외를 그대로 올린다 → 로더 호출이 실패하고 다음 호출에서 재시도.
+    """
+    try:
+        load_to_db()
+        _REFRESH["error"] = None
+    except Exception as e:
+        _REFRESH["error"] = repr(e)
+        if first and not _servable():
+            _REFRESH["sig"] = None
+            raise
+        sys.stderr.write(f"[WARN] data refresh failed: {e!r}\n")
+    finally:
+        _WATCH["event"].set()   # 적재 중 들어온 변경은 끝난 뒤 다시 확인
+
+def _refresh(files_sig: tuple) -> None:
+    """
+    files_sig(TXT mtime)가 바뀌었으면 재적재를 시작한다.
+    - 서빙할 세대가 아직 없으면(최초 실행) 그 자리에서 적재
+    - 있으면 백그라운드 스레드로 적재 (이미 진행 중이면 끝난 뒤 다음 호출에서 다시 확인)
+    - prepare로 미리 적재한 세대의 서명이 지금 TXT와 같으면 아무것도 하지 않음 (_prepared_current)
+    """
+    with _REFRESH_LOCK:
+        if _REFRESH["sig"] == files_sig:
+            return
+        t = _REFRESH["thread"]
+        if t is not None and t.is_alive():
+            return
+        _REFRESH["sig"] = files_sig
+        if _current_generation() == 0 or not pathlib.Path(DB).exists():
+            _run_refresh(first=True)
+            return
+        if _prepared_current():
+            return   # 배포 때 미리 적재한 세대가 지금 TXT와 같음 → 재적재 확인도 생략
+        t = threading.Thread(target=_run_refresh, name="deals-refresh", daemon=True)
+        _REFRESH["thread"] = t
+        t.start()
+
+def data_refreshing() -> bool:
+    """
+    재적재 진행 중 여부. 재적재 스레드가 digest만 확인하고 끝나는 경우(touch, 재배포 등)는
+    False — 실제로 새 세대를 만드는 동안만 True.
+    """
+    return _BUILDING.is_set()
+
+# ─────────────────────────── 캐시 Key (TXT mtime + 코드 변경)
+# mtime은 재적재 검사 트리거일 뿐, 실제 재적재 여부는 load_to_db()의 digest 비교로 결정
+def _files_sig() -> tuple:
+    txt_mtimes = tuple(int(os.path.getmtime(p)) if p.exists() else 0 for p in FILES.values())
+    return txt_mtimes + (hash(CODE_SIG),)
+
+def signature() -> tuple:
+    """
+    캐시 키 = 서빙 중인 세대. 재적재가 끝나기 전까지는 이전 세대 키 → 이전 데이터.
+    파일 검사는 감시 스레드가 하므로 여기서는 stat/파일 읽기 없이 정수만 돌려준다.
+    """
+    _ensure_watcher()
+    return (_GEN["value"],)
+
+# ─────────────────────────── 변경 감시 (로더 호출마다 stat 하지 않도록)
+# 감시 스레드 하나가 TXT와 GENERATION 파일을 지켜보다가 바뀌면 재적재를 시작하거나(_refresh)
+# 다른 프로세스가 만든 새 세대로 전환한다. 로더는 _GEN["value"] 정수만 캐시 키로 쓴다.
+# watchdog(inotify 등)이 있으면 이벤트 기반, 없으면 WATCH_INTERVAL초 간격 폴링.
+WATCH_INTERVAL = float(os.getenv("DEALS_WATCH_INTERVAL", "2"))
+WATCH_DEBOUNCE = 0.5   # 내보내기 파일이 나눠 써지는 동안 이벤트가 여러 번 오므로 잠시 모았다가 확인
+_WATCH = {"event": threading.Event(), "thread": None, "observer": None, "lock": threading.Lock()}
+
+class _SourceEvents(FileSystemEventHandler):
+    def __init__(self, paths: set):
+        self.paths = paths
+
+    def on_any_event(self, event):
+        for p in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if p and os.path.abspath(p) in self.paths:
+                _WATCH["event"].set()
+                return
+
+def _sync_generation() -> None:
+    gen = _current_generation()
+    if gen != _GEN["value"]:
+        _GEN["value"] = gen
+
+def _check_sources() -> None:
+    _refresh(_files_sig())
+    _sync_generation()
+
+def _watch_loop() -> None:
+    event = _WATCH["event"]
+    while True:
+        timeout = None if _WATCH["observer"] is not None else WATCH_INTERVAL
+        if event.wait(timeout):
+            time.sleep(WATCH_DEBOUNCE)
+            event.clear()
+        try:
+            _check_sources()
+        except Exception as e:  # 감시 스레드는 죽지 않게
+            sys.stderr.write(f"[WARN] data watcher: {e!r}\n")
+
+def _start_observer():
+    if Observer is None:
+        return None
+    paths = {os.path.abspath(p) for p in FILES.values()} | {os.path.abspath(GEN_FILE)}
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        observer = Observer()
+        handler = _SourceEvents(paths)
+        for d in {os.path.dirname(p) for p in paths}:
+            observer.schedule(handler, d, recursive=False)
+        observer.daemon = True
+        observer.start()
+        return observer
+    except Exception as e:  # inotify 한도 초과 등 → 폴링
+        sys.stderr.write(f"[WARN] file watcher unavailable, polling every {WATCH_INTERVAL}s: {e!r}\n")
+        return None
+
+def _ensure_watcher() -> None:
+    """첫 호출에서 한 번 동기 확인(최초 적재 포함) 후 감시 스레드를 띄운다."""
+    if _WATCH["thread"] is not None:
+        return
+    with _WATCH["lock"]:
+        if _WATCH["thread"] is not None:
+            return
+        _check_sources()
+        _WATCH["observer"] = _start_observer()
+        t = threading.Thread(target=_watch_loop, name="deals-watcher", daemon=True)
+        t.start()
+        _WATCH["thread"] = t
+
+def reload_now(wait: bool = False) -> int:
+    """
+    배포 훅: 감시 이벤트를 기다리지 않고 지금 TXT를 다시 확인해 바뀌었으면 재적재를 시작한다.
+    wait=True면 재적재가 끝날 때까지 기다린다. 반환값은 그 시점에 서빙 중인 세대.
+    """
+    _ensure_watcher()
+    with _REFRESH_LOCK:
+        _REFRESH["sig"] = None   # mtime이 같아도(복사 배포 등) digest 비교까지 가도록
+    _check_sources()
+    t = _REFRESH["thread"]
+    if wait and t is not None:
+        t.join()
+        _sync_generation()
+    return _GEN["value"]
+
+# ─────────────────────────── 배포 시 사전 적재 (python -m data_core prepare [--check])
+# 배포 단계에서 앱과 같은 load_to_db()로 DB + 스냅샷을 만들고 검증한 뒤 PREPARED.json에 서명을 남긴다.
+# 앱은 서명이 지금 TXT와 같으면 재적재 확인 없이 그 세대를 바로 서빙한다 (첫 요청도 적재 비용 없음).
+PREPARED_FILE = SNAPSHOT_DIR / "PREPARED.json"
+
+def _read_stamp() -> dict:
+    try:
+        return json.loads(PREPARED_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def _prepared_current() -> bool:
+    stamp = _read_stamp()
+    return (stamp.get("generation") == _current_generation()
+            and stamp.get("signature") == content_signature(source_digests()))
@@ -0,0 +1,172 @@
+# data_core/cache.py
+"""
+교체 가능한 로더 캐시 (프로세스 내 LRU + 디스크 pickle)와 @cached
+"""
+
+import pathlib, sqlite3, os, hashlib, threading, pickle, functools
+from collections import OrderedDict
+
+from db_pool import file_generation, open_readonly
+
+from .schema import CODE_SIG, DB
+from .build import content_signature
+
+# ─────────────────────────── 캐시 (교체 가능: 프로세스 내 LRU + 디스크)
+# 헤드리스 로더·파생 계산 결과를 담는다. get(key) → 값 또는 MISSING, set(key, value), clear()만
+# 있으면 무엇이든 set_cache()로 끼울 수 있다. 키에 데이터 내용 토큰(_content_token)이 들어가므로
+# 재적재되면 자연히 새 키가 되고, 디스크 캐시는 프로세스 재시작 후에도 같은 데이터면 그대로 맞는다.
+# (Streamlit 페이지는 이 캐시 대신 data.py의 st.cache_data / st.cache_resource를 쓴다)
+CACHE_MAX_ENTRIES = int(os.getenv("DEALS_CACHE_MAX_ENTRIES", "64"))
+CACHE_DIR = os.getenv("DEALS_CACHE_DIR", "")                       # 비우면 디스크 캐시 없음
+CACHE_DISK_MB = int(os.getenv("DEALS_CACHE_DISK_MB", "1024"))     # 넘으면 오래 안 쓴 파일부터 삭제
+MISSING = object()
+
+class LRUCache:
+    """프로세스 내 LRU (스레드 안전). 값은 그대로 보관한다 (사본 여부는 호출 쪽에서)."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return MISSING
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+class DiskCache:
+    """root 아래 키 해시별 pickle 파일. 쓰기는 임시 파일 + rename이라 여러 프로세스가 같이 써도 안전."""
+
+    def __init__(self, root, max_mb: int = CACHE_DISK_MB):
+        self.root = pathlib.Path(root)
+        self.max_bytes = max_mb * 2**20
+
+    def _path(self, key) -> pathlib.Path:
+        return self.root / (hashlib.sha256(repr(key).encode()).hexdigest() + ".pkl")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)   # 최근 사용 시각 → 정리 순서
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return MISSING
+        return value
+
+    def set(self, key, value) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        files = []
+        for p in self.root.glob("*.pkl"):
+            try:
+                st_ = p.stat()
+            except OSError:   # 다른 프로세스가 먼저 지움
+                continue
+            files.append((st_.st_mtime, st_.st_size, p))
+        total = sum(size for _, size, _ in files)
+        for _, size, p in sorted(files):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        for p in self.root.glob("*.pkl"):
+            p.unlink(missing_ok=True)
+
+class TieredCache:
+    """앞 층부터 찾고, 뒤 층에서 찾으면 앞 층에도 채운다 (예: LRUCache → DiskCache)."""
+
+    def __init__(self, *layers):
+        self.layers = layers
+
+    def get(self, key):
+        for i, layer in enumerate(self.layers):
+            value = layer.get(key)
+            if value is not MISSING:
+                for upper in self.layers[:i]:
+                    upper.set(key, value)
+                return value
+        return MISSING
+
+    def set(self, key, value) -> None:
+        for layer in self.layers:
+            layer.set(key, value)
+
+    def clear(self) -> None:
+        for layer in self.layers:
+            layer.clear()
+
+def _default_cache():
+    memory = LRUCache(CACHE_MAX_ENTRIES)
+    return TieredCache(memory, DiskCache(CACHE_DIR)) if CACHE_DIR else memory
+
+CACHE = _default_cache()
+
+def set_cache(cache) -> None:
+    """헤드리스 로더·cached 함수가 쓸 캐시를 바꾼다 (기존 캐시 내용은 버린다)."""
+    global CACHE
+    CACHE = cache
+
+@functools.lru_cache(maxsize=8)
+def _meta_token(gen: int, db_stamp: tuple) -> str:
+    # db_stamp = deals.db (inode, mtime): 저장소를 초기화해 같은 세대 번호가 다시 나와도 파일이 바뀌면 새로 읽는다.
+    # 예외는 lru_cache에 남지 않으므로 다음 호출에서 다시 시도한다.
+    con = open_readonly(DB)
+    try:
+        rows = con.execute("SELECT table_name, digest FROM _meta").fetchall()
+    finally:
+        con.close()
+    return content_signature(dict(rows))[:16]
+
+def _content_token(gen: int) -> str | None:
+    """
+    세대의 테이블 digest 묶음 해시. 세대 번호가 다시 매겨져도(저장소 초기화) 내용이 다르면 다른 키.
+    _meta를 읽지 못하면 None (내용을 모르므로 cached는 캐시하지 않는다).
+    """
+    try:
+        return _meta_token(gen, file_generation(DB))
+    except sqlite3.Error:
+        return None
+
+def cached(fn):
+    """
+    첫 인자가 sig(data_version())인 함수를 CACHE로 메모이즈. 키 = (함수 이름, 내용 토큰, 나머지 인자).
+    인자는 repr이 안정적인 값(str, int, tuple …)만, 결과는 pickle 가능해야 한다(디스크 캐시).
+    돌려주는 객체는 캐시와 공유되므로 수정하려면 사본으로.
+    """
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(sig: tuple, *args):
+        token = _content_token(sig[0])
+        if token is None:   # 내용 토큰 없이 만든 키는 다른 데이터와 겹칠 수 있다 (특히 디스크 캐시)
+            return fn(sig, *args)
+        key = (name, CODE_SIG, token, args)
+        value = CACHE.get(key)
+        if value is MISSING:
+            value = fn(sig, *args)
+            CACHE.set(key, value)
+        return value
+    return wrapper
@@ -0,0 +1,126 @@
+# data_core/cli.py
+"""
+배포 시 사전 적재·검증 (verify / prepare / check_prepared)과 CLI 진입점 main
+"""
+
+import pathlib, re, os, time, json, argparse
+
+from db_pool import open_readonly
+
+try:
+    import pyarrow as pa
+except Exception:  # pragma: no cover - pyarrow 없는 환경 대응
+    pa = None
+
+from .schema import CODE_SIG, DB, INDEX_SQL, WRITE_SQLITE
+from .snapshot import GEN_FILE, _current_generation
+from .store import _open_snapshot, _quote
+from .build import PREPARED_FILE, _read_stamp, _stale_tables, content_signature, load_to_db, source_digests
+
+# ─────────────────────────── 배포 시 사전 적재 (python -m data_core prepare [--check])
+# 서명(PREPARED.json) 읽기와 앱 시작 시 확인(_prepared_current)은 build 쪽에 있다.
+def _index_names(table: str) -> set:
+    return {re.search(r"INDEX IF NOT EXISTS (\S+)", ddl).group(1) for ddl in INDEX_SQL.get(table, [])}
+
+def verify() -> list[str]:
+    """
+    서빙 중인 세대가 지금 TXT로 적재한 결과와 같은지 점검 → 문제 목록 (비면 정상).
+    digest(_meta) 일치, 스냅샷 파일·SQLite 테이블 존재와 행 수(_meta.rows), INDEX_SQL 인덱스 존재.
+    """
+    gen = _current_generation()
+    if gen == 0 or not pathlib.Path(DB).exists():
+        return [f"적재된 세대 없음 ({GEN_FILE.name} / {DB})"]
+    digests = source_digests()
+    stale = _stale_tables(gen, digests)
+    problems = [f"{t}: 원본 TXT와 digest 불일치 또는 저장소 누락" for t in stale]
+    write_sqlite = WRITE_SQLITE or pa is None
+    con = open_readonly(DB)
+    try:
+        meta_rows = dict(con.execute("SELECT table_name, rows FROM _meta"))
+        indexes = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        for t in digests:
+            if t in stale:
+                continue
+            expected = meta_rows.get(t)
+            counts = {}
+            if pa is not None:
+                counts["snapshot"] = _open_snapshot(t, gen).num_rows
+            if write_sqlite:
+                counts["sqlite"] = con.execute(f"SELECT COUNT(*) FROM {_quote(t)}").fetchone()[0]
+                missing = _index_names(t) - indexes
+                if missing:
+                    problems.append(f"{t}: 인덱스 누락 {', '.join(sorted(missing))}")
+            for where, n in counts.items():
+                if n != expected:
+                    problems.append(f"{t}: {where} {n:,}행 ≠ _meta {expected}행")
+    finally:
+        con.close()
+    return problems
+
+def prepare() -> dict:
+    """
+    load_to_db()(바뀐 테이블만) → verify() → 통과하면 PREPARED.json 기록. 기록한 내용을 돌려준다.
+    검증에 실패하면 RuntimeError (서명을 남기지 않으므로 앱은 평소대로 재적재 확인).
+    """
+    rebuilt = load_to_db()
+    problems = verify()
+    if problems:
+        raise RuntimeError("검증 실패: " + "; ".join(problems))
+    digests = source_digests()
+    con = open_readonly(DB)
+    try:
+        meta_rows = dict(con.execute("SELECT table_name, rows FROM _meta"))
+    finally:
+        con.close()
+    stamp = {
+        "generation": _current_generation(),
+        "signature": content_signature(digests),
+        "code_sig": CODE_SIG,
+        "tables": {t: {"digest": d, "rows": meta_rows.get(t)} for t, d in sorted(digests.items())},
+        "rebuilt": rebuilt,
+        "prepared_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    tmp = PREPARED_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(stamp, ensure_ascii=False, indent=1))
+    os.replace(tmp, PREPARED_FILE)
+    return stamp
+
+def check_prepared() -> list[str]:
+    """--check: verify() + PREPARED.json 서명이 서빙 중인 세대·지금 TXT와 맞는지. 아무것도 쓰지 않는다."""
+    problems = verify()
+    stamp = _read_stamp()
+    if not stamp:
+        problems.append(f"{PREPARED_FILE.name} 없음 (prepare 미실행)")
+    elif stamp.get("generation") != _current_generation():
+        problems.append(f"{PREPARED_FILE.name} 세대 {stamp.get('generation')} ≠ 서빙 중 {_current_generation()}")
+    elif stamp.get("signature") != content_signature(source_digests()):
+        problems.append(f"{PREPARED_FILE.name} 서명이 지금 TXT와 다름")
+    return problems
+
+# ─────────────────────────── CLI
+def main(argv: list[str] | None = None) -> int:
+    """python -m data_core prepare [--check]  (python -m data, sub/prepare_db.py도 같은 진입점)"""
+    parser = argparse.ArgumentParser(prog="python -m data_core", description="딜 데이터 DB/스냅샷 사전 적재")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_prepare = sub.add_parser("prepare", help="TXT → DB + 스냅샷 적재 후 검증, PREPARED.json 기록")
+    p_prepare.add_argument("--check", action="store_true",
+                           help="적재하지 않고 기존 세대·서명만 검증 (불일치 시 종료 코드 1)")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        problems = check_prepared()
+        for p in problems:
+            print(f"[FAIL] {p}")
+        if not problems:
+            print(f"[OK] gen {_current_generation()} = 현재 TXT ({_read_stamp()['signature'][:12]})")
+        return 1 if problems else 0
+    try:
+        stamp = prepare()
+    except RuntimeError as e:
+        print(f"[FAIL] {e}")
+        return 1
+    for t, info in stamp["tables"].items():
+        print(f"  {t:<12} {info['rows'] or 0:>8,}행  {info['digest'][:12]}")
+    state = "적재" if stamp["rebuilt"] else "변경 없음, 기존 세대 사용"
+    print(f"[OK] gen {stamp['generation']} ({state}) 서명 {stamp['signature'][:12]} → {PREPARED_FILE}")
+    return 0
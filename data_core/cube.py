@@ -0,0 +1,181 @@
+# data_core/cube.py
+"""
+딜 팩트(페이지 공통 파생 컬럼)와 월별 집계 큐브 (적재 시 materialize, 조회, 월별 표)
+"""
+
+import sqlite3, hashlib
+import pandas as pd
+
+from config import NAME2TEAM, STAT_MAP
+
+from .schema import CODE_SIG, CUBES, FILTER_COLS, _apply_schema, _compact
+from .snapshot import _read_snapshot, _write_snapshot
+from .store import normalize_columns, _read_sql, _read_table
+from .ingest import _bulk_write, _timed
+
+# ─────────────────────────── 딜 팩트 (페이지 공통 파생 컬럼)
+FACT_STRIP_COLS = [
+    "담당자_name", "기업명", "기업 규모", "과정포맷(대)", "카테고리(대)",
+    "성사 가능성", "상태", "고객사 유형", "딜 전환 유형",
+]
+FACT_CATEGORY_COLS = [
+    "담당자_name", "팀", "기업 규모", "과정포맷(대)", "카테고리(대)",
+    "성사 가능성", "상태", "고객사 유형", "딜 전환 유형", "status",
+]
+FACT_TABLES = {"all": "all_deal", "won": "won_deal"}
+FACT_DERIVED_COLS = ["팀", "is_retention", "status"]
+FACT_INPUT_COLS = ["담당자_name", "기업명", "성사 가능성"]   # 파생 컬럼 계산에 필요한 원본 컬럼
+
+def _build_facts(df: pd.DataFrame, ret: pd.DataFrame) -> pd.DataFrame:
+    """
+    페이지마다 반복하던 정규화를 한 번에:
+    - 주요 문자열 컬럼 strip
+    - 팀: 담당자_name → NAME2TEAM
+    - is_retention: 기업명 ∈ retention 기업명
+    - status: 성사 가능성 → STAT_MAP (그 외 '기타')
+    범주형 컬럼은 category로 둔다 (fillna/신규 값 대입 전에는 astype(str) 필요).
+    """
+    df = df.copy()
+    for c in FACT_STRIP_COLS:
+        if c in df.columns:
+            df[c] = df[c].str.strip()
+    df["팀"] = df["담당자_name"].map(NAME2TEAM)
+    ret_names = set(ret["기업명"].dropna().astype(str).str.strip())
+    df["is_retention"] = df["기업명"].isin(ret_names)
+    df["status"] = df["성사 가능성"].map(STAT_MAP).fillna("기타")
+    for c in FACT_CATEGORY_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    return df
+
+def _read_facts(kind: str, sig: tuple, columns: tuple | None = None,
+                where: tuple = (), compact: bool = False) -> pd.DataFrame:
+    base_cols = None
+    if columns is not None:
+        base_cols = normalize_columns([c for c in columns if c not in FACT_DERIVED_COLS] + FACT_INPUT_COLS)
+    df = _build_facts(_read_table(FACT_TABLES[kind], sig, base_cols, where),
+                      _read_table("retention", sig, ("기업명",)))
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return _compact(df, FACT_TABLES[kind]) if compact else df
+
+
+# ─────────────────────────── 월별 집계 큐브 (적재 시 materialize)
+# 체결률 페이지들이 원본 행을 매번 훑어 (생성년도, 생성월, status)별 건수/금액을 세던 것을
+# 적재 때 페이지 묶음별 차원 조합(CUBES)으로 미리 집계해 둔다. 페이지는 큐브를 잘라 합산만 한다.
+CUBE_TABLE = "deal_cube"   # 조회 이름 (read/캐시 키). 실제 테이블은 _pick_cube가 CUBES에서 고른다
+CUBE_SOURCES = ["all_deal", "retention"]
+CUBE_DIMS = list(dict.fromkeys(c for dims in CUBES.values() for c in dims))   # 전체 큐브 차원 합집합
+CUBE_MEASURES = ["deals", "amount"]   # 딜 수, 수주 예정액(종합) 합
+CUBE_AMOUNT_COL = "수주 예정액(종합)"
+# 큐브 전용 슬라이스 인자 (FILTER_COLS에 더해). 값은 스칼라 또는 리스트
+CUBE_FILTER_COLS = {
+    **{k: v for k, v in FILTER_COLS.items() if v in CUBE_DIMS},
+    "months":     "생성월",
+    "teams":      "팀",
+    "sizes":      "기업 규모",
+    "categories": "카테고리(대)",
+    "conversion": "딜 전환 유형",
+    "retention":  "is_retention",
+    "stages":     "성사 가능성",
+    "statuses":   "status",
+}
+
+def _cube_digest(digests: dict, table: str) -> str | None:
+    """원본 테이블 digest + 큐브 차원·팀/상태 매핑 해시. 원본이 하나라도 없으면 None (큐브를 만들지 않음)."""
+    if any(t not in digests for t in CUBE_SOURCES):
+        return None
+    h = hashlib.sha256(CODE_SIG.encode())
+    h.update(repr((CUBES[table], sorted(NAME2TEAM.items()), sorted(STAT_MAP.items()))).encode())
+    for t in CUBE_SOURCES:
+        h.update(digests[t].encode())
+    return h.hexdigest()
+
+def _build_cube(facts: pd.DataFrame, table: str) -> pd.DataFrame:
+    """딜 팩트를 CUBES[table]로 묶어 deals(건수) / amount(수주 예정액 합). 결측 차원 값도 한 그룹으로 남긴다."""
+    dims = [c for c in CUBES[table] if c in facts.columns]
+    cube = (facts.groupby(dims, dropna=False, observed=True, sort=True)[CUBE_MEASURES]
+            .sum().reset_index())
+    for c in dims:
+        if isinstance(cube[c].dtype, pd.CategoricalDtype):
+            cube[c] = cube[c].astype(object)
+    return _apply_schema(cube, table)
+
+def _materialize_cubes(con: sqlite3.Connection, gen: int, tables: list[str], use_snapshot: bool,
+                       write_sqlite: bool) -> dict:
+    """
+    load_to_db 안에서: 새 세대의 all_deal/retention을 한 번 읽어 팩트를 만들고, tables의 큐브를 각각
+    같은 세대로 기록. {테이블: (행 수, timings)} — 원본 읽기·팩트 계산 시간은 첫 큐브에 기록.
+    """
+    timings = {}
+
+    def read(table, columns):
+        df = _read_snapshot(table, columns, gen=gen) if use_snapshot else None
+        if df is None:
+            df = _read_sql(con, table, columns)
+        return df
+
+    dims = dict.fromkeys(c for t in tables for c in CUBES[t])
+    deal_cols = tuple(c for c in dims if c not in FACT_DERIVED_COLS) + tuple(FACT_INPUT_COLS) + (CUBE_AMOUNT_COL,)
+    deals = _timed(timings, "parse", read, "all_deal", normalize_columns(deal_cols))
+    ret = _timed(timings, "parse", read, "retention", ("기업명",))
+    facts = _timed(timings, "transform", _build_facts, deals, ret)
+    facts["deals"] = 1
+    facts["amount"] = facts[CUBE_AMOUNT_COL] if CUBE_AMOUNT_COL in facts.columns else 0.0
+    out = {}
+    for table in tables:
+        cube = _timed(timings, "transform", _build_cube, facts, table)
+        if use_snapshot:
+            _timed(timings, "snapshot", _write_snapshot, table, cube, gen)
+        if write_sqlite:
+            _timed(timings, "write", _bulk_write, con, table, cube)
+        out[table] = (len(cube), timings)
+        timings = {}
+    return out
+
+def _pick_cube(dims: tuple | None, where: tuple) -> str:
+    """요청 차원 + 조건 컬럼을 모두 가진 큐브 중 차원이 가장 적은 것. 없으면 KeyError."""
+    need = (set(dims or ()) | {c for c, _ in where}) - set(CUBE_MEASURES)
+    fits = [t for t, d in CUBES.items() if need <= set(d)]
+    if not fits:
+        raise KeyError(f"no cube has all of: {', '.join(sorted(need))}")
+    return min(fits, key=lambda t: len(CUBES[t]))
+
+def _read_cube(sig: tuple, dims: tuple | None = None, where: tuple = (),
+               compact: bool = False) -> pd.DataFrame:
+    """
+    dims: 남길 차원 (요청 순서). 나머지 차원은 합산해 없앤다. None이면 고른 큐브 그대로.
+    where: 차원 값 조건 (저장소 단계에서 적용, 합산 전에 거른다).
+    """
+    table = _pick_cube(dims, where)
+    cols = None if dims is None else normalize_columns([*dims, *CUBE_MEASURES])
+    cube = _read_table(table, sig, cols, where)
+    if dims is not None:
+        keep = [c for c in dims if c in cube.columns and c not in CUBE_MEASURES]
+        if keep:
+            cube = (cube.groupby(keep, dropna=False, observed=True, sort=True)[CUBE_MEASURES]
+                    .sum().reset_index())
+        else:
+            cube = pd.DataFrame({m: [cube[m].sum()] for m in CUBE_MEASURES})
+        cube["deals"] = cube["deals"].astype("Int64")
+    return _compact(cube, table) if compact else cube
+
+def cube_monthly(cube: pd.DataFrame, by=("생성년도", "생성월"), index=None) -> pd.DataFrame:
+    """
+    체결률 표용: 큐브 행 → by별 전체 / 확정+높음 / 낮음 / LOST 건수 + 확정+높음 amount(원).
+    index(by 값 목록, by가 여럿이면 tuple 목록)를 주면 그 순서로 맞추고 없는 칸은 0.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    win = cube["status"].isin(["확정", "높음"])
+    parts = pd.DataFrame({
+        "전체":      cube["deals"],
+        "확정+높음": cube["deals"].where(win, 0),
+        "낮음":      cube["deals"].where(cube["status"] == "낮음", 0),
+        "LOST":      cube["deals"].where(cube["status"] == "LOST", 0),
+        "amount":    cube["amount"].where(win, 0.0),
+    })
+    agg = parts.groupby([cube[c] for c in by]).sum()
+    if index is not None:
+        index = pd.MultiIndex.from_tuples(index) if len(by) > 1 else pd.Index(index)
+        agg = agg.reindex(index, fill_value=0)
+    return agg
@@ -0,0 +1,295 @@
+# data_core/ingest.py
+"""
+TXT 파싱·전처리와 테이블별 적재 파이프라인 (청크 적재, SQLite 대량 기록, 적재 리포트)
+"""
+
+import pathlib, sys, sqlite3, re, os, time, multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pandas as pd
+
+from .schema import DATE_FORMAT, SCHEMAS, _apply_schema
+from .snapshot import _SnapshotAppender, _write_snapshot
+from .store import _quote
+
+# ─────────────────────────── TXT 읽기 (전체 / 청크 공통 dtype)
+def _txt_dtypes(path: pathlib.Path, table: str) -> dict:
+    """
+    전체/청크 적재 공통 dtype 정책: 스키마에 타입이 선언되지 않은 컬럼은 문자열로 고정해 읽는다
+    (선언된 컬럼은 _apply_schema가 맞춘다). 파일 크기·청크 경계에 따라 추론 결과가 달라지지 않는다.
+    """
+    schema = SCHEMAS.get(table, {})
+    typed = {c for k, cols in schema.items() if k != "categories" for c in cols}
+    header = pd.read_csv(path, sep="\t", nrows=0).columns
+    return {c: str for c in header if c not in typed}
+
+def _read_txt(path: pathlib.Path, table: str) -> pd.DataFrame:
+    return pd.read_csv(path, sep="\t", dtype=_txt_dtypes(path, table)).dropna(how="all")
+
+def _iter_txt(path: pathlib.Path, table: str, chunk_rows: int):
+    """_read_txt의 청크 버전 (같은 dtype 정책). 행 인덱스는 파일 전체 기준."""
+    dtype = _txt_dtypes(path, table)
+    with pd.read_csv(path, sep="\t", dtype=dtype, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield chunk.dropna(how="all")
+
+# ─────────────────────────── deal 전용 전처리
+def _pre_deal(df: pd.DataFrame) -> pd.DataFrame:
+    """담당자_name 끝 'B' 제거"""
+    if "담당자_name" in df.columns:
+        df["담당자_name"] = df["담당자_name"].str.replace(r"B$", "", regex=True)
+    return df
+
+def _pre_won(df: pd.DataFrame) -> pd.DataFrame:
+    df = _pre_deal(df)
+    if "이름" in df.columns:
+        df = df[~df["이름"].astype(str).str.contains("[비매출입과]", regex=False, na=False)].copy()
+    return df
+
+# ─────────────────────────── accounting 전용 전처리
+# 행 단위 apply 없이 컬럼 단위로만 처리 (수십만 행 결제 라인에서도 선형).
+# 값이 있는데 해석하지 못한 셀은 결측/0으로 두고 거절 목록(df.attrs["rejects"])에 남긴다.
+ACC_KEEP_COLS = [
+    "매출집계월","결제일자","코스ID","계약금액","금액검증","사업구분","교육과정명",
+    "카테고리","포맷","코스개강일","코스개강일2","코스종강일","수익인식방법","코스일수","일수당결제금액"
+]
+ACC_NUM_COLS = ["계약금액", "코스일수", "일수당결제금액"]
+ACC_DATE_COLS = ["결제일자", "코스개강일", "코스개강일2", "코스종강일"]
+_KR_MONTH_RE = re.compile(r"(\d{2,4})\s*년\s*(\d{1,2})\s*월")            # "21년 6월", "2024년 12월"
+_NUM_TRANS = str.maketrans({",": None, " ": None, "−": "-", "–": "-", "—": "-"})
+
+def _clean_num(s: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """콤마/공백 제거 + 유니코드 대시 → '-' 한 번에. 빈 값·단독 하이픈은 결측(→0). (값, 거절 마스크)"""
+    x = s.astype(str).str.translate(_NUM_TRANS).str.strip()
+    x = x.mask(s.isna() | x.isin(["", "-", "--", "nan"]))
+    num = pd.to_numeric(x, errors="coerce")
+    return num.fillna(0), x.notna() & num.isna()
+
+def _has_value(s: pd.Series) -> pd.Series:
+    return s.notna() & (s.astype(str).str.strip() != "")
+
+def _pre_accounting(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    accounting data.txt를 DB에 넣기 전에 컬럼/타입/파생값을 표준화합니다.
+    - 헤더 공백/한글 BOM 제거 및 통일
+    - 금액/일수 등 숫자형 변환(음수 기호 보존, 단독 하이픈만 결측→0)
+    - 날짜형 변환(DATE_FORMAT 고정)
+    - '매출집계월' → 집계년/집계월/월초 파생
+    - '코스 ID' 별칭, 표준 수강 시작/종료 파생
+    - '사업 구분' 별칭, '포맷' 보장
+    - 교육과정명 '(B2B_SMB)' 포함 행 제외
+    - 해석 못 한 값: df.attrs["rejects"] = DataFrame(line, column, value)  (line = TXT 줄 번호)
+    """
+    df = df_raw.copy()
+    rejected = {}   # 컬럼 → 거절 마스크
+
+    # 1) 헤더 정리
+    df.columns = [re.sub(r"\s+", "", str(c).replace("\ufeff", "")) for c in df.columns]
+
+    # 2) 스키마 통일
+    for k in ACC_KEEP_COLS:
+        if k not in df.columns:
+            df[k] = pd.NA
+    df = df[ACC_KEEP_COLS].copy()
+    raw = df.copy()
+
+    # 3) 숫자형 변환(음수 기호 보존)
+    for c in ACC_NUM_COLS:
+        df[c], rejected[c] = _clean_num(df[c])
+    df["코스일수"] = df["코스일수"].round().astype("Int64")
+
+    # 4) 불리언
+    flag = df["금액검증"].astype(str).str.strip().str.upper().map({"TRUE": True, "FALSE": False})
+    rejected["금액검증"] = _has_value(raw["금액검증"]) & flag.isna()
+    df["금액검증"] = flag.fillna(False).astype(bool)
+
+    # 5) 날짜
+    for c in ACC_DATE_COLS:
+        df[c] = pd.to_datetime(df[c], format=DATE_FORMAT, errors="coerce")
+        rejected[c] = _has_value(raw[c]) & df[c].isna()
+
+    # 6) 매출집계월 파싱
+    ym = df["매출집계월"].astype(str).str.extract(_KR_MONTH_RE)
+    year = pd.to_numeric(ym[0], errors="coerce").astype("Int64")
+    year = year.where(year >= 100, year + 2000)
+    month = pd.to_numeric(ym[1], errors="coerce").astype("Int64")
+    bad_month = month.notna() & ~month.between(1, 12)
+    year, month = year.mask(bad_month), month.mask(bad_month)
+    df["집계년"], df["집계월"] = year, month
+    df["집계월_월초"] = pd.to_datetime(
+        pd.DataFrame({"year": year, "month": month, "day": 1}), errors="coerce")
+    rejected["매출집계월"] = _has_value(raw["매출집계월"]) & month.isna()
+
+    # 7) 키/수강일 파생
+    df["코스ID"] = pd.to_numeric(df["코스ID"], errors="coerce")
+    rejected["코스ID"] = _has_value(raw["코스ID"]) & df["코스ID"].isna()
+    df["코스 ID"] = df["코스ID"].astype("Int64")
+    df["코스 ID(str)"] = df["코스 ID"].astype(str)
+    df["수강시작일"] = df["코스개강일2"].combine_first(df["코스개강일"])
+    df["수강종료일"] = df["코스종강일"]
+
+    # 8) 별칭/포맷 보장
+    df["사업 구분"] = df["사업구분"]
+
+    # 9) 교육과정명 필터
+    keep = ~df["교육과정명"].astype(str).str.contains("(B2B_SMB)", regex=False, na=False)
+    df = df[keep]
+
+    # 10) 표시용 별칭
+    df["코스 개강일2"] = df["코스개강일2"]
+    df["코스 종강일"] = df["코스종강일"]
+
+    df.attrs["rejects"] = pd.concat(
+        [pd.DataFrame({"line": raw.index[m & keep] + 2, "column": c,
+                       "value": raw.loc[m & keep, c].astype(str).to_numpy()})
+         for c, m in rejected.items()],
+        ignore_index=True,
+    ).sort_values(["line", "column"], ignore_index=True)
+    return df
+
+# 테이블별 적재 전처리 (스키마 적용 전 단계)
+PRE = {
+    "all_deal":   _pre_deal,
+    "won_deal":   _pre_won,
+    "accounting": _pre_accounting,
+}
+
+# ─────────────────────────── SQLite 대량 기록
+# 스테이징 DB(deals.db.building)는 실패하면 버리는 임시 파일이므로 저널·fsync 없이 한 트랜잭션으로 쓴다.
+# 교체(rename) 전에 journal_mode=DELETE로 되돌려 서빙 중에는 일반 파일로 읽힌다.
+BULK_PRAGMAS = """
+PRAGMA journal_mode=OFF;
+PRAGMA synchronous=OFF;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-262144;
+"""
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"   # to_sql과 같은 TEXT 표현 (폴백 로드 시 ISO8601 파싱)
+
+def _sqlite_type(s: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(s.dtype) or pd.api.types.is_integer_dtype(s.dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(s.dtype):
+        return "REAL"
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        return "TIMESTAMP"
+    return "TEXT"
+
+def _sqlite_values(s: pd.Series) -> list:
+    """컬럼 → sqlite3가 받는 파이썬 값 목록 (결측은 None)."""
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        s = s.dt.strftime(SQLITE_DATETIME_FORMAT)
+    elif isinstance(s.dtype, pd.CategoricalDtype):
+        s = s.astype(object)
+    return s.to_numpy(dtype=object, na_value=None).tolist()
+
+def _bulk_write(con: sqlite3.Connection, table: str, df: pd.DataFrame,
+                create: bool = True) -> None:
+    """
+    타입을 명시한 CREATE TABLE + executemany. 호출 쪽 트랜잭션 안에서 실행
+    (to_sql의 테이블별 commit·청크 분할 없이 한 번에). create=False면 기존 테이블에 추가(청크 적재).
+    """
+    marks = ", ".join("?" * df.shape[1])
+    if create:
+        cols = ", ".join(f"{_quote(c)} {_sqlite_type(df[c])}" for c in df.columns)
+        con.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+        con.execute(f"CREATE TABLE {_quote(table)} ({cols})")
+    rows = zip(*(_sqlite_values(df[c]) for c in df.columns))
+    con.executemany(f"INSERT INTO {_quote(table)} VALUES ({marks})", rows)
+
+# ─────────────────────────── 적재 파이프라인 (파일별 병렬 파싱·변환)
+# thread: 기본. read_csv / Arrow 기록은 GIL을 놓지만 파이썬 전처리(apply 등)는 직렬화된다
+# process: fork된 워커에서 파싱·전처리·스냅샷까지 하고 DataFrame만 돌려받는다 (다코어 CLI 재적재용)
+INGEST_EXECUTOR = os.getenv("DEALS_INGEST_EXECUTOR", "thread")
+INGEST_WORKERS = int(os.getenv("DEALS_INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+INGEST_STAGES = ["parse", "transform", "snapshot", "write", "index"]
+LAST_BUILD: dict = {}   # 마지막 적재 결과: generation, wall, tables={table: {stage: 초}}
+
+def _timed(timings: dict, stage: str, fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - t0
+    return out
+
+def _transform(table: str, df: pd.DataFrame) -> tuple:
+    """전처리 + 스키마. (df, 거절 목록 또는 None) — 전처리가 df.attrs["rejects"]에 남긴 것."""
+    df = PRE.get(table, lambda d: d)(df)
+    rejects = df.attrs.pop("rejects", None)
+    return _apply_schema(df, table), rejects
+
+def _ingest(table: str, txt: pathlib.Path, gen: int, write_snapshot: bool) -> tuple:
+    """TXT 하나를 파싱 → 전처리/스키마 → (스냅샷 기록). 테이블끼리 독립이라 풀에서 동시에 돈다."""
+    timings = {}
+    df = _timed(timings, "parse", _read_txt, txt, table)
+    df, rejects = _timed(timings, "transform", _transform, table, df)
+    if write_snapshot:
+        _timed(timings, "snapshot", _write_snapshot, table, df, gen)
+    return df, timings, rejects
+
+# 큰 TXT는 청크 모드: N행씩 읽어 전처리 후 스냅샷/SQLite에 바로 이어 쓴다 → 최대 메모리가 파일 크기와 무관
+INGEST_CHUNK_ROWS = int(os.getenv("DEALS_INGEST_CHUNK_ROWS", "50000"))
+INGEST_CHUNK_MIN_MB = float(os.getenv("DEALS_INGEST_CHUNK_MIN_MB", "64"))   # 이 크기 이상인 TXT만
+
+def _use_chunks(txt: pathlib.Path) -> bool:
+    return INGEST_CHUNK_ROWS > 0 and txt.stat().st_size >= INGEST_CHUNK_MIN_MB * 2**20
+
+def _ingest_chunked(table: str, txt: pathlib.Path, gen: int, write_snapshot: bool,
+                    con: sqlite3.Connection | None) -> tuple:
+    """
+    청크 단위로 파싱 → 전처리/스키마 → 스냅샷 append → SQLite append. (행 수, timings, 거절 목록)
+    SQLite 연결을 쓰므로 호출 스레드(load_to_db)에서 직렬로 돈다. 전처리는 행 단위여야 한다(PRE 모두 해당).
+    """
+    timings, rejects, rows, first = {}, [], 0, True
+    appender = _SnapshotAppender(table, gen) if write_snapshot else None
+    chunks = _iter_txt(txt, table, INGEST_CHUNK_ROWS)
+    while (chunk := _timed(timings, "parse", next, chunks, None)) is not None:
+        df, rej = _timed(timings, "transform", _transform, table, chunk)
+        if rej is not None and len(rej):
+            rejects.append(rej)
+        if appender is not None:
+            _timed(timings, "snapshot", appender.write, df)
+        if con is not None:
+            _timed(timings, "write", _bulk_write, con, table, df, first)
+        rows += len(df)
+        first = False
+    if first:   # 데이터 행이 없는 파일: 헤더만으로 빈 테이블
+        df, _ = _transform(table, pd.read_csv(txt, sep="\t", nrows=0))
+        if appender is not None:
+            appender.write(df)
+        if con is not None:
+            _bulk_write(con, table, df)
+    if appender is not None:
+        appender.close()
+    return rows, timings, (pd.concat(rejects, ignore_index=True) if rejects else None)
+
+def _ingest_pool(n_jobs: int):
+    workers = max(1, min(INGEST_WORKERS, n_jobs))
+    if INGEST_EXECUTOR == "process" and workers > 1:
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        return ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deals-ingest")
+
+def _log_build(stats: dict) -> None:
+    parts = []
+    for table, t in stats["tables"].items():
+        stages = " ".join(f"{k} {t[k]:.2f}s" for k in INGEST_STAGES if k in t)
+        parts.append(f"{table}({stages})")
+    sys.stderr.write(f"[INFO] gen {stats['generation']} 적재 {stats['wall']:.2f}s: {', '.join(parts)}\n")
+    for table, rej in stats.get("rejects", {}).items():
+        by_col = ", ".join(f"{c} {n}" for c, n in rej["column"].value_counts().items())
+        sys.stderr.write(f"[WARN] {table}: 해석 못 한 값 {len(rej)}건 ({by_col}) – rejection_report() 참고\n")
+
+def build_report() -> pd.DataFrame:
+    """마지막 load_to_db()의 테이블 × 단계별 소요 시간(초). 적재한 적이 없으면 빈 프레임."""
+    if not LAST_BUILD:
+        return pd.DataFrame(columns=["table", *INGEST_STAGES])
+    rows = [{"table": t, **{k: v.get(k) for k in INGEST_STAGES}}
+            for t, v in LAST_BUILD["tables"].items()]
+    return pd.DataFrame(rows)
+
+def rejection_report() -> pd.DataFrame:
+    """마지막 load_to_db()에서 해석하지 못해 결측/0으로 적재된 셀: table, line(TXT 줄 번호), column, value."""
+    rejects = LAST_BUILD.get("rejects") or {}
+    if not rejects:
+        return pd.DataFrame(columns=["table", "line", "column", "value"])
+    return pd.concat([r.assign(table=t) for t, r in rejects.items()],
+                     ignore_index=True)[["table", "line", "column", "value"]]
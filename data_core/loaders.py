@@ -0,0 +1,136 @@
+# data_core/loaders.py
+"""
+이름 → 읽기 함수 등록부(read)와 헤드리스 로더 (배치·CLI용), memory_report
+"""
+
+import os
+import pandas as pd
+
+from shared_frame import share, SharedFrame, SharedFrameMutationError  # noqa: F401 (재노출)
+
+from .schema import FILES, _compact
+from .store import LOOKUP_COLS, normalize_columns, _keys, read_keys, _read_table, build_where
+from .cube import CUBE_FILTER_COLS, CUBE_TABLE, FACT_TABLES, _read_cube, _read_facts
+from .build import signature
+from .cache import LRUCache, MISSING, cached
+
+# ─────────────────────────── 공통 조회 (이름 → 읽기 함수)
+_READERS = {
+    "all_deal":   lambda sig, cols, where, compact: _read_table("all_deal", sig, cols, where, compact),
+    "won_deal":   lambda sig, cols, where, compact: _read_table("won_deal", sig, cols, where, compact),
+    "retention":  lambda sig, cols, where, compact: _read_table("retention", sig, cols, compact=compact),
+    "accounting": lambda sig, cols, where, compact: _read_table("accounting", sig, cols, compact=compact),
+    "facts:all":  lambda sig, cols, where, compact: _read_facts("all", sig, cols, where, compact),
+    "facts:won":  lambda sig, cols, where, compact: _read_facts("won", sig, cols, where, compact),
+    CUBE_TABLE:   _read_cube,
+}
+
+def read(name: str, sig: tuple, columns: tuple | None = None, where: tuple = (),
+         compact: bool = False) -> pd.DataFrame:
+    """
+    캐시 없이 저장소에서 바로 읽는다. name: _READERS 키 (테이블명, 'facts:all'/'facts:won', CUBE_TABLE).
+    columns/where는 normalize_columns/_where로 정규화한 값. 캐시 계층(헤드리스 CACHE, data.py의 st.cache_*)이 감싼다.
+    """
+    if name not in _READERS:
+        raise KeyError(name)
+    return _READERS[name](sig, columns, where, compact)
+
+def lookup_args(by: str, values, kind: str, columns) -> tuple:
+    """키 조회 인자 → (table, col, keys, columns) (캐시 키로 그대로 쓸 수 있는 값)."""
+    if kind not in FACT_TABLES:
+        raise KeyError(kind)
+    return FACT_TABLES[kind], LOOKUP_COLS[by], _keys(values), normalize_columns(columns)
+
+# ─────────────────────────── 헤드리스 로더 (배치·CLI용, 결과는 CACHE에)
+# 페이지용 로더(data.py)와 인자·결과가 같다. shared=True면 프로세스 공유 읽기 전용 프레임
+# (SHARED_MAX_ENTRIES개까지 LRU), 아니면 캐시된 결과의 사본을 돌려준다.
+SHARED_MAX_ENTRIES = int(os.getenv("DEALS_SHARED_MAX_ENTRIES", "32"))   # 이전 세대는 LRU로 밀려난다
+_SHARED = LRUCache(SHARED_MAX_ENTRIES)
+
+@cached
+def _cached_read(sig: tuple, name: str, columns: tuple | None, where: tuple,
+                 compact: bool) -> pd.DataFrame:
+    return read(name, sig, columns, where, compact)
+
+@cached
+def _cached_keys(sig: tuple, table: str, col: str, keys: tuple,
+                 columns: tuple | None) -> pd.DataFrame:
+    return read_keys(table, sig, col, keys, columns)
+
+def _frame(name: str, columns, where: tuple, compact: bool, shared: bool) -> pd.DataFrame:
+    sig, columns = signature(), normalize_columns(columns)
+    if not shared:
+        return _cached_read(sig, name, columns, where, compact).copy()
+    key = (sig, name, columns, where, compact)
+    frame = _SHARED.get(key)
+    if frame is MISSING:
+        frame = share(_cached_read(sig, name, columns, where, compact))
+        _SHARED.set(key, frame)
+    return frame
+
+def load_all_deal(columns: list[str] | None = None, shared: bool = False,
+                  compact: bool = False, **filters) -> pd.DataFrame:
+    return _frame("all_deal", columns, build_where(filters), compact, shared)
+
+def load_won_deal(columns: list[str] | None = None, shared: bool = False,
+                  compact: bool = False, **filters) -> pd.DataFrame:
+    return _frame("won_deal", columns, build_where(filters), compact, shared)
+
+def load_retention(columns: list[str] | None = None, shared: bool = False,
+                   compact: bool = False) -> pd.DataFrame:
+    return _frame("retention", columns, (), compact, shared)
+
+def load_accounting(columns: list[str] | None = None, shared: bool = False,
+                    compact: bool = False) -> pd.DataFrame:
+    return _frame("accounting", columns, (), compact, shared)
+
+def load_deal_facts(kind: str = "all", columns: list[str] | None = None,
+                    shared: bool = False, compact: bool = False, **filters) -> pd.DataFrame:
+    if kind not in FACT_TABLES:
+        raise KeyError(kind)
+    return _frame(f"facts:{kind}", columns, build_where(filters), compact, shared)
+
+def load_deal_cube(columns: list[str] | None = None, shared: bool = False,
+                   compact: bool = False, **filters) -> pd.DataFrame:
+    return _frame(CUBE_TABLE, columns, build_where(filters, CUBE_FILTER_COLS), compact, shared)
+
+def get_deals_by_company(names, kind: str = "all",
+                         columns: list[str] | None = None) -> pd.DataFrame:
+    return _cached_keys(signature(), *lookup_args("company", names, kind, columns)).copy()
+
+def get_deals_by_course(ids, kind: str = "all",
+                        columns: list[str] | None = None) -> pd.DataFrame:
+    return _cached_keys(signature(), *lookup_args("course", ids, kind, columns)).copy()
+
+def get_deals_by_id(ids, kind: str = "all",
+                    columns: list[str] | None = None) -> pd.DataFrame:
+    return _cached_keys(signature(), *lookup_args("id", ids, kind, columns)).copy()
+
+def data_version() -> tuple:
+    """서빙 중인 데이터 버전. 파생 결과를 직접 캐시할 때 키로 쓴다 (cached 참고)."""
+    return signature()
+
+def memory_report(tables: list[str] | None = None, by_column: bool = False) -> pd.DataFrame:
+    """
+    테이블별 메모리 사용량: 기본 로더 dtype vs compact=True (memory_usage(deep=True) 기준, MB).
+    by_column=True면 컬럼별로 (compact에서 바뀐 dtype 포함).
+    """
+    sig = signature()
+    rows = []
+    for table in tables or list(FILES):
+        before = _read_table(table, sig)
+        after = _compact(before.copy(), table)
+        if by_column:
+            mb, ma = before.memory_usage(deep=True, index=False), after.memory_usage(deep=True, index=False)
+            for c in before.columns:
+                rows.append({"table": table, "column": c,
+                             "dtype": str(before[c].dtype), "compact_dtype": str(after[c].dtype),
+                             "before_mb": mb[c] / 2**20, "after_mb": ma[c] / 2**20})
+        else:
+            rows.append({"table": table, "rows": len(before), "columns": before.shape[1],
+                         "before_mb": before.memory_usage(deep=True).sum() / 2**20,
+                         "after_mb": after.memory_usage(deep=True).sum() / 2**20})
+    out = pd.DataFrame(rows)
+    if not out.empty:
+        out["saved_pct"] = (1 - out["after_mb"] / out["before_mb"]) * 100
+    return out.round(3)
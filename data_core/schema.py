@@ -0,0 +1,228 @@
+# data_core/schema.py
+"""
+TXT 원본·큐브 등록부, SQLite 스키마/인덱스, 테이블별 dtype 스키마와 compact dtype
+"""
+
+import pathlib, os
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except Exception:  # pragma: no cover - pyarrow 없는 환경 대응
+    pa = None
+
+# ─────────────────────────── TXT → DB
+BASE = pathlib.Path(__file__).parent.parent   # 저장소 루트 (TXT·deals.db 위치)
+FILES = {
+    "all_deal":   BASE / "all deal.txt",
+    "won_deal":   BASE / "won deal.txt",
+    "retention":  BASE / "retention corp.txt",
+    "accounting": BASE / "accounting data.txt",
+}
+# 적재 때 딜 팩트(all_deal + retention)로 미리 만드는 월별 집계 큐브: 테이블 → 차원.
+# 페이지 묶음별로 쓰는 차원만 둔다 (load_deal_cube가 요청 차원·필터를 덮는 가장 작은 큐브를 고름)
+CUBES = {
+    "deal_cube_owner": [   # 개인별 추이 (sub/4)
+        "생성년도", "생성월", "담당자_name", "팀", "기업 규모", "딜 전환 유형", "성사 가능성", "status",
+    ],
+    "deal_cube_size": [    # 기업 규모·공공 (88, 120)
+        "생성년도", "생성월", "기업 규모", "과정포맷(대)", "카테고리(대)", "딜 전환 유형", "상태",
+        "성사 가능성", "status",
+    ],
+    "deal_cube_rate": [    # 사업부 체결률 (11~14)
+        "생성년도", "생성월", "담당자_name", "팀", "고객사 유형", "기업 규모", "과정포맷(대)",
+        "카테고리(대)", "is_retention", "status", "(온라인)최초 입과 여부",
+    ],
+}
+DB = "deals.db"
+CODE_SIG = "cube-families-2026-10-17"  # 전처리 로직 바꿀 때마다 문자열 변경 → 전 테이블 재적재
+
+# SQLite는 보조 저장소: DEALS_WRITE_SQLITE=0 이면 스냅샷만 기록 (pyarrow 없으면 항상 기록)
+WRITE_SQLITE = os.getenv("DEALS_WRITE_SQLITE", "1").lower() not in ("0", "false", "")
+
+# DB는 세대마다 사본에 적재 후 통째로 교체하고 서빙 중에는 읽기만 하므로 WAL 불필요
+SCHEMA_SQL = """
+PRAGMA journal_mode=DELETE;
+PRAGMA synchronous=NORMAL;
+CREATE TABLE IF NOT EXISTS _meta (
+    table_name TEXT PRIMARY KEY,
+    digest     TEXT NOT NULL,
+    rows       INTEGER,
+    built_at   TEXT
+);
+"""
+
+# 테이블별 인덱스 (테이블을 다시 만들 때 함께 사라지므로 재적재한 테이블만, 데이터를 다 넣은 뒤 만든다)
+INDEX_SQL = {
+    "all_deal": [
+        'CREATE INDEX IF NOT EXISTS idx_all_deal_name   ON all_deal ("담당자_name")',
+        'CREATE INDEX IF NOT EXISTS idx_all_deal_year   ON all_deal ("생성년도","생성월")',
+        'CREATE INDEX IF NOT EXISTS idx_all_deal_close  ON all_deal ("수주예정년도")',
+        'CREATE INDEX IF NOT EXISTS idx_all_deal_status ON all_deal ("상태")',
+        'CREATE INDEX IF NOT EXISTS idx_all_deal_ctype  ON all_deal ("고객사 유형")',
+        'CREATE INDEX IF NOT EXISTS idx_all_deal_format ON all_deal ("과정포맷(대)")',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_all_deal_id ON all_deal ("id")',
+        'CREATE INDEX IF NOT EXISTS idx_all_deal_course  ON all_deal ("코스 ID")',
+        'CREATE INDEX IF NOT EXISTS idx_all_deal_company ON all_deal ("기업명")',
+    ],
+    "won_deal": [
+        'CREATE INDEX IF NOT EXISTS idx_won_deal_name   ON won_deal ("담당자_name")',
+        'CREATE INDEX IF NOT EXISTS idx_won_deal_year   ON won_deal ("생성년도","생성월")',
+        'CREATE INDEX IF NOT EXISTS idx_won_deal_close  ON won_deal ("수주예정년도")',
+        'CREATE INDEX IF NOT EXISTS idx_won_deal_status ON won_deal ("상태")',
+        'CREATE INDEX IF NOT EXISTS idx_won_deal_ctype  ON won_deal ("고객사 유형")',
+        'CREATE INDEX IF NOT EXISTS idx_won_deal_format ON won_deal ("과정포맷(대)")',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_won_deal_id ON won_deal ("id")',
+        'CREATE INDEX IF NOT EXISTS idx_won_deal_course  ON won_deal ("코스 ID")',
+        'CREATE INDEX IF NOT EXISTS idx_won_deal_company ON won_deal ("기업명")',
+    ],
+    **{t: [f'CREATE INDEX IF NOT EXISTS idx_{t}_month ON {t} ("생성년도","생성월")']
+          + ([f'CREATE INDEX IF NOT EXISTS idx_{t}_name  ON {t} ("담당자_name")'] if "담당자_name" in dims else [])
+       for t, dims in CUBES.items()},
+    "accounting": [
+        'CREATE INDEX IF NOT EXISTS idx_acc_course ON accounting ("코스 ID")',
+        'CREATE INDEX IF NOT EXISTS idx_acc_month  ON accounting ("집계년","집계월")',
+    ],
+}
+
+# 로더 필터 인자 → 컬럼. 저장소 단계에서 IN (...) 조건으로 적용 (위 인덱스 사용)
+FILTER_COLS = {
+    "years":         "생성년도",
+    "close_years":   "수주예정년도",
+    "status":        "상태",
+    "customer_type": "고객사 유형",
+    "owners":        "담당자_name",
+    "formats":       "과정포맷(대)",
+}
+
+# ─────────────────────────── 테이블 스키마
+# 적재 시 1회 적용해 스냅샷/SQLite에 타입 그대로 저장하고, 로드 시 같은 스키마로 dtype을 복원한다.
+# - dates:      날짜 (DATE_FORMAT 고정 파싱, 실패→NaT)
+# - ints:       nullable 정수(Int64) — 연/월/일 등
+# - floats:     실수
+# - amounts:    금액 (콤마 제거 후 숫자화, 결측→0)
+# - bools:      nullable 불리언(boolean)
+# - categories: 값 종류가 적은 문자열. 저장은 문자열, 로드 시 categories=True일 때만 category로 복원
+#               (페이지들이 fillna("")/신규 값 대입을 하므로 기본 로더는 문자열 유지)
+DATE_FORMAT = "%Y-%m-%d"
+
+DEAL_SCHEMA = {
+    "dates": [
+        "생성 날짜", "다음 연락일", "수주 예정일(종합)", "LOST 확정일", "SQL 전환일",
+        "수주 예정일", "수주 예정일(지연)", "제안서 발송일", "교육 시작월(예상)",
+        "수강시작일", "수강종료일", "계약 체결일",
+    ],
+    "ints": ["생성년도", "생성월", "생성일", "체결년도", "체결월", "수주예정년도", "수주예정월"],
+    "floats": [
+        "예상 체결액", "실제 수주액", "금액", "체결 리드타임", "교육 기간", "Net",
+        "강사료1", "강사료2", "강사료3",
+    ],
+    "amounts": ["수주 예정액(종합)"],
+    "bools": ["입찰/PT 여부", "(온라인)최초 입과 여부", "real won"],
+    "categories": [
+        "팀_0_name", "담당자_name", "파이프라인_name", "파이프라인 단계_name", "상태", "성사 가능성",
+        "딜 전환 유형", "카테고리", "과정포맷", "신규/기존", "운영 담당자", "기업 규모", "파트 명",
+        "업종", "Label", "생성분기", "체결분기", "고객사 유형", "과정포맷(대)", "카테고리(대)",
+        "온라인출강 구분", "(온라인)입과 주기",
+    ],
+}
+
+CUBE_SCHEMA = {
+    "ints": ["생성년도", "생성월", "deals"],
+    "floats": ["amount"],
+    "bools": ["is_retention", "(온라인)최초 입과 여부"],
+    "categories": [
+        "담당자_name", "팀", "고객사 유형", "기업 규모", "과정포맷(대)", "카테고리(대)",
+        "딜 전환 유형", "상태", "성사 가능성", "status",
+    ],
+}
+
+SCHEMAS = {
+    "all_deal": DEAL_SCHEMA,
+    "won_deal": DEAL_SCHEMA,
+    "retention": {"categories": ["매출 티어"]},
+    **{t: CUBE_SCHEMA for t in CUBES},
+    "accounting": {
+        "dates": [
+            "결제일자", "코스개강일", "코스개강일2", "코스종강일", "집계월_월초",
+            "수강시작일", "수강종료일", "코스 개강일2", "코스 종강일",
+        ],
+        "ints": ["코스일수", "집계년", "집계월", "코스 ID"],
+        "floats": ["계약금액", "일수당결제금액", "코스ID"],
+        "bools": ["금액검증"],
+        "categories": ["사업구분", "사업 구분", "카테고리", "포맷", "수익인식방법"],
+    },
+}
+
+def _to_bool(s: pd.Series) -> pd.Series:
+    norm = s.map(lambda v: str(v).strip().upper() if pd.notna(v) else v)
+    return norm.map({"TRUE": True, "FALSE": False, "1": True, "0": False, "1.0": True, "0.0": False}).astype("boolean")
+
+def _apply_schema(df: pd.DataFrame, table: str, date_format: str = DATE_FORMAT,
+                  categories: bool = False) -> pd.DataFrame:
+    """
+    SCHEMAS[table]대로 dtype을 맞춘다. 이미 맞는 컬럼에는 사실상 no-op.
+    - 적재 시: 원본 TXT 문자열 → 고정 포맷 파싱
+    - SQLite 폴백 로드 시: date_format="ISO8601" (TEXT로 저장된 날짜 복원)
+    """
+    schema = SCHEMAS.get(table, {})
+    cols = set(df.columns)
+    for c in schema.get("dates", []):
+        if c in cols and not pd.api.types.is_datetime64_any_dtype(df[c]):
+            df[c] = pd.to_datetime(df[c], format=date_format, errors="coerce")
+    for c in schema.get("ints", []):
+        if c in cols and str(df[c].dtype) != "Int64":
+            df[c] = pd.to_numeric(df[c], errors="coerce").round().astype("Int64")
+    for c in schema.get("floats", []):
+        if c in cols:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+    for c in schema.get("amounts", []):
+        if c in cols:
+            if not pd.api.types.is_numeric_dtype(df[c]):
+                df[c] = df[c].astype(str).str.replace(",", "", regex=False)
+            df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype("float64")
+    for c in schema.get("bools", []):
+        if c in cols and str(df[c].dtype) != "boolean":
+            df[c] = _to_bool(df[c])
+    if categories:
+        for c in schema.get("categories", []):
+            if c in cols:
+                df[c] = df[c].astype("category")
+    return df
+
+# ─────────────────────────── 메모리 절약 dtype (compact=True)
+# 스키마의 categories → category, 나머지 문자열 컬럼 → Arrow 문자열.
+# Arrow 문자열은 NaN 결측 의미론(pandas 3 기본 str과 동일)이라 ==/isin 결과가 numpy bool로 유지된다.
+def _arrow_string_dtype():
+    if pa is None:
+        return None
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)   # pandas ≥ 2.3
+    except TypeError:
+        try:
+            return pd.StringDtype("pyarrow_numpy")          # pandas 2.1 ~ 2.2
+        except (TypeError, ValueError):
+            return None
+
+STRING_DTYPE = _arrow_string_dtype()
+
+def _is_text(s: pd.Series) -> bool:
+    if s.dtype == object:
+        return pd.api.types.infer_dtype(s, skipna=True) in ("string", "empty")
+    return isinstance(s.dtype, pd.StringDtype)
+
+def _compact(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    문자열 컬럼을 메모리 절약 dtype으로. 숫자/날짜 컬럼과 문자열·숫자가 섞인 컬럼은 그대로.
+    category는 신규 값 대입/fillna(새 값)가 안 되므로 그런 페이지는 compact를 쓰지 않는다.
+    """
+    cats = set(SCHEMAS.get(table, {}).get("categories", []))
+    for c in df.columns:
+        if not _is_text(df[c]):
+            continue
+        if c in cats:
+            df[c] = df[c].astype("category")
+        elif STRING_DTYPE is not None and df[c].dtype != STRING_DTYPE:
+            df[c] = df[c].astype(STRING_DTYPE)
+    return df
@@ -0,0 +1,171 @@
+# data_core/snapshot.py
+"""
+세대(generation) 디렉터리와 스냅샷(Arrow IPC) 저장소 (쓰기·이월·필터 읽기)
+"""
+
+import pathlib, os, shutil
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except Exception:  # pragma: no cover - pyarrow 없는 환경 대응
+    pa = pc = None
+
+from .schema import BASE, DATE_FORMAT
+
+# ─────────────────────────── 세대(generation)
+# 적재할 때마다 새 세대 번호로 deals_snapshot/gen-XXXXXX/ 에 스냅샷을 만들고,
+# 끝나면 GENERATION 파일을 바꿔 한 번에 전환한다. 캐시 키도 세대 번호.
+SNAPSHOT_DIR = BASE / "deals_snapshot"
+GEN_FILE = SNAPSHOT_DIR / "GENERATION"   # 현재 서빙 중인 세대 번호 (rename으로 원자적 교체)
+KEEP_GENERATIONS = 2                      # 직전 세대는 아직 읽는 세션을 위해 남겨 둔다
+_GEN = {"value": None}   # 프로세스가 서빙 중인 세대 (감시 스레드/적재가 갱신, 로더는 이 값만 읽음)
+
+def _gen_dir(gen: int) -> pathlib.Path:
+    return SNAPSHOT_DIR / f"gen-{gen:06d}"
+
+def _current_generation() -> int:
+    try:
+        return int(GEN_FILE.read_text().strip())
+    except (OSError, ValueError):
+        return 0
+
+def _write_generation(gen: int) -> None:
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = GEN_FILE.with_suffix(".tmp")
+    tmp.write_text(str(gen))
+    os.replace(tmp, GEN_FILE)
+    _GEN["value"] = gen
+
+def _prune_generations(current: int) -> None:
+    """오래된 세대 폴더 삭제 (이미 memory-map한 세션은 파일이 지워져도 계속 읽을 수 있음)."""
+    for d in SNAPSHOT_DIR.glob("gen-*"):
+        try:
+            g = int(d.name[4:])
+        except ValueError:
+            continue
+        if g <= current - KEEP_GENERATIONS:
+            shutil.rmtree(d, ignore_errors=True)
+    for f in SNAPSHOT_DIR.glob("*.arrow"):   # 세대 도입 전 평면 구조 파일
+        f.unlink(missing_ok=True)
+
+# ─────────────────────────── 스냅샷(Arrow IPC) 저장소
+def _snapshot_path(table: str, gen: int | None = None) -> pathlib.Path:
+    return _gen_dir(_current_generation() if gen is None else gen) / f"{table}.arrow"
+
+def _to_arrow(df: pd.DataFrame) -> "pa.Table":
+    """타입이 섞인 object 컬럼(예: 문자열+숫자)은 문자열로 맞춰 Arrow 변환 실패를 피한다."""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        out = df.copy()
+        for c in out.columns:
+            if out[c].dtype == object:
+                try:
+                    pa.array(out[c], from_pandas=True)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    out[c] = out[c].where(out[c].isna(), out[c].astype(str))
+        return pa.Table.from_pandas(out, preserve_index=False)
+
+def _write_snapshot(table: str, df: pd.DataFrame, gen: int) -> None:
+    """임시 파일에 쓴 뒤 rename → 읽는 쪽은 항상 완결된 파일만 본다."""
+    path = _snapshot_path(table, gen)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".arrow.tmp")
+    tbl = _to_arrow(df)
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, tbl.schema) as writer:
+            writer.write_table(tbl)
+    os.replace(tmp, path)
+
+class _SnapshotAppender:
+    """
+    청크 단위로 같은 IPC 파일에 record batch를 이어 쓴다. 스키마는 첫 청크 기준
+    (전부 결측이라 null 타입인 컬럼은 string으로). close()에서 rename.
+    """
+
+    def __init__(self, table: str, gen: int):
+        self.path = _snapshot_path(table, gen)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp = self.path.with_suffix(".arrow.tmp")
+        self.schema = None
+        self._sink = self._writer = None
+
+    @staticmethod
+    def _stable(field: "pa.Field", col) -> "pa.Field":
+        """첫 청크에서 전부 결측인 컬럼은 추론된 타입이 불안정 → string / 기본 날짜 단위로."""
+        if pa.types.is_null(field.type):
+            return field.with_type(pa.string())
+        if pa.types.is_timestamp(field.type) and col.null_count == len(col):
+            return field.with_type(pa.timestamp(_DATE_UNIT, tz=field.type.tz))
+        return field
+
+    def write(self, df: pd.DataFrame) -> None:
+        tbl = _to_arrow(df)
+        if self._writer is None:
+            self.schema = pa.schema(
+                [self._stable(f, tbl.column(i)) for i, f in enumerate(tbl.schema)],
+                metadata=tbl.schema.metadata)
+            self._sink = pa.OSFile(str(self.tmp), "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+        self._writer.write_table(tbl.cast(self.schema))
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._sink.close()
+        os.replace(self.tmp, self.path)
+
+_DATE_UNIT = np.datetime_data(                                    # 날짜 파싱 결과 단위 (pandas 2: ns, 3: us)
+    pd.to_datetime(pd.Series(["2000-01-01"]), format=DATE_FORMAT).dtype)[0]
+
+def _carry_snapshot(table: str, src_gen: int, dst_gen: int) -> None:
+    """바뀌지 않은 테이블은 이전 세대 파일을 새 세대로 하드링크 (불가하면 복사)."""
+    src, dst = _snapshot_path(table, src_gen), _snapshot_path(table, dst_gen)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def _arrow_mask(tbl: "pa.Table", where: tuple) -> "pa.ChunkedArray":
+    mask = None
+    for col, values in where:
+        if col not in tbl.column_names:
+            raise KeyError(col)
+        arr = tbl[col]
+        value_set = pa.array(list(values))
+        try:
+            value_set = value_set.cast(arr.type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            pass
+        m = pc.is_in(arr, value_set=value_set)
+        mask = m if mask is None else pc.and_(mask, m)
+    return mask
+
+def _read_snapshot(table: str, columns: tuple | None = None,
+                   where: tuple = (), gen: int | None = None) -> pd.DataFrame | None:
+    """
+    columns가 주어지면 해당 컬럼 + 조건 컬럼만 남긴 뒤 필터하고, 조건에만 쓴 컬럼은 변환 전에 뺀다
+    (필터가 나머지 컬럼까지 복사하지 않고, memory-map에서도 읽히지 않음).
+    where가 주어지면 조건 컬럼만 훑어 마스크를 만들고, 일치하는 행만 변환한다.
+    """
+    path = _snapshot_path(table, gen)
+    if pa is None or not path.exists():
+        return None
+    src = pa.memory_map(str(path), "r")
+    tbl = pa.ipc.open_file(src).read_all()
+    keep = None
+    if columns is not None:
+        keep = [c for c in columns if c in tbl.column_names]
+        extra = [c for c, _ in where if c not in keep and c in tbl.column_names]
+        tbl = tbl.select(keep + extra)
+    if where:
+        tbl = tbl.filter(_arrow_mask(tbl, where))
+    if keep is not None and tbl.num_columns != len(keep):
+        tbl = tbl.select(keep)
+    return tbl.to_pandas()
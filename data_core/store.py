@@ -0,0 +1,156 @@
+# data_core/store.py
+"""
+저장소 읽기: 스레드별 읽기 전용 연결, SQLite 폴백 SELECT, 필터 정규화, 키 조회
+"""
+
+import sqlite3, os, functools
+import numpy as np
+import pandas as pd
+
+from db_pool import ReadOnlyPool
+
+try:
+    import pyarrow as pa
+except Exception:  # pragma: no cover - pyarrow 없는 환경 대응
+    pa = None
+
+from .schema import DB, FILTER_COLS, _apply_schema, _compact
+from .snapshot import _DATE_UNIT, _read_snapshot, _snapshot_path
+
+# ─────────────────────────── 연결 (스레드별 읽기 전용, 세대가 바뀌면 재연결)
+_POOL = ReadOnlyPool(DB)
+
+def _conn(sig: tuple) -> sqlite3.Connection:
+    return _POOL.connection(sig[0])
+
+def _quote(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+def _select_sql(con: sqlite3.Connection, table: str, columns: tuple | None,
+                where: tuple = ()) -> tuple[str, list]:
+    """원본 행 순서(rowid)를 유지하는 SELECT — 스냅샷 경로와 같은 순서로 돌려준다."""
+    existing = {r[1] for r in con.execute(f'PRAGMA table_info("{table}")')}
+    if columns is None:
+        sql = f'SELECT * FROM "{table}"'
+    else:
+        cols = [c for c in columns if c in existing]
+        sql = (f'SELECT {", ".join(map(_quote, cols))} FROM "{table}"' if cols
+               else f'SELECT * FROM "{table}" WHERE 0')
+    conds, params = [], []
+    for col, values in where:
+        if col not in existing:
+            raise KeyError(col)
+        conds.append(f'{_quote(col)} IN ({", ".join("?" * len(values))})')
+        params.extend(values)
+    if conds:
+        sql += (" AND " if sql.endswith("WHERE 0") else " WHERE ") + " AND ".join(conds)
+    return sql + " ORDER BY rowid", params
+
+# SQLite 선언 타입 → 결과가 전부 NULL(또는 0행)이라 object로 읽힌 컬럼의 dtype (스냅샷과 맞춤)
+_SQLITE_DTYPES = {"REAL": "float64", "TIMESTAMP": f"datetime64[{_DATE_UNIT}]"}
+
+def _read_sql(con: sqlite3.Connection, table: str, columns: tuple | None = None,
+              where: tuple = ()) -> pd.DataFrame:
+    """
+    SQLite 폴백 읽기. 스키마(SCHEMAS)로 dtype을 복원하고, 스키마에 없는 컬럼 중 값이 전부 결측이라
+    object가 된 숫자/날짜 컬럼은 테이블에 선언된 타입으로 맞춘다 (필터 결과가 비어도 같은 dtype).
+    """
+    sql, params = _select_sql(con, table, columns, where)
+    df = _apply_schema(pd.read_sql_query(sql, con, params=params), table, date_format="ISO8601")
+    decl = {r[1]: r[2] for r in con.execute(f'PRAGMA table_info("{table}")')}
+    for c in df.columns:
+        if df[c].dtype != object or df[c].notna().any():
+            continue
+        if decl.get(c) == "INTEGER" and not len(df):   # 결측 없는 int64 컬럼 → 0행일 때만 object
+            df[c] = df[c].astype("int64")
+        elif decl.get(c) in _SQLITE_DTYPES:
+            df[c] = df[c].astype(_SQLITE_DTYPES[decl[c]])
+    return df
+
+def _read_table(table: str, sig: tuple, columns: tuple | None = None,
+                where: tuple = (), compact: bool = False) -> pd.DataFrame:
+    """
+    스냅샷 우선(dtype 그대로), 없으면 SQLite에서 읽어 스키마로 dtype 복원.
+    columns: 읽을 컬럼(요청 순서 유지). 저장소에 없는 컬럼은 건너뛴다.
+    where:   ((컬럼, (값, ...)), ...) — 컬럼 값이 목록에 있는 행만 읽는다 (build_where 참고).
+    compact: 문자열 컬럼을 category / Arrow 문자열로 (_compact 참고).
+    """
+    df = _read_snapshot(table, columns, where, gen=sig[0])
+    if df is None:
+        df = _read_sql(_conn(sig), table, columns, where)
+    return _compact(df, table) if compact else df
+
+def normalize_columns(columns) -> tuple | None:
+    """캐시 키용 정규화: 리스트 → 중복 제거한 tuple (projection마다 별도 캐시)."""
+    if columns is None:
+        return None
+    if isinstance(columns, str):
+        columns = [columns]
+    return tuple(dict.fromkeys(columns))
+
+def build_where(filters: dict, mapping: dict = FILTER_COLS) -> tuple:
+    """
+    로더 필터 인자(FILTER_COLS 키) → 캐시 키로 쓸 수 있는 ((컬럼, (값, ...)), ...).
+    값은 스칼라 또는 리스트. None인 인자는 무시.
+    """
+    unknown = set(filters) - set(mapping)
+    if unknown:
+        raise TypeError(f"unknown filter(s): {', '.join(sorted(unknown))}")
+    out = []
+    for key, values in filters.items():
+        if values is None:
+            continue
+        if isinstance(values, str) or not hasattr(values, "__iter__"):
+            values = [values]
+        values = tuple(dict.fromkeys(v.item() if hasattr(v, "item") else v for v in values))
+        out.append((mapping[key], values))
+    return tuple(sorted(out, key=lambda kv: kv[0]))
+
+# ─────────────────────────── 키 조회 (id / 코스 ID / 기업명 → 일치하는 행만)
+# SQLite는 INDEX_SQL의 인덱스로, 스냅샷은 세대마다 한 번 만든 '값 → 행 번호' 사전으로 찾아
+# 일치하는 행만 꺼낸다 (테이블 전체를 읽거나 복사하지 않음). 값은 문자열로 비교한다.
+LOOKUP_COLS = {"id": "id", "course": "코스 ID", "company": "기업명"}
+LOOKUP_MAX_ENTRIES = int(os.getenv("DEALS_LOOKUP_MAX_ENTRIES", "256"))   # 조회 결과 캐시 개수
+
+def _keys(values) -> tuple:
+    """스칼라/리스트 → 중복 없는 문자열 tuple (결측 제외, 234456.0 → '234456')."""
+    if isinstance(values, str) or not hasattr(values, "__iter__"):
+        values = [values]
+    out = []
+    for v in values:
+        if pd.isna(v):
+            continue
+        v = v.item() if hasattr(v, "item") else v
+        if isinstance(v, float) and v.is_integer():
+            v = int(v)
+        out.append(str(v))
+    return tuple(dict.fromkeys(out))
+
+def _open_snapshot(table: str, gen: int) -> "pa.Table | None":
+    path = _snapshot_path(table, gen)
+    if pa is None or not path.exists():
+        return None
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+@functools.lru_cache(maxsize=8)
+def _key_positions(table: str, col: str, gen: int) -> dict | None:
+    """스냅샷 컬럼 값 → 행 번호(오름차순) 배열. 스냅샷이 없으면 None (SQLite 인덱스로 조회)."""
+    tbl = _open_snapshot(table, gen)
+    if tbl is None:
+        return None
+    if col not in tbl.column_names:
+        raise KeyError(col)
+    keys = tbl[col].to_pandas()
+    return keys.groupby(keys.astype(str).where(keys.notna()), sort=False).indices if len(keys) else {}
+
+def read_keys(table: str, sig: tuple, col: str, keys: tuple,
+               columns: tuple | None = None) -> pd.DataFrame:
+    pos = _key_positions(table, col, sig[0])
+    if pos is None:
+        return _read_table(table, sig, columns, ((col, keys),))
+    hits = [pos[k] for k in keys if k in pos]
+    rows = np.sort(np.concatenate(hits)) if hits else np.array([], dtype=np.int64)
+    tbl = _open_snapshot(table, sig[0])
+    if columns is not None:
+        tbl = tbl.select([c for c in columns if c in tbl.column_names])
+    return tbl.take(pa.array(rows, type=pa.int64())).to_pandas()
@@ -0,0 +1,75 @@
+# db_pool.py
+"""
+SQLite 읽기 전용 연결 풀 (스레드별)
+────────────────────────────────────────
+· Streamlit 세션 스레드마다 자기 연결을 쓴다 → 한 핸들에 읽기가 몰리지 않음
+· URI mode=ro 로 열어 서빙 중 DB를 건드리지 않고, mmap_size / cache_size PRAGMA 적용
+· generation(세대 토큰)이 바뀌면 해당 스레드의 연결을 닫고 새로 연다
+  (DB 파일이 rename으로 교체돼도 이전 연결은 이전 파일을 계속 보므로, 세대가 바뀌면 재연결)
+· 사용 법:   pool = ReadOnlyPool("deals.db")
+             con = pool.connection(generation)   # 같은 스레드·같은 세대면 같은 연결
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Hashable, Optional
+
+MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))   # bytes
+CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_KIB", str(64 * 1024)))      # 연결당 페이지 캐시
+
+
+def open_readonly(path: Path | str, mmap_size: int = MMAP_SIZE,
+                  cache_kib: int = CACHE_SIZE_KIB) -> sqlite3.Connection:
+    """읽기 전용 URI 연결 + PRAGMA (파일이 없으면 sqlite3.OperationalError)."""
+    uri = Path(path).resolve().as_uri() + "?mode=ro"
+    con = sqlite3.connect(uri, uri=True)
+    con.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+    con.execute(f"PRAGMA cache_size={-int(cache_kib)}")   # 음수 = KiB 단위
+    return con
+
+
+def file_generation(path: Path | str) -> Optional[tuple]:
+    """파일 교체/갱신을 감지하는 세대 토큰 (inode, mtime). 파일이 없으면 None."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+
+class ReadOnlyPool:
+    """DB 파일 하나에 대한 스레드별 읽기 전용 연결."""
+
+    def __init__(self, path: Path | str, mmap_size: int = MMAP_SIZE,
+                 cache_kib: int = CACHE_SIZE_KIB):
+        self.path = Path(path)
+        self.mmap_size = mmap_size
+        self.cache_kib = cache_kib
+        self._local = threading.local()
+
+    def connection(self, generation: Hashable = None) -> sqlite3.Connection:
+        """
+        현재 스레드의 연결. generation이 이전 호출과 다르면 재연결.
+        스레드가 끝나면 threading.local과 함께 연결도 정리된다.
+        """
+        local = self._local
+        con = getattr(local, "con", None)
+        if con is not None and local.generation == generation:
+            return con
+        if con is not None:
+            con.close()
+            local.con = None
+        local.con = open_readonly(self.path, self.mmap_size, self.cache_kib)
+        local.generation = generation
+        return local.con
+
+    def close(self) -> None:
+        """현재 스레드의 연결을 닫는다 (다른 스레드 연결은 각자 정리)."""
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
@@ -8,7 +8,8 @@ import pandas as pd
 import streamlit as st
 from pandas.tseries import offsets
 
-from data import load_won_deal
+from calendar_dim import month_overlap_days
+from data import load_won_deal, render_refresh_notice
 
 WON_PER_EOK = 100_000_000
 TARGET_YEAR = 2026
@@ -94,6 +95,7 @@ class MedianLookup:
 def set_page() -> None:
     st.set_page_config(page_title="2026 P&L Projection", layout="wide")
     st.title("2026 P&L Projection")
+    render_refresh_notice()
 
 
 def to_eok(series: pd.Series) -> pd.Series:
@@ -180,23 +182,28 @@ def compute_monthly_allocation(
     total_days = (end - start).days + 1
     if total_days <= 0:
         return arr
-    window_start = pd.Timestamp(year=year, month=1, day=1)
-    window_end = pd.Timestamp(year=year, month=12, day=31)
-    overlap_start = max(start, window_start)
-    overlap_end = min(end, window_end)
-    if overlap_start > overlap_end:
-        return arr
-
+    days = month_overlap_days([start], [end], year)[0]
     daily = amount / total_days
-    for month in MONTH_LABELS:
-        month_start = pd.Timestamp(year=year, month=month, day=1)
-        month_end = month_start + offsets.MonthEnd(0)
-        seg_start = max(overlap_start, month_start)
-        seg_end = min(overlap_end, month_end)
-        days = (seg_end - seg_start).days + 1
-        if days > 0:
-            arr[month - 1] = daily * days
-    return arr
+    return np.where(days > 0, daily * days, 0.0)
+
+
+def allocate_monthly(df: pd.DataFrame, year: int = TARGET_YEAR) -> np.ndarray:
+    """
+    행마다 compute_monthly_allocation(수강시작일, 수강종료일, 체결액)을 한 번에 계산 → (행 수, 12).
+    월 경계는 공통 달력 차원의 배열 조회로 구한다.
+    """
+    start = pd.to_datetime(df.get("수강시작일"), errors="coerce")
+    end = pd.to_datetime(df.get("수강종료일"), errors="coerce")
+    amount = (
+        pd.to_numeric(df["체결액"], errors="coerce").to_numpy(dtype=float)
+        if "체결액" in df.columns
+        else np.zeros(len(df))
+    )
+    total_days = ((end - start).dt.days + 1).to_numpy(dtype=float)
+    ok = start.notna().to_numpy() & end.notna().to_numpy() & ~(amount <= 0) & (total_days > 0)
+    daily = np.where(ok, amount / np.where(ok, total_days, 1.0), 0.0)
+    days = month_overlap_days(start, end, year)
+    return np.where(ok[:, None] & (days > 0), daily[:, None] * days, 0.0)
 
 
 def backsolve_booking_amount(
@@ -576,15 +583,7 @@ def simulate_new_deals(
 
 def add_revenue_columns(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
-    df["monthly_rev"] = df.apply(
-        lambda row: compute_monthly_allocation(
-            row["수강시작일"], row["수강종료일"], row["체결액"]
-        ),
-        axis=1,
-    )
-    df["monthly_rev"] = df["monthly_rev"].apply(
-        lambda arr: arr if isinstance(arr, np.ndarray) else np.zeros(12, dtype=float)
-    )
+    df["monthly_rev"] = list(allocate_monthly(df))
     df["rev_2026"] = df["monthly_rev"].apply(np.sum)
     return df
 
@@ -797,15 +796,7 @@ def carryover_table(all_deals: pd.DataFrame) -> pd.DataFrame:
             }
         )
     future = all_deals.copy()
-    future["rev_2027"] = future.apply(
-        lambda row: compute_monthly_allocation(
-            row.get("수강시작일"),
-            row.get("수강종료일"),
-            row.get("체결액", 0.0),
-            year=TARGET_YEAR + 1,
-        ).sum(),
-        axis=1,
-    )
+    future["rev_2027"] = allocate_monthly(future, year=TARGET_YEAR + 1).sum(axis=1)
     start_2028 = pd.Timestamp(year=TARGET_YEAR + 2, month=1, day=1)
 
     def revenue_after_date(row: pd.Series, start_date: pd.Timestamp) -> float:
@@ -2,9 +2,11 @@ import altair as alt
 import pandas as pd
 import streamlit as st
 
-from data import load_won_deal
+from calendar_dim import lookup
+from data import load_won_deal, render_refresh_notice
 
 st.set_page_config(page_title="월별 체결액 (2024-2025)", layout="wide")
+render_refresh_notice()
 alt.data_transformers.disable_max_rows()
 
 YEAR_START = 2024
@@ -41,7 +43,7 @@ def derive_schedule_year_month(df: pd.DataFrame) -> pd.DataFrame:
 
 @st.cache_data(show_spinner=False)
 def load_base() -> pd.DataFrame:
-    df = load_won_deal().copy()
+    df = load_won_deal(shared=True).copy()
     df = derive_schedule_year_month(df)
 
     status_col = df["상태"] if "상태" in df.columns else pd.Series("", index=df.index)
@@ -72,7 +74,7 @@ def load_base() -> pd.DataFrame:
     df = df[pd.notna(df["연월_dt"])].copy()
     df["연월_label"] = df["연월_dt"].dt.strftime("%Y-%m")
     df["연도_label"] = df["_예정연"].astype("Int64").astype(str)
-    df["분기_label"] = df["연월_dt"].dt.to_period("Q").astype(str)
+    df["분기_label"] = lookup(df["연월_dt"], "quarter_label")
     return df
 
 
@@ -5,9 +5,10 @@ import numpy as np
 import re
 import json
 
-from data import load_won_deal, load_all_deal  # ← all_deal 로더 추가
+from data import load_won_deal, get_deals_by_company, render_refresh_notice
 
 st.set_page_config(page_title="기업별 온라인/출강 구분 매출 (Won)", layout="wide")
+render_refresh_notice()
 st.title("기업별 온라인·출강 구분 매출 피벗 (Won 기준)")
 st.caption("열: 기업명, 체결액 구분, YYYY년 체결액 합, YY01~YY12(수주예정월 기준) · 값: 수주 예정액(종합) 합(억)")
 
@@ -52,7 +53,7 @@ def fmt_eok(v: float) -> str:
 @st.cache_data(show_spinner=False)
 def load_base():
     """Won Deal 전체 로드 후 공통 전처리(연/월/금액 숫자화, 상태=Won, 보조 컬럼)."""
-    df = load_won_deal().copy()
+    df = load_won_deal(shared=True).copy()
 
     # 필수 숫자화
     for c in ["수주예정년도", "수주예정월", "수주 예정액(종합)"]:
@@ -252,14 +253,14 @@ def build_company_json_all_deal(company_name: str) -> dict:
     """
     all_deal 기준으로 2024, 2025 데이터를 동시에 JSON으로 반환.
     """
-    df_all = load_all_deal().copy()
-
     # 필요한 컬럼만 안전 확보(없으면 생성)
     needed = [
         "생성 날짜","기업명","이름","담당자_name","상태","성사 가능성","수주 예정일(종합)","수주 예정액(종합)",
         "딜 전환 유형","카테고리(대)","과정포맷(대)","수강시작일","수강종료일","기업 규모","고객사 담당자명",
         "소속 상위 조직","팀(명함/메일서명)","직급(명함/메일서명)","고객 담당 교육 영역","Net","생성년도"
     ]
+    # 해당 기업 행만 인덱스로 조회 (전체 테이블 복사 없음)
+    df_all = get_deals_by_company(company_name, columns=needed + ["생성일"])
     for c in needed:
         if c not in df_all.columns:
             df_all[c] = pd.NA
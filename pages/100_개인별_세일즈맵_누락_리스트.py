@@ -23,10 +23,11 @@ import numpy as np
 import re
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from data import load_all_deal
+from data import load_all_deal, render_refresh_notice
 
 # ────────── 페이지 설정 ──────────
 st.set_page_config(page_title="데이터 품질 점검 (2024-10 이후)", layout="wide")
+render_refresh_notice()
 
 # ────────── 상수/매핑 ──────────
 TODAY = pd.Timestamp(datetime.now(ZoneInfo("Asia/Seoul")).date())
@@ -118,7 +119,7 @@ def missing_num_or_na(s: pd.Series) -> pd.Series:
     return s.isna()
 
 # ────────── 데이터 로드/정규화 ──────────
-df = load_all_deal().copy()
+df = load_all_deal(shared=True, compact=True).copy()
 
 # 담당자/팀 매핑
 df["담당자_name"] = df["담당자_name"].astype(str).str.replace(r"B$", "", regex=True)
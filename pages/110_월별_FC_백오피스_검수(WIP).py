@@ -29,9 +29,10 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
-from data import load_won_deal, load_accounting
+from data import load_won_deal, load_accounting, render_refresh_notice
 
 st.set_page_config(page_title="어카운팅 정합성 체크", layout="wide")
+render_refresh_notice()
 
 # ────────── 유틸 ──────────
 def to_num(s: pd.Series) -> pd.Series:
@@ -67,8 +68,8 @@ def ensure_col(df: pd.DataFrame, dst: str, candidates: list[str]):
         df[dst] = np.nan
 
 # ────────── 데이터 로드 ──────────
-acc_raw = load_accounting().copy()
-won_raw = load_won_deal().copy()
+acc_raw = load_accounting(shared=True, compact=True).copy()
+won_raw = load_won_deal(shared=True, compact=True).copy()
 
 # ────────── 표준화 (Accounting) ──────────
 ensure_col(acc_raw, "코스ID",       ["코스ID"])
@@ -124,8 +125,14 @@ won0 = won0[won0["코스ID"].notna()].copy()
 # ────────── 사전 제외 집합(EXCLUDE_IDS) 산출 ──────────
 CUTOFF = pd.Timestamp("2025-08-01")
 
-def _all_pre2025(df: pd.DataFrame, cid: str, start_col: str, end_col: str) -> bool:
-    sub = df[df["코스ID"] == cid]
+# 코스ID → 행 위치를 한 번 만들어 두고 코스ID별 조회는 해당 행만 꺼낸다 (ID마다 전체를 훑지 않도록)
+def _cid_positions(df: pd.DataFrame) -> dict:
+    return df.groupby("코스ID", sort=False).indices
+
+def _rows(df: pd.DataFrame, pos: dict, cid: str) -> pd.DataFrame:
+    return df.iloc[pos.get(cid, [])]
+
+def _all_pre2025(sub: pd.DataFrame, start_col: str, end_col: str) -> bool:
     if sub.empty:
         return False
     ok = sub[start_col].notna() & sub[end_col].notna()
@@ -136,6 +143,7 @@ def _all_pre2025(df: pd.DataFrame, cid: str, start_col: str, end_col: str) -> bo
     return bool((s < CUTOFF).all() and (e < CUTOFF).all())
 
 # 원본(acc0, won0)에서 중복 ID 파악
+ACC_POS, WON_POS = _cid_positions(acc0), _cid_positions(won0)
 acc_dup_ids0 = set(acc0.groupby("코스ID").size()[lambda s: s > 1].index)
 won_dup_ids0 = set(won0.groupby("코스ID").size()[lambda s: s > 1].index)
 acc_ids0     = set(acc0["코스ID"].unique())
@@ -145,18 +153,19 @@ EXCLUDE_IDS = set()
 
 # 1) accounting 중복 + won에도 존재 + 양쪽 날짜 모두 pre-2025 → 제외
 for cid in (acc_dup_ids0 & won_ids0):
-    if _all_pre2025(acc0, cid, "코스개강일2", "코스 종강일") and _all_pre2025(won0, cid, "수강시작일", "수강종료일"):
+    if _all_pre2025(_rows(acc0, ACC_POS, cid), "코스개강일2", "코스 종강일") and _all_pre2025(_rows(won0, WON_POS, cid), "수강시작일", "수강종료일"):
         EXCLUDE_IDS.add(cid)
 
 # 2) won 중복 + accounting에도 존재 + 양쪽 날짜 모두 pre-2025 → 제외
 for cid in (won_dup_ids0 & acc_ids0):
-    if _all_pre2025(won0, cid, "수강시작일", "수강종료일") and _all_pre2025(acc0, cid, "코스개강일2", "코스 종강일"):
+    if _all_pre2025(_rows(won0, WON_POS, cid), "수강시작일", "수강종료일") and _all_pre2025(_rows(acc0, ACC_POS, cid), "코스개강일2", "코스 종강일"):
         EXCLUDE_IDS.add(cid)
 
 # 사전 제외 반영(전 탭 공통)
 if EXCLUDE_IDS:
     acc0 = acc0[~acc0["코스ID"].isin(EXCLUDE_IDS)].copy()
     won0 = won0[~won0["코스ID"].isin(EXCLUDE_IDS)].copy()
+    ACC_POS, WON_POS = _cid_positions(acc0), _cid_positions(won0)
 
 # ────────── 이후 로직(사전 제외 후 데이터 기준) ──────────
 # 중복/유니크 분류
@@ -176,8 +185,8 @@ won_dups_all = won0[won0["코스ID"].isin(won_dup_ids)].copy().sort_values(["코
 # Tab① 표시 전용 추가 제외: won 미일치 & acc 중복행 모두 pre‑2025면 Tab① 숨김
 acc_dup_ids_display = []
 for cid in sorted(acc_dup_ids):
-    won_has = cid in won0["코스ID"].values
-    if (not won_has) and _all_pre2025(acc0, cid, "코스개강일2", "코스 종강일"):
+    won_has = cid in WON_POS
+    if (not won_has) and _all_pre2025(_rows(acc0, ACC_POS, cid), "코스개강일2", "코스 종강일"):
         continue  # Tab①에서만 제외
     acc_dup_ids_display.append(cid)
 acc_dups_tab1_all = (
@@ -218,8 +227,8 @@ def _covers_all(acc_rows: pd.DataFrame, S_won: pd.Timestamp, E_won: pd.Timestamp
 
 tab4_ids_long = set()
 for cid in sorted(acc_dups_tab1_all["코스ID"].dropna().unique()):
-    acc_rows = acc0[acc0["코스ID"] == cid].copy()
-    won_rows = won0[won0["코스ID"] == cid].copy()
+    acc_rows = _rows(acc0, ACC_POS, cid).copy()
+    won_rows = _rows(won0, WON_POS, cid).copy()
     if acc_rows.empty or won_rows.shape[0] != 1:
         continue
     idx, S_max, E_max = _longest_interval(acc_rows)
@@ -246,7 +255,7 @@ for cid in sorted(acc_dups_tab1_all["코스ID"].dropna().unique()):
     acc_rows_full = acc_dups_tab1_all[acc_dups_tab1_all["코스ID"] == cid][
         ["코스ID","교육과정명","사업 구분","포맷","계약금액","코스개강일2","코스 종강일"]
     ].copy()
-    won_rows = won0[won0["코스ID"] == cid].copy()
+    won_rows = _rows(won0, WON_POS, cid).copy()
     if acc_rows_full.empty or won_rows.empty:
         continue
 
@@ -304,7 +313,7 @@ with tab1:
             st.markdown("**Accounting rows**")
             st.dataframe(acc_rows_disp, use_container_width=True, hide_index=True)
 
-            won_rows = won0[won0["코스ID"] == cid].copy()
+            won_rows = _rows(won0, WON_POS, cid).copy()
             if won_rows.empty:
                 st.markdown("**Won rows** — *won deal row 부재*")
             else:
@@ -341,7 +350,7 @@ with tab2:
             tab2_won_ids.add(cid)
 
             # Accounting rows (있으면 표시, 없으면 안내)
-            acc_rows = acc0[acc0["코스ID"] == cid][
+            acc_rows = _rows(acc0, ACC_POS, cid)[
                 ["코스ID","교육과정명","사업 구분","포맷","계약금액","코스개강일2","코스 종강일"]
             ].copy()
             if acc_rows.empty:
@@ -365,11 +374,11 @@ with tab4:
             st.markdown(f"### 코스 ID: `{cid}`")
             if cid in tab4_ids_simple:
                 # 신규 규칙 케이스: 표시용 acc는 필터 적용 후의 1행을 보여줌
-                acc_rows_all = acc0[acc0["코스ID"] == cid][
+                acc_rows_all = _rows(acc0, ACC_POS, cid)[
                     ["코스ID","교육과정명","사업 구분","포맷","계약금액","코스개강일2","코스 종강일"]
                 ].copy()
                 acc_rows_disp = _filter_acc_kmb_pre2025(acc_rows_all)
-                won_rows = won0[won0["코스ID"] == cid].copy()
+                won_rows = _rows(won0, WON_POS, cid).copy()
 
                 st.markdown("**Accounting row (필터 적용 후 단일 & Won과 완전 일치)**")
                 st.dataframe(acc_rows_disp.sort_values(["코스ID","코스개강일2","코스 종강일"]),
@@ -384,10 +393,10 @@ with tab4:
                 tab4_won_ids.add(cid)
             else:
                 # 기존 규칙 케이스: acc 전체를 보여줌(분할 합계 = Won)
-                acc_rows = acc0[acc0["코스ID"] == cid][
+                acc_rows = _rows(acc0, ACC_POS, cid)[
                     ["코스ID","교육과정명","사업 구분","포맷","계약금액","코스개강일2","코스 종강일"]
                 ].copy()
-                won_rows = won0[won0["코스ID"] == cid].copy()
+                won_rows = _rows(won0, WON_POS, cid).copy()
 
                 st.markdown("**Accounting rows (합계 금액 = Won 금액)**")
                 st.dataframe(acc_rows.sort_values(["코스ID","코스개강일2","코스 종강일"]),
@@ -9,9 +9,10 @@
 
 import streamlit as st
 import pandas as pd
-from data import load_all_deal
+from data import load_all_deal, cube_monthly, load_deal_cube, render_refresh_notice
 
 st.set_page_config(page_title="공공·대학교 — 2025 월별 체결률", layout="wide")
+render_refresh_notice()
 
 # ────────── 상수 ──────────
 DETAIL_COLS = [
@@ -31,7 +32,7 @@ ONLINE_SET = {'선택구매(온라인)','구독제(온라인)','포팅'}
 STAT_MAP   = {'확정':'확정','높음':'높음','낮음':'낮음','LOW':'낮음','LOST':'LOST','LOST/중단':'LOST'}
 
 # ────────── 데이터 로드 ──────────
-df = load_all_deal().copy()
+df = load_all_deal(shared=True).copy()
 
 # 상태가 Convert인 딜 제외
 df = df[~df['상태'].fillna('').astype(str).str.strip().str.lower().eq('convert')].copy()
@@ -57,36 +58,42 @@ df['status'] = df['성사 가능성'].map(STAT_MAP).fillna('기타')
 df['수주 예정액(종합)'] = pd.to_numeric(df['수주 예정액(종합)'], errors='coerce').fillna(0.0)
 df['Net']              = pd.to_numeric(df['Net'], errors='coerce')
 
+# ────────── 집계 큐브 ──────────
+# 월별/이동평균 표는 적재 시 만든 집계 큐브를 잘라 합산 (원본 행은 상세 목록에만 사용)
+CUBE_COLS = ['생성월','기업 규모','딜 전환 유형','과정포맷(대)','카테고리(대)','상태','status']
+cube = load_deal_cube(columns=CUBE_COLS, years=2025, shared=True)
+cube = cube[~cube['상태'].fillna('').astype(str).str.strip().str.lower().eq('convert') &
+            cube['생성월'].between(1, 12)].copy()
+for c in ['카테고리(대)','과정포맷(대)','기업 규모']:
+    cube[c] = cube[c].fillna('').astype(str).str.strip()
+cube['딜 전환 유형_정리'] = cube['딜 전환 유형'].fillna('').apply(lambda x: '리텐션' if x == '리텐션' else '직접 교육 문의')
+
 # ────────── 집계 헬퍼 ──────────
-def _bucket(d: pd.DataFrame) -> pd.DataFrame:
+def _bucket(cb: pd.DataFrame) -> pd.DataFrame:
     """월별 카운트/비율/금액 표 생성"""
     tbl = pd.DataFrame(0, index=COUNT_ROWS, columns=MONTH_COLS, dtype="Int64")
     tbl.loc[RATE_ROW]   = ''
     tbl.loc[AMOUNT_ROW] = ''
 
-    if d.empty:
+    if cb.empty:
         for col in MONTH_COLS:
             tbl.loc[RATE_ROW, col]   = '0.0%'
             tbl.loc[AMOUNT_ROW, col] = '0.0억'
         return tbl
 
-    sub = d.copy()
+    md = cube_monthly(cb, by='생성월', index=MONTHS)
     for m in MONTHS:
         col = f"{m}월"
-        seg = sub[sub['생성월'] == m]
-        tot = int(len(seg))
+        r = md.loc[m]
+        tot = int(r['전체'])
         tbl.loc['전체', col] = tot
         if tot:
-            win_mask = seg['status'].isin(['확정','높음'])
-            win  = int(win_mask.sum())
-            low  = int((seg['status'] == '낮음').sum())
-            lost = int((seg['status'] == 'LOST').sum())
+            win = int(r['확정+높음'])
             tbl.loc['확정+높음', col] = win
-            tbl.loc['낮음', col]      = low
-            tbl.loc['LOST', col]      = lost
+            tbl.loc['낮음', col]      = int(r['낮음'])
+            tbl.loc['LOST', col]      = int(r['LOST'])
             tbl.loc[RATE_ROW, col]    = f"{win / tot * 100:.1f}%"
-            amt_uk = (seg.loc[win_mask, '수주 예정액(종합)'].sum() / 1e8)
-            tbl.loc[AMOUNT_ROW, col]  = f"{amt_uk:.1f}억"
+            tbl.loc[AMOUNT_ROW, col]  = f"{r['amount'] / 1e8:.1f}억"
         else:
             tbl.loc[RATE_ROW, col]   = '0.0%'
             tbl.loc[AMOUNT_ROW, col] = '0.0억'
@@ -94,39 +101,24 @@ def _bucket(d: pd.DataFrame) -> pd.DataFrame:
     tbl.loc[COUNT_ROWS] = tbl.loc[COUNT_ROWS].astype("Int64")
     return tbl
 
-def month_tbl(mask_bool: pd.Series) -> pd.DataFrame:
-    return _bucket(df[mask_bool])
+def month_tbl(cb: pd.DataFrame) -> pd.DataFrame:
+    return _bucket(cb)
 
-def roll_tbl(mask_bool: pd.Series) -> pd.DataFrame:
-    base = month_tbl(mask_bool)
+def roll_tbl(cb: pd.DataFrame) -> pd.DataFrame:
     res = pd.DataFrame(0, index=COUNT_ROWS, columns=ROLL_COLS, dtype="Int64")
     res.loc[RATE_ROW]   = ''
     res.loc[AMOUNT_ROW] = ''
 
-    if base.empty:
-        for col in ROLL_COLS:
-            res.loc[RATE_ROW, col]   = '0.0%'
-            res.loc[AMOUNT_ROW, col] = '0.0억'
-        return res
-
-    md = {m: base[f"{m}월"] for m in MONTHS}
-    seg_base = df[mask_bool].copy()
-
+    md = cube_monthly(cb, by='생성월', index=MONTHS)
     for (a, b, c), col in zip(ROLL_WINDOWS, ROLL_COLS):
-        tot  = int(md[a]['전체'])      + int(md[b]['전체'])      + int(md[c]['전체'])
-        win  = int(md[a]['확정+높음']) + int(md[b]['확정+높음']) + int(md[c]['확정+높음'])
-        low  = int(md[a]['낮음'])      + int(md[b]['낮음'])      + int(md[c]['낮음'])
-        lost = int(md[a]['LOST'])      + int(md[b]['LOST'])      + int(md[c]['LOST'])
-
+        r = md.loc[[a, b, c]].sum()
+        tot, win = int(r['전체']), int(r['확정+높음'])
         res.loc['전체', col]      = tot
         res.loc['확정+높음', col] = win
-        res.loc['낮음', col]      = low
-        res.loc['LOST', col]      = lost
+        res.loc['낮음', col]      = int(r['낮음'])
+        res.loc['LOST', col]      = int(r['LOST'])
         res.loc[RATE_ROW, col]    = f"{win / tot * 100:.1f}%" if tot else '0.0%'
-
-        seg = seg_base[seg_base['생성월'].isin([a, b, c])]
-        amt_uk = (seg.loc[seg['status'].isin(['확정','높음']), '수주 예정액(종합)'].sum() / 1e8)
-        res.loc[AMOUNT_ROW, col] = f"{amt_uk:.1f}억"
+        res.loc[AMOUNT_ROW, col]  = f"{r['amount'] / 1e8:.1f}억"
 
     res.loc[COUNT_ROWS] = res.loc[COUNT_ROWS].astype("Int64")
     return res
@@ -151,20 +143,21 @@ COMBOS = [
     ("대-리/전체",       "대학교",   "리텐션",       "전체",  "전체"),
 ]
 
-def make_mask(size: str, conv: str, fmt_key: str, cat_key: str) -> pd.Series:
-    m = (df['기업 규모'].eq(size)) & (df['딜 전환 유형_정리'].eq(conv))
+def make_mask(d: pd.DataFrame, size: str, conv: str, fmt_key: str, cat_key: str) -> pd.Series:
+    """d: 원본 행(df) 또는 큐브 행(cube) — 같은 정규화 컬럼을 가진다."""
+    m = (d['기업 규모'].eq(size)) & (d['딜 전환 유형_정리'].eq(conv))
     # 과정포맷(대)
     if fmt_key == "구독":
-        m &= df['과정포맷(대)'].eq('구독제(온라인)')
+        m &= d['과정포맷(대)'].eq('구독제(온라인)')
     elif fmt_key == "선택":
-        m &= df['과정포맷(대)'].eq('선택구매(온라인)')
+        m &= d['과정포맷(대)'].eq('선택구매(온라인)')
     elif fmt_key == "출강":
-        m &= ~df['과정포맷(대)'].isin(ONLINE_SET)  # 온라인 3종 제외 → 오프라인/출강
+        m &= ~d['과정포맷(대)'].isin(ONLINE_SET)  # 온라인 3종 제외 → 오프라인/출강
     elif fmt_key == "전체":
         pass
     # 카테고리(대)
     if cat_key != "전체":
-        m &= df['카테고리(대)'].eq(cat_key)
+        m &= d['카테고리(대)'].eq(cat_key)
     return m
 
 # ────────── UI ──────────
@@ -174,13 +167,14 @@ tabs = st.tabs([label for (label, *_rest) in COMBOS])
 
 for tab, (label, size, conv, fmt_key, cat_key) in zip(tabs, COMBOS):
     with tab:
-        mask = make_mask(size, conv, fmt_key, cat_key)
+        mask = make_mask(df, size, conv, fmt_key, cat_key)
+        cb = cube[make_mask(cube, size, conv, fmt_key, cat_key)]
 
         st.subheader("월별")
-        st.dataframe(month_tbl(mask), use_container_width=True)
+        st.dataframe(month_tbl(cb), use_container_width=True)
 
         st.subheader("3개월 이동평균")
-        st.dataframe(roll_tbl(mask), use_container_width=True)
+        st.dataframe(roll_tbl(cb), use_container_width=True)
 
         st.subheader("상세 목록")
         detail = df[mask][DETAIL_COLS].copy()
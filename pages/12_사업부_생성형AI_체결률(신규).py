@@ -8,16 +8,19 @@
 import re
 import streamlit as st
 import pandas as pd
-from data import load_all_deal, load_retention
-from config import TEAM_RAW, NAME2TEAM
+from data import cube_monthly, load_deal_cube, load_deal_facts, render_refresh_notice
+from config import TEAM_RAW
 
 st.set_page_config(page_title="생성형-AI – 월별 체결률 (2025·신규)", layout="wide")
+render_refresh_notice()
 
 # ────────── 상수 ──────────
 DETAIL_COLS = [
     '생성년도','생성월','기업명', '기업 규모', '이름','담당자_name','성사 가능성',
     '수주 예정일(종합)','수주 예정액(종합)','Net','과정포맷(대)','카테고리(대)'
 ]
+# 저장소에서 읽을 컬럼 (상세표 + 필터/집계용)
+LOAD_COLS = DETAIL_COLS + ['고객사 유형','기업 규모','팀','status','is_retention']
 YEARS = [2025, 2026]
 MONTH_KEYS = [(y, m) for y in YEARS for m in range(1, 13)]
 MONTH_COLS = [f"{str(y)[-2:]}년 {m}월" for y, m in MONTH_KEYS]
@@ -30,12 +33,11 @@ RATE_ROW = '체결률(%)'
 AMOUNT_ROW = '수주예정액(확정+높음, 억)'
 
 ONLINE_SET = {'선택구매(온라인)','구독제(온라인)','포팅'}
-STAT_MAP = {'확정':'확정','높음':'높음','낮음':'낮음','LOW':'낮음','LOST':'LOST','LOST/중단':'LOST'}
 
 # ────────── 데이터 로드 ──────────
-df = load_all_deal()
-ret_df = load_retention()
-ret_set = set(ret_df['기업명'].dropna()) if '기업명' in ret_df.columns else set()
+# 담당자/팀/포맷·카테고리 정리, 리텐션 여부, status는 load_deal_facts()에서 계산됨
+# 연도·기업 고객 조건은 저장소 단계에서 적용
+df = load_deal_facts(columns=LOAD_COLS, years=YEARS, customer_type='기업 고객', shared=True, compact=True)
 
 # ────────── Sidebar ──────────
 st.sidebar.header("필터")
@@ -43,111 +45,82 @@ size_opts = ['전체','대기업','중견기업','중소기업']
 sel_size = st.sidebar.selectbox("기업 규모", size_opts, 0)
 
 # ────────── 필터링 ──────────
-mask = df['고객사 유형'].fillna('').eq('기업 고객')
 if sel_size != '전체':
-    mask &= df['기업 규모'].fillna('').eq(sel_size)
-
-df = df[mask].copy()
-
-# 전처리
-df['담당자_name'] = df['담당자_name'].fillna('').astype(str).str.replace(r'B$','', regex=True).str.strip()
-df['팀'] = df['담당자_name'].map(NAME2TEAM)
-
-df['카테고리_정리'] = df['카테고리(대)'].fillna('').str.strip()
-df['과정포맷_정리'] = df['과정포맷(대)'].fillna('').str.strip()
+    df = df[df['기업 규모'].eq(sel_size)].copy()
 
 # 조건: 2025, 생성형 AI, 출강, 신규(리텐션 제외)
-df['생성년도'] = pd.to_numeric(df['생성년도'], errors='coerce').astype('Int64')
 df = df[df['생성년도'].isin(YEARS) &
         (df['생성월'].between(1, 12)) &
-        (df['카테고리_정리'] == '생성형 AI') &
-        (~df['과정포맷_정리'].isin(ONLINE_SET)) &
-        (~df['기업명'].isin(ret_set))].copy()
-
-df['status'] = df['성사 가능성'].map(STAT_MAP).fillna('기타')
+        (df['카테고리(대)'] == '생성형 AI') &
+        (~df['과정포맷(대)'].isin(ONLINE_SET)) &
+        (~df['is_retention'])].copy()
+
+# ────────── 집계 큐브 ──────────
+# 월별/이동평균 표는 적재 시 만든 집계 큐브를 잘라 합산 (원본 행은 상세 목록에만 사용)
+CUBE_COLS = ['생성년도','생성월','팀','담당자_name','status','과정포맷(대)']
+cube = load_deal_cube(columns=CUBE_COLS, years=YEARS, customer_type='기업 고객',
+                      categories='생성형 AI', retention=False,
+                      sizes=None if sel_size == '전체' else sel_size, shared=True)
+cube = cube[cube['생성월'].between(1, 12) &
+            (~cube['과정포맷(대)'].isin(ONLINE_SET))]
 
 # ────────── 헬퍼 ──────────
-def _bucket(d: pd.DataFrame) -> pd.DataFrame:
-    # 카운트 행(Int64) + 비율/금액 행(문자열)
+def _bucket(cb: pd.DataFrame) -> pd.DataFrame:
+    # 정수(Int64)로 초기화하여 1.0 대신 1로 표시 (카운트 행)
     tbl = pd.DataFrame(0, index=COUNT_ROWS, columns=MONTH_COLS, dtype="Int64")
     tbl.loc[RATE_ROW] = ''
     tbl.loc[AMOUNT_ROW] = ''
 
-    if d.empty:
+    if cb.empty:
         for col in MONTH_COLS:
             tbl.loc[RATE_ROW, col] = '0.0%'
             tbl.loc[AMOUNT_ROW, col] = '0.0억'
         return tbl
 
-    d = d.dropna(subset=['생성월','생성년도']).copy()
-    d['생성월'] = pd.to_numeric(d['생성월'], errors='coerce').astype(int)
-    d['생성년도'] = pd.to_numeric(d['생성년도'], errors='coerce').astype(int)
-    d['수주 예정액(종합)'] = pd.to_numeric(d['수주 예정액(종합)'], errors='coerce').fillna(0.0)
-
-    for year, month in MONTH_KEYS:
-        col = f"{str(year)[-2:]}년 {month}월"
-        seg = d[(d['생성년도'] == year) & (d['생성월'] == month)]
-        tot = int(len(seg))
+    md = cube_monthly(cb, index=MONTH_KEYS)
+    for (year, month), col in zip(MONTH_KEYS, MONTH_COLS):
+        r = md.loc[(year, month)]
+        tot = int(r['전체'])
         tbl.loc['전체', col] = tot
         if tot:
-            win_mask = seg['status'].isin(['확정','높음'])
-            win  = int(win_mask.sum())
-            low  = int((seg['status'] == '낮음').sum())
-            lost = int((seg['status'] == 'LOST').sum())
+            win = int(r['확정+높음'])
             tbl.loc['확정+높음', col] = win
-            tbl.loc['낮음', col]      = low
-            tbl.loc['LOST', col]      = lost
+            tbl.loc['낮음', col]      = int(r['낮음'])
+            tbl.loc['LOST', col]      = int(r['LOST'])
             tbl.loc[RATE_ROW, col]    = f"{win / tot * 100:.1f}%"
-
-            amt_uk = (seg.loc[win_mask, '수주 예정액(종합)'].sum() / 1e8)
-            tbl.loc[AMOUNT_ROW, col]  = f"{amt_uk:.1f}억"
+            tbl.loc[AMOUNT_ROW, col]  = f"{r['amount'] / 1e8:.1f}억"
         else:
             tbl.loc[RATE_ROW, col]   = '0.0%'
             tbl.loc[AMOUNT_ROW, col] = '0.0억'
 
+    # 수치 행 유지 (행 단위로 Int64 유지)
     tbl.loc[COUNT_ROWS] = tbl.loc[COUNT_ROWS].astype("Int64")
     return tbl
 
 
-def month_tbl(mask_bool):
-    return _bucket(df[mask_bool])
+def month_tbl(cb: pd.DataFrame) -> pd.DataFrame:
+    return _bucket(cb)
 
 
-def roll_tbl(mask_bool):
-    base = month_tbl(mask_bool)
+def roll_tbl(cb: pd.DataFrame) -> pd.DataFrame:
+    # 정수(Int64)로 초기화하여 1.0 대신 1로 표시 (카운트 행)
     res = pd.DataFrame(0, index=COUNT_ROWS, columns=ROLL_COLS, dtype="Int64")
     res.loc[RATE_ROW] = ''
     res.loc[AMOUNT_ROW] = ''
 
-    if base.empty:
-        for col in ROLL_COLS:
-            res.loc[RATE_ROW, col] = '0.0%'
-            res.loc[AMOUNT_ROW, col] = '0.0억'
-        return res
-
-    md = {(y, m): base[f"{str(y)[-2:]}년 {m}월"] for y, m in MONTH_KEYS}
-
-    sub = df[mask_bool].dropna(subset=['생성월','생성년도']).copy()
-    sub['생성월'] = pd.to_numeric(sub['생성월'], errors='coerce').astype(int)
-    sub['생성년도'] = pd.to_numeric(sub['생성년도'], errors='coerce').astype(int)
-    sub['수주 예정액(종합)'] = pd.to_numeric(sub['수주 예정액(종합)'], errors='coerce').fillna(0.0)
-
+    md = cube_monthly(cb, index=MONTH_KEYS)
     for (year, a, b, c), col in zip(ROLL_WINDOWS, ROLL_COLS):
-        tot  = int(md[(year, a)]['전체'])      + int(md[(year, b)]['전체'])      + int(md[(year, c)]['전체'])
-        win  = int(md[(year, a)]['확정+높음']) + int(md[(year, b)]['확정+높음']) + int(md[(year, c)]['확정+높음'])
-        low  = int(md[(year, a)]['낮음'])      + int(md[(year, b)]['낮음'])      + int(md[(year, c)]['낮음'])
-        lost = int(md[(year, a)]['LOST'])      + int(md[(year, b)]['LOST'])      + int(md[(year, c)]['LOST'])
-
+        r = md.loc[[(year, a), (year, b), (year, c)]].sum()
+        tot, win = int(r['전체']), int(r['확정+높음'])
         res.loc['전체', col]      = tot
         res.loc['확정+높음', col] = win
-        res.loc['낮음', col]      = low
-        res.loc['LOST', col]      = lost
+        res.loc['낮음', col]      = int(r['낮음'])
+        res.loc['LOST', col]      = int(r['LOST'])
         res.loc[RATE_ROW, col]    = f"{win / tot * 100:.1f}%" if tot else '0.0%'
+        # 3개월 합계 기준 수주예정액(확정+높음)
+        res.loc[AMOUNT_ROW, col]  = f"{r['amount'] / 1e8:.1f}억"
 
-        seg = sub[(sub['생성년도'] == year) & (sub['생성월'].isin([a, b, c]))]
-        amt_uk = (seg.loc[seg['status'].isin(['확정','높음']), '수주 예정액(종합)'].sum() / 1e8)
-        res.loc[AMOUNT_ROW, col] = f"{amt_uk:.1f}억"
-
+    # 수치 행 유지 (행 단위로 Int64 유지)
     res.loc[COUNT_ROWS] = res.loc[COUNT_ROWS].astype("Int64")
     return res
 
@@ -155,6 +128,11 @@ def roll_tbl(mask_bool):
 st.title("생성형 AI — 2025년 월별 체결률 (신규 고객)")
 
 tabs = st.tabs(['전체', '기업교육 1팀', '기업교육 2팀'])
+CUBES = {
+    '전체': cube,
+    '기업교육 1팀': cube[cube['팀'] == '기업교육 1팀'],
+    '기업교육 2팀': cube[cube['팀'] == '기업교육 2팀'],
+}
 MASKS = {
     '전체': df.index == df.index,
     '기업교육 1팀': df['팀'] == '기업교육 1팀',
@@ -164,10 +142,10 @@ MASKS = {
 for tab, (label, mask_sel) in zip(tabs, MASKS.items()):
     with tab:
         st.subheader('월별')
-        st.dataframe(month_tbl(mask_sel), use_container_width=True)
+        st.dataframe(month_tbl(CUBES[label]), use_container_width=True)
 
         st.subheader('3개월 이동평균')
-        st.dataframe(roll_tbl(mask_sel), use_container_width=True)
+        st.dataframe(roll_tbl(CUBES[label]), use_container_width=True)
 
         detail = df[mask_sel][DETAIL_COLS].copy()
         if not detail.empty:
@@ -183,11 +161,12 @@ for tab, (label, mask_sel) in zip(tabs, MASKS.items()):
                 p_mask = mask_sel & (df['담당자_name'] == person)
                 if p_mask.sum() == 0:
                     continue
+                p_cube = CUBES[label][CUBES[label]['담당자_name'] == person]
                 st.subheader(f"{person} — 월별")
-                st.dataframe(month_tbl(p_mask), use_container_width=True)
+                st.dataframe(month_tbl(p_cube), use_container_width=True)
 
                 st.subheader(f"{person} — 3개월 이동평균")
-                st.dataframe(roll_tbl(p_mask), use_container_width=True)
+                st.dataframe(roll_tbl(p_cube), use_container_width=True)
 
                 p_detail = df[p_mask][DETAIL_COLS].copy()
                 if not p_detail.empty:
@@ -18,9 +18,10 @@ import numpy as np
 import pandas as pd
 import altair as alt
 import streamlit as st
-from data import load_all_deal
+from data import load_all_deal, render_refresh_notice
 
 st.set_page_config(page_title="공공·대학교 — 2025 체결액 차트", layout="wide")
+render_refresh_notice()
 alt.data_transformers.disable_max_rows()
 
 # ────────── 상수 ──────────
@@ -55,7 +56,7 @@ def derive_close_year_month(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 def prepare_base() -> pd.DataFrame:
-    df = load_all_deal().copy()
+    df = load_all_deal(shared=True).copy()
 
     # 기본 정리
     df["기업 규모"] = df["기업 규모"].fillna("").astype(str).str.strip()
@@ -15,12 +15,12 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 import altair as alt
-from datetime import datetime
-from zoneinfo import ZoneInfo
-from data import load_won_deal, load_all_deal
+from data import load_won_deal, load_all_deal, render_refresh_notice
+from calendar_dim import calendar, day_pos, today_kst, week_window
 
 # ─────────────────────────── 공통 설정/상수
 st.set_page_config(page_title="공공교육팀 — 운영 리소스 & 성사 가능성 (2025)", layout="wide")
+render_refresh_notice()
 
 ONLINE_SET = {'선택구매(온라인)','구독제(온라인)','포팅'}
 
@@ -35,15 +35,11 @@ TEAMS = list(TEAM_RAW.keys())  # ['공공교육팀'] 만
 
 START = pd.Timestamp('2025-01-01')
 END   = pd.Timestamp('2025-12-31')
-DATE_INDEX = pd.date_range(START, END, freq='D', name='date')
-POS = pd.Series(np.arange(len(DATE_INDEX)), index=DATE_INDEX)
+DATE_INDEX = calendar().loc[START:END].index   # 공통 달력 차원의 일자 축 (name='date')
 
 # 오늘(한국 기준)과 금주(월~일)
-TODAY = pd.Timestamp(datetime.now(ZoneInfo('Asia/Seoul')).date())
-W0_START = TODAY - pd.Timedelta(days=TODAY.weekday())
-WEEK_STARTS = [W0_START + pd.Timedelta(weeks=k) for k in range(-4, 5)]
-WEEK_ENDS   = [ws + pd.Timedelta(days=6) for ws in WEEK_STARTS]
-WEEK_LABELS = [f"{ws:%Y-%m-%d} ~ {we:%m-%d}" for ws, we in zip(WEEK_STARTS, WEEK_ENDS)]
+TODAY = today_kst()
+WEEK_STARTS, WEEK_ENDS, WEEK_LABELS = week_window(4, 4, TODAY)
 
 # ─────────────────────────── [리소스] 유틸
 def _to_number(s: pd.Series) -> pd.Series:
@@ -169,6 +165,12 @@ def _weekly_with_order(daily_df: pd.DataFrame, full_columns: list[str]):
     return wk, order
 
 # ─────────────────────────── [리소스] 소스 준비 (WON + ALL 확정, 중복 제거)
+# won/all에서 읽을 컬럼 (필터·가중치·중복키 + 표시용)
+RESOURCE_COLS = [
+    '담당자_name','과정포맷(대)','카테고리(대)','수강시작일','수강종료일','코스 ID',
+    '금액','수주 예정액(종합)','계약금액','수주금액','총금액',
+    '생성년도','생성월','기업명','기업 규모','이름','상태','성사 가능성',
+]
 @st.cache_data(show_spinner=False)
 def _prepare_resource_rows():
     """
@@ -183,7 +185,7 @@ def _prepare_resource_rows():
     - won 기준으로 all 중복 제거(코스ID→합성키)
     """
     # ── WON
-    won = load_won_deal().copy()
+    won = load_won_deal(columns=RESOURCE_COLS, shared=True).copy()
     won['담당자_name'] = _norm_person(won['담당자_name'])
     won['팀'] = won['담당자_name'].map(NAME2TEAM)
     won = won[won['팀'].isin(TEAMS)].copy()  # 공공교육팀만
@@ -213,8 +215,8 @@ def _prepare_resource_rows():
         ).str.upper()
     won['FB_key'] = _fb_key(won)
 
-    won['s_idx'] = won['시작'].dt.normalize().map(POS).astype('Int64')
-    won['e_idx'] = won['종료'].dt.normalize().map(POS).astype('Int64')
+    won['s_idx'] = day_pos(won['시작'], START)
+    won['e_idx'] = day_pos(won['종료'], START)
 
     won_keep = won.assign(
         source='WON',
@@ -227,7 +229,7 @@ def _prepare_resource_rows():
     ]].copy()
 
     # ── ALL (확정 + 유효기간 + 수주예정액>0)
-    alld = load_all_deal().copy()
+    alld = load_all_deal(columns=RESOURCE_COLS, shared=True).copy()
     alld['담당자_name'] = _norm_person(alld['담당자_name'])
     alld['팀'] = alld['담당자_name'].map(NAME2TEAM)
     alld = alld[alld['팀'].isin(TEAMS)].copy()  # 공공교육팀만
@@ -264,8 +266,8 @@ def _prepare_resource_rows():
     )].copy()
 
     # 인덱스 매핑 + 표시용 컬럼 준비
-    alld_dedup['s_idx'] = alld_dedup['시작'].dt.normalize().map(POS).astype('Int64')
-    alld_dedup['e_idx'] = alld_dedup['종료'].dt.normalize().map(POS).astype('Int64')
+    alld_dedup['s_idx'] = day_pos(alld_dedup['시작'], START)
+    alld_dedup['e_idx'] = day_pos(alld_dedup['종료'], START)
 
     alld_keep = alld_dedup.assign(
         source='ALL',
@@ -297,11 +299,13 @@ DETAIL_COLS = [
     '수주 예정일(종합)','수주 예정액(종합)','Net','수강시작일','수강종료일',
     '과정포맷(대)','카테고리(대)'
 ]
+# '미기재' 판정에 쓰는 금액 컬럼 포함
+STATUS_COLS = DETAIL_COLS + ['금액','예상 체결액']
 
 @st.cache_data(show_spinner=False)
 def _prepare_status_df():
     """성사 가능성 간소화용 all_deal 전처리 (2024.10~2025.12)."""
-    s = load_all_deal().copy()
+    s = load_all_deal(columns=STATUS_COLS, years=[2024, 2025], shared=True).copy()
     s['담당자_name'] = _norm_person(s['담당자_name'])
     s['팀'] = s['담당자_name'].map(NAME2TEAM)
     s['생성월'] = pd.to_numeric(s['생성월'], errors='coerce')
@@ -8,9 +8,10 @@
 
 import streamlit as st
 import pandas as pd
-from data import load_all_deal
+from data import load_all_deal, load_deal_cube, render_refresh_notice
 
 st.set_page_config(page_title="기업 규모별 체결액 (2025)", layout="wide")
+render_refresh_notice()
 
 # ────────── 상수 ──────────
 G_SIZE   = ['대기업', '중견기업', '중소기업']
@@ -34,13 +35,24 @@ df['생성월'] = pd.to_numeric(df['생성월'], errors='coerce').fillna(0).asty
 # ① 2025 + 상태 Convert 제외
 df = df[(df['생성년도'] == 2025) & (df['상태'] != 'Convert')].copy()
 
-# ② 결측 처리·매핑
-df['딜 전환 유형'] = df['딜 전환 유형'].fillna('미기재').apply(lambda x: '리텐션' if x == '리텐션' else '직접 교육 문의')
+# ② 결측 처리·매핑 (원본 행과 집계 큐브에 같은 규칙)
+def _prep(d: pd.DataFrame) -> pd.DataFrame:
+    d['딜 전환 유형'] = d['딜 전환 유형'].fillna('미기재').apply(lambda x: '리텐션' if x == '리텐션' else '직접 교육 문의')
 
-df['과정포맷(대)'] = df['과정포맷(대)'].fillna('미기재')
-df['카테고리(대)'] = df['카테고리(대)'].fillna('미기재')
+    d['과정포맷(대)'] = d['과정포맷(대)'].fillna('미기재')
+    d['카테고리(대)'] = d['카테고리(대)'].fillna('미기재')
 
-df['status2'] = df['성사 가능성'].map(STAT_MAP).fillna('미기재')
+    d['status2'] = d['성사 가능성'].map(STAT_MAP).fillna('미기재')
+    return d
+
+df = _prep(df)
+
+# 요약 테이블은 적재 시 만든 집계 큐브(월 × 규모 × 전환 유형 × 포맷 × 카테고리 × 상태)에서
+CUBE_COLS = ['생성월','기업 규모','딜 전환 유형','과정포맷(대)','카테고리(대)','상태','성사 가능성']
+cube = load_deal_cube(columns=CUBE_COLS, years=2025, shared=True)
+cube = cube[cube['상태'] != 'Convert'].copy()
+cube['생성월'] = cube['생성월'].fillna(0).astype(int)
+cube = _prep(cube)
 
 # ────────── Sidebar 필터 ──────────
 st.sidebar.header("필터")
@@ -48,34 +60,40 @@ sel_conv = st.sidebar.selectbox("딜 전환 유형", ['전체', '리텐션', '
 sel_fmt  = st.sidebar.selectbox("과정포맷(대)", ['전체'] + sorted(df['과정포맷(대)'].unique()), 0)
 sel_cat  = st.sidebar.selectbox("카테고리(대)", ['전체'] + sorted(df['카테고리(대)'].unique()), 0)
 
-mask = pd.Series(True, index=df.index)
-if sel_conv != '전체':
-    mask &= df['딜 전환 유형'] == sel_conv
-if sel_fmt != '전체':
-    mask &= df['과정포맷(대)'] == sel_fmt
-if sel_cat != '전체':
-    mask &= df['카테고리(대)'] == sel_cat
+def _filter_mask(d: pd.DataFrame) -> pd.Series:
+    mask = pd.Series(True, index=d.index)
+    if sel_conv != '전체':
+        mask &= d['딜 전환 유형'] == sel_conv
+    if sel_fmt != '전체':
+        mask &= d['과정포맷(대)'] == sel_fmt
+    if sel_cat != '전체':
+        mask &= d['카테고리(대)'] == sel_cat
+    return mask
 
-df_filt = df[mask].copy()
+df_filt = df[_filter_mask(df)].copy()
+cube_filt = cube[_filter_mask(cube)]
 
 # ────────── 집계 함수 ──────────
 
-def make_table(d: pd.DataFrame) -> pd.DataFrame:
+def make_table(cb: pd.DataFrame) -> pd.DataFrame:
+    """cb: 큐브 행 (생성월, status2, deals, amount)"""
     tbl = pd.DataFrame('', index=ROWS, columns=COLS)
+    cnt = cb.groupby(['생성월', 'status2'])['deals'].sum()
+    amt = cb[cb['status2'].isin(['확정','높음'])].groupby('생성월')['amount'].sum()
     for m in MONTHS:
         col = f"{m}월"
-        sub = d[d['생성월'] == m]
-        tot = len(sub)
-        win = len(sub[sub['status2'].isin(['확정','높음'])])
+        by_stat = cnt.xs(m, level='생성월') if m in cnt.index.get_level_values('생성월') else pd.Series(dtype='int64')
+        n = lambda stat: int(by_stat.get(stat, 0))
+        tot = int(by_stat.sum())
+        win = n('확정') + n('높음')
         tbl.loc['전체', col]   = tot
-        tbl.loc['확정', col]   = len(sub[sub['status2'] == '확정'])
-        tbl.loc['높음', col]   = len(sub[sub['status2'] == '높음'])
-        tbl.loc['낮음', col]   = len(sub[sub['status2'] == '낮음'])
-        tbl.loc['LOST', col]   = len(sub[sub['status2'] == 'LOST'])
-        tbl.loc['미기재', col] = len(sub[sub['status2'] == '미기재'])
+        tbl.loc['확정', col]   = n('확정')
+        tbl.loc['높음', col]   = n('높음')
+        tbl.loc['낮음', col]   = n('낮음')
+        tbl.loc['LOST', col]   = n('LOST')
+        tbl.loc['미기재', col] = n('미기재')
         tbl.loc['체결률(%)', col] = f"{round(win / tot * 100, 1)}%" if tot else '0.0%'
-        amt = sub[sub['status2'].isin(['확정','높음'])]['수주 예정액(종합)'].sum() / 1e8
-        tbl.loc['수주예정액(종합)', col] = round(amt, 2)
+        tbl.loc['수주예정액(종합)', col] = round(amt.get(m, 0.0) / 1e8, 2)
     return tbl
 
 # ────────── 탭 출력 ──────────
@@ -85,7 +103,7 @@ tabs = st.tabs(G_SIZE)
 for tab, size in zip(tabs, G_SIZE):
     with tab:
         st.markdown(f"### {size} – 요약 테이블")
-        st.dataframe(make_table(df_filt[df_filt['기업 규모'] == size]), use_container_width=True, hide_index=False)
+        st.dataframe(make_table(cube_filt[cube_filt['기업 규모'] == size]), use_container_width=True, hide_index=False)
 
         st.markdown("#### 상세 딜 리스트 (필터 적용)")
         detail = df_filt[df_filt['기업 규모'] == size][DETAIL_COLS].copy()
@@ -9,9 +9,10 @@
 import re
 import streamlit as st  # Streamlit 반드시 먼저
 import pandas as pd
-from data import load_won_deal
+from data import load_won_deal, render_refresh_notice
 
 st.set_page_config(page_title="퇴사자 체결액 추이", layout="wide")
+render_refresh_notice()
 
 # ────────── 조직 매핑 (퇴사자 제외) ──────────
 TEAM_RAW = {
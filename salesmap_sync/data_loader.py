@@ -4,6 +4,7 @@ salesmap_sync.data_loader
 -------------------------
 - salesmap.db를 읽어 pandas DataFrame으로 반환
 - 필요 시 오래된 DB를 자동 갱신(ensure_fresh_db)
+- 연결은 스레드별 읽기 전용(db_pool.ReadOnlyPool), DB 파일이 바뀌면 재연결
 """
 from __future__ import annotations
 
@@ -19,12 +20,18 @@ try:
 except Exception:  # pragma: no cover - streamlit 없는 환경 대응
     st = None
 
+from db_pool import ReadOnlyPool, file_generation
 from salesmap_sync.fetch_salesmap import DB_PATH, ensure_fresh_db
 from salesmap_sync.artifact_fetch import fetch_artifact_if_missing
 
+_POOLS: dict[Path, ReadOnlyPool] = {}
 
-def _connect(db_path: Path) -> sqlite3.Connection:
-    return sqlite3.connect(db_path, check_same_thread=False)
+
+def _pool(db_path: Path) -> ReadOnlyPool:
+    pool = _POOLS.get(db_path)
+    if pool is None:
+        pool = _POOLS.setdefault(db_path, ReadOnlyPool(db_path))
+    return pool
 
 
 def _cache_resource(fn):
@@ -45,11 +52,16 @@ def _allow_fetch_default() -> bool:
 
 
 @_cache_resource
-def _get_conn(max_age_hours: int, allow_fetch: bool) -> sqlite3.Connection:
+def _get_db_path(max_age_hours: int, allow_fetch: bool) -> Path:
     # 1) 캐시 파일이 없으면 GitHub Artifact에서 받아보기 (토큰/레포 필요)
     fetch_artifact_if_missing(db_path=DB_PATH)
-    db_path = ensure_fresh_db(max_age_hours=max_age_hours, allow_fetch=allow_fetch)
-    return _connect(db_path)
+    return ensure_fresh_db(max_age_hours=max_age_hours, allow_fetch=allow_fetch)
+
+
+def _get_conn(max_age_hours: int, allow_fetch: bool) -> sqlite3.Connection:
+    # 2) 현재 스레드의 읽기 전용 연결 (파일 inode/mtime이 바뀌면 새로 연결)
+    db_path = _get_db_path(max_age_hours, allow_fetch)
+    return _pool(db_path).connection(file_generation(db_path))
 
 
 @_cache_data
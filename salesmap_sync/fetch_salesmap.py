@@ -3,18 +3,28 @@
 Salesmap API -> SQLite 적재 유틸
 --------------------------------
 수정: Streamlit Cloud 호환성을 위해 DB_PATH를 /tmp로 변경
+증분 동기화: 엔티티별 updated_at 워터마크(_sync_state)보다 새 행만 id 기준 upsert.
+             FULL_RESYNC_DAYS마다(또는 --full) 전체 재동기화로 삭제분까지 맞춤.
+실행:  python -m salesmap_sync.fetch_salesmap [--full]
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
 import os
+import random
 import sqlite3
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 import requests
@@ -25,6 +35,29 @@ BASE_URL = os.getenv("SALESMAP_API_BASE", "https://salesmap.kr/api/v2")
 # DB_PATH = Path(__file__).parent / "salesmap.db"  # 기존
 DB_PATH = Path("/tmp/salesmap.db")  # 수정
 USER_AGENT = "salesmap-sync/1.0"
+# 마지막 전체 동기화가 이보다 오래되면 증분 대신 전체(삭제된 레코드 정리)
+FULL_RESYNC_DAYS = float(os.getenv("SALESMAP_FULL_RESYNC_DAYS", "7"))
+# 서버의 '수정 시각 이후' 필터 파라미터명. 지정하면 워터마크를 넘겨 변경분만 요청 (기본: 없음)
+SINCE_PARAM = os.getenv("SALESMAP_SINCE_PARAM", "")
+# 워크스페이스 레이트리밋: RATE_WINDOW초에 RATE_LIMIT회. RATE_BURST는 한 번에 몰아 쓸 수 있는 토큰 수
+RATE_LIMIT = int(os.getenv("SALESMAP_RATE_LIMIT", "100"))
+RATE_WINDOW = float(os.getenv("SALESMAP_RATE_WINDOW", "10"))
+RATE_BURST = int(os.getenv("SALESMAP_RATE_BURST", "10"))
+# AIMD: 429면 속도 × AIMD_DECREASE(RATE_MIN회/초까지), 연속 성공 AIMD_EVERY회마다 + AIMD_STEP회/초
+RATE_MIN = float(os.getenv("SALESMAP_RATE_MIN", "1"))
+AIMD_STEP = float(os.getenv("SALESMAP_AIMD_STEP", "0.5"))
+AIMD_EVERY = int(os.getenv("SALESMAP_AIMD_EVERY", "20"))
+AIMD_DECREASE = 0.5
+# 429·5xx·연결 오류·타임아웃 재시도: 요청당 MAX_RETRIES회, 동기화 한 번에 RETRY_BUDGET회까지 (합산)
+RETRY_STATUS = {500, 502, 503, 504}
+MAX_RETRIES = int(os.getenv("SALESMAP_MAX_RETRIES", "5"))
+RETRY_BUDGET = int(os.getenv("SALESMAP_RETRY_BUDGET", "50"))
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# 엔드포인트 cursor 체인을 동시에 도는 스레드 수 (1이면 순차)
+FETCH_WORKERS = int(os.getenv("SALESMAP_FETCH_WORKERS", "5"))
+# 웹폼별 제출 cursor 체인을 동시에 도는 스레드 수 (1이면 순차)
+SUBMIT_WORKERS = int(os.getenv("SALESMAP_SUBMIT_WORKERS", "4"))
 
 
 def _load_token() -> str:
@@ -53,53 +86,260 @@ def _session() -> requests.Session:
     return s
 
 
+_local = threading.local()
+
+
+def _thread_session() -> requests.Session:
+    """스레드마다 하나씩 재사용하는 세션 (스레드 풀 작업용)."""
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = _local.session = _session()
+    return s
+
+
+# ─────────────────────────── 레이트리밋
+class TokenBucket:
+    """
+    스레드 간 공유 토큰 버킷. 요청마다 acquire()로 토큰 1개를 쓴다.
+    capacity + rate × window ≤ limit 이 되도록 잡으면 어떤 window초 구간에서도 limit회를 넘지 않는다.
+    pause(초): 모든 스레드를 그동안 멈추고 버킷을 비운다.
+    AIMD: throttled()(429)면 속도 × AIMD_DECREASE(min_rate까지) 후 pause, success()가 AIMD_EVERY번
+          이어지면 + AIMD_STEP (처음 속도 = max_rate를 넘지 않음).
+    """
+
+    def __init__(self, rate: float, capacity: int, min_rate: Optional[float] = None):
+        self.rate = self.max_rate = rate
+        self.min_rate = min(rate, min_rate if min_rate is not None else rate)
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._streak = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if now >= self._paused_until:
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._stamp = self._paused_until
+
+    def success(self) -> None:
+        with self._lock:
+            self._streak += 1
+            if self._streak >= AIMD_EVERY and self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + AIMD_STEP)
+                self._streak = 0
+
+    def throttled(self, seconds: float) -> None:
+        with self._lock:
+            self._streak = 0
+            now = time.monotonic()
+            if now >= self._paused_until:   # 같은 정지 구간에 겹쳐 온 429는 한 번만 감속
+                self._refill(now)
+                self.rate = max(self.min_rate, self.rate * AIMD_DECREASE)
+        self.pause(seconds)
+
+
+def _bucket() -> TokenBucket:
+    burst = max(1, min(RATE_BURST, RATE_LIMIT - 1))
+    return TokenBucket(rate=(RATE_LIMIT - burst) / RATE_WINDOW, capacity=burst, min_rate=RATE_MIN)
+
+
+LIMITER = _bucket()
+
+
+# ─────────────────────────── 재시도·지표
+class RunStats:
+    """한 번의 동기화 동안 엔드포인트별 요청·재시도·429·실패·지연과 남은 재시도 예산 (스레드 공유)."""
+
+    def __init__(self, budget: int):
+        self._lock = threading.Lock()
+        self.reset(budget)
+
+    def reset(self, budget: int) -> None:
+        with self._lock:
+            self.budget = self.budget_left = budget
+            self.endpoints: Dict[str, dict] = {}
+
+    def _ep(self, endpoint: str) -> dict:
+        return self.endpoints.setdefault(
+            endpoint, {"requests": 0, "retries": 0, "throttled": 0, "errors": 0, "latency": []})
+
+    def request(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            ep = self._ep(endpoint)
+            ep["requests"] += 1
+            ep["latency"].append(seconds)
+
+    def count(self, endpoint: str, key: str) -> None:
+        with self._lock:
+            self._ep(endpoint)[key] += 1
+
+    def take_retry(self) -> bool:
+        with self._lock:
+            if self.budget_left <= 0:
+                return False
+            self.budget_left -= 1
+            return True
+
+    def summary(self) -> Dict[str, dict]:
+        """엔드포인트 → 카운터 + 지연 p50/p90/p99(ms)."""
+        with self._lock:
+            out = {}
+            for endpoint, ep in sorted(self.endpoints.items()):
+                lat = sorted(ep["latency"])
+                pct = {f"p{q}_ms": round(lat[min(len(lat) - 1, len(lat) * q // 100)] * 1000) if lat else None
+                       for q in (50, 90, 99)}
+                out[endpoint] = {**{k: v for k, v in ep.items() if k != "latency"}, **pct}
+            return out
+
+
+STATS = RunStats(RETRY_BUDGET)
+LAST_RUN: Dict[str, Any] = {}    # 마지막 fetch_all의 모드·소요·엔드포인트별 지표
+
+
+def _endpoint(path: str) -> str:
+    """지표 키: /webForm/<id>/submit → /webForm/{id}/submit"""
+    parts = path.split("/")
+    if len(parts) > 3:
+        parts[2] = "{id}"
+    return "/".join(parts)
+
+
+def _backoff(attempt: int, base: float) -> float:
+    """지수 백오프 + 지터: base × 2^(attempt-1)(BACKOFF_MAX 상한)의 절반 ~ 전체 사이 임의 값."""
+    delay = min(BACKOFF_MAX, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _server_wait(resp: requests.Response) -> Optional[float]:
+    """
+    서버가 알려준 대기 시간(초): Retry-After(초 또는 HTTP 날짜), 또는 X-RateLimit-Remaining이 0일 때
+    X-RateLimit-Reset(남은 초 또는 epoch 초). 여러 스레드가 동시에 깨어나지 않도록 0~10% 지터를 더한다.
+    """
+    h = resp.headers
+    wait: Optional[float] = None
+    if h.get("Retry-After"):
+        try:
+            wait = float(h["Retry-After"])
+        except ValueError:
+            try:
+                wait = (parsedate_to_datetime(h["Retry-After"]) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                wait = None
+    elif h.get("X-RateLimit-Remaining") == "0" and h.get("X-RateLimit-Reset"):
+        try:
+            reset = float(h["X-RateLimit-Reset"])
+            wait = reset - time.time() if reset > 1e9 else reset
+        except ValueError:
+            wait = None
+    if wait is None:
+        return None
+    wait = min(max(wait, 0.0), BACKOFF_MAX)
+    return wait * random.uniform(1.0, 1.1)
+
+
 def _throttled_get(session: requests.Session, path: str, params: Optional[dict] = None) -> requests.Response:
-    """레이트리밋(100/10s) 대응: 최소 요청 간격 확보 + 429 백오프."""
+    """
+    레이트리밋(100/10s) 대응 GET. 공유 토큰 버킷(LIMITER)에서 토큰을 받아 요청한다.
+    - 429: 서버 대기 헤더(_server_wait), 없으면 10초 기준 지터 백오프만큼 전체 정지 + 속도 감속(AIMD)
+    - 5xx(RETRY_STATUS)·연결 오류·타임아웃: 지터 백오프 후 재시도
+    - 429와 5xx 재시도는 같은 한도를 쓴다: 요청당 MAX_RETRIES회, 동기화 전체 RETRY_BUDGET회까지
+      (넘으면 예외 — 서버가 계속 429를 돌려줘도 무한히 기다리지 않는다)
+    - 성공하면 LIMITER.success()로 속도를 조금씩 회복, 남은 호출 수가 0이라고 알려오면 리셋까지 정지
+    """
     url = f"{BASE_URL}{path}"
+    endpoint = _endpoint(path)
+    attempt = throttled = 0
     while True:
-        resp = session.get(url, params=params, timeout=30)
-        if resp.status_code == 429:
-            time.sleep(10)
+        LIMITER.acquire()
+        t0 = time.perf_counter()
+        try:
+            resp = session.get(url, params=params, timeout=30)
+            error: Optional[Exception] = None
+        except (requests.ConnectionError, requests.Timeout) as e:
+            resp, error = None, e
+        STATS.request(endpoint, time.perf_counter() - t0)
+
+        if resp is not None and resp.status_code == 429:
+            throttled += 1
+            STATS.count(endpoint, "throttled")
+            if attempt + throttled > MAX_RETRIES or not STATS.take_retry():
+                STATS.count(endpoint, "errors")
+                resp.raise_for_status()
+            LIMITER.throttled(_server_wait(resp) or _backoff(throttled, 10.0))
+            continue
+        if error is not None or resp.status_code in RETRY_STATUS:
+            attempt += 1
+            if attempt + throttled > MAX_RETRIES or not STATS.take_retry():
+                STATS.count(endpoint, "errors")
+                if error is not None:
+                    raise error
+                resp.raise_for_status()
+            STATS.count(endpoint, "retries")
+            time.sleep(_backoff(attempt, BACKOFF_BASE))
             continue
+        if not resp.ok:
+            STATS.count(endpoint, "errors")
         resp.raise_for_status()
-        time.sleep(0.12)  # ~8.3req/s
+        LIMITER.success()
+        wait = _server_wait(resp)
+        if wait:
+            LIMITER.pause(wait)
         return resp
 
 
-def _fetch_list(session: requests.Session, path: str, list_key: str) -> List[dict]:
+def _fetch_list(
+    session: requests.Session,
+    path: str,
+    list_key: str,
+    params: Optional[dict] = None,
+    stop: Optional[Callable[[List[dict]], bool]] = None,
+    on_page: Optional[Callable[[int, List[dict]], None]] = None,
+) -> Tuple[List[dict], int]:
+    """
+    cursor 루프 → (항목, 페이지 수). stop(batch)가 True면 다음 페이지를 받지 않는다.
+    on_page(쪽 번호, batch)를 주면 쪽마다 넘기고 항목은 모으지 않는다 (스테이징용).
+    """
     items: List[dict] = []
     cursor: Optional[str] = None
+    pages = 0
     while True:
-        params = {"cursor": cursor} if cursor else None
-        resp = _throttled_get(session, path, params=params)
+        p = dict(params or {})
+        if cursor:
+            p["cursor"] = cursor
+        resp = _throttled_get(session, path, params=p or None)
+        pages += 1
         data = resp.json().get("data", {})
         batch = data.get(list_key, [])
-        if batch:
+        if on_page:
+            on_page(pages, batch)
+        elif batch:
             items.extend(batch)
         cursor = data.get("nextCursor")
-        if not cursor:
+        if not cursor or (stop and batch and stop(batch)):
             break
-    return items
-
-
-def _fetch_webform_submissions(session: requests.Session, webform_ids: List[str]) -> List[dict]:
-    submissions: List[dict] = []
-    for wf_id in webform_ids:
-        cursor: Optional[str] = None
-        path = f"/webForm/{wf_id}/submit"
-        while True:
-            params = {"cursor": cursor} if cursor else None
-            resp = _throttled_get(session, path, params=params)
-            data = resp.json().get("data", {})
-            batch = data.get("webFormSubmitList", [])
-            for item in batch:
-                item["webFormId"] = wf_id
-            if batch:
-                submissions.extend(batch)
-            cursor = data.get("nextCursor")
-            if not cursor:
-                break
-    return submissions
+    return items, pages
 
 
 # ─────────────────────────── 변환기
@@ -207,6 +447,31 @@ def _map_webform_submit(s: dict) -> dict:
     }
 
 
+# ─────────────────────────── 엔티티
+@dataclass(frozen=True)
+class Entity:
+    table: str
+    path: str
+    list_key: str
+    mapper: Callable[[dict], dict]
+    index_cols: List[str]
+    stamp: str = "updated_at"     # 워터마크로 쓰는 매핑 후 컬럼 (ISO UTC 문자열)
+    incremental: bool = True      # False면 매번 전체 목록을 받아 테이블 교체
+
+
+ENTITIES: List[Entity] = [
+    Entity("organizations", "/organization", "organizationList", _map_organization, ["id", "name"]),
+    Entity("people", "/people", "peopleList", _map_people, ["id", "organization_id", "name"]),
+    Entity("deals", "/deal", "dealList", _map_deal, ["id", "organization_id", "people_id", "status"]),
+    Entity("memos", "/memo", "memoList", _map_memo, ["id", "organization_id", "people_id", "deal_id"]),
+    # 웹폼 목록은 작고 제출 조회에 전체 id가 필요하므로 항상 전체
+    Entity("webforms", "/webForm", "webFormList", _map_webform, ["id", "status", "folder_name"], incremental=False),
+]
+# 제출은 웹폼별 목록 (path의 {id}), 수정 시각이 없어 created_at 기준
+SUBMISSIONS = Entity("webform_submissions", "/webForm/{id}/submit", "webFormSubmitList",
+                     _map_webform_submit, ["id", "webform_id"], stamp="created_at")
+
+
 # ─────────────────────────── DB 적재
 def _write_table(con: sqlite3.Connection, name: str, df: pd.DataFrame, index_cols: List[str]) -> None:
     df.to_sql(name, con, if_exists="replace", index=False)
@@ -217,39 +482,412 @@ def _write_table(con: sqlite3.Connection, name: str, df: pd.DataFrame, index_col
             continue
 
 
+def _has_table(con: sqlite3.Connection, name: str) -> bool:
+    return con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone() is not None
+
+
+def _upsert_table(con: sqlite3.Connection, name: str, df: pd.DataFrame, index_cols: List[str]) -> None:
+    """id 기준 upsert: 같은 id 행을 지우고 새 행을 추가 (테이블이 없으면 새로 만든다)."""
+    if df.empty:
+        return
+    if not _has_table(con, name):
+        _write_table(con, name, df, index_cols)
+        return
+    con.executemany(f'DELETE FROM "{name}" WHERE id = ?', [(i,) for i in df["id"].tolist()])
+    df.to_sql(name, con, if_exists="append", index=False)
+
+
 def write_db(payload: Dict[str, List[dict]]) -> Path:
     con = sqlite3.connect(DB_PATH)
     try:
-        _write_table(con, "organizations", pd.DataFrame(payload["organizations"]), ["id", "name"])
-        _write_table(con, "people", pd.DataFrame(payload["people"]), ["id", "organization_id", "name"])
-        _write_table(con, "deals", pd.DataFrame(payload["deals"]), ["id", "organization_id", "people_id", "status"])
-        _write_table(con, "memos", pd.DataFrame(payload["memos"]), ["id", "organization_id", "people_id", "deal_id"])
-        _write_table(con, "webforms", pd.DataFrame(payload["webforms"]), ["id", "status", "folder_name"])
-        _write_table(con, "webform_submissions", pd.DataFrame(payload["webform_submissions"]), ["id", "webform_id"])
+        for ent in [*ENTITIES, SUBMISSIONS]:
+            _write_table(con, ent.table, pd.DataFrame(payload[ent.table]), ent.index_cols)
         con.commit()
     finally:
         con.close()
     return DB_PATH
 
 
-def fetch_all() -> Path:
-    s = _session()
-    orgs_raw = _fetch_list(s, "/organization", "organizationList")
-    people_raw = _fetch_list(s, "/people", "peopleList")
-    deals_raw = _fetch_list(s, "/deal", "dealList")
-    memos_raw = _fetch_list(s, "/memo", "memoList")
-    webforms_raw = _fetch_list(s, "/webForm", "webFormList")
-    submissions_raw = _fetch_webform_submissions(s, [w.get("id") for w in webforms_raw if w.get("id")])
-
-    payload = {
-        "organizations": [_map_organization(o) for o in orgs_raw],
-        "people": [_map_people(p) for p in people_raw],
-        "deals": [_map_deal(d) for d in deals_raw],
-        "memos": [_map_memo(m) for m in memos_raw],
-        "webforms": [_map_webform(w) for w in webforms_raw],
-        "webform_submissions": [_map_webform_submit(s) for s in submissions_raw],
+# ─────────────────────────── 증분 동기화 상태
+# entity: 테이블명 (제출은 'webform_submissions:<웹폼 id>')
+# watermark: 지금까지 본 최대 stamp, order_desc: 목록이 stamp 내림차순이면 1 (워터마크 이전 페이지에서 중단 가능)
+# submit_count: 웹폼 제출 상태에서 마지막 동기화 때의 submitCount (같으면 다음 증분에서 건너뜀)
+STATE_SQL = """
+CREATE TABLE IF NOT EXISTS _sync_state (
+    entity       TEXT PRIMARY KEY,
+    watermark    TEXT,
+    order_desc   INTEGER,
+    full_at      TEXT,
+    synced_at    TEXT,
+    submit_count INTEGER
+)
+"""
+STATE_COLS = ["entity", "watermark", "order_desc", "full_at", "synced_at", "submit_count"]
+
+
+def _utcnow() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _read_state(con: sqlite3.Connection) -> Dict[str, dict]:
+    con.execute(STATE_SQL)
+    have = {row[1] for row in con.execute("PRAGMA table_info(_sync_state)")}
+    for col in STATE_COLS:
+        if col not in have:   # 예전 상태 테이블에 추가된 컬럼
+            con.execute(f"ALTER TABLE _sync_state ADD COLUMN {col}")
+    cur = con.execute(f"SELECT {', '.join(STATE_COLS)} FROM _sync_state")
+    return {row[0]: dict(zip(STATE_COLS, row)) for row in cur.fetchall()}
+
+
+def _write_state(con: sqlite3.Connection, state: Dict[str, dict]) -> None:
+    con.executemany(
+        f"INSERT OR REPLACE INTO _sync_state ({', '.join(STATE_COLS)}) "
+        f"VALUES ({', '.join('?' * len(STATE_COLS))})",
+        [tuple(st_.get(c) for c in STATE_COLS) for st_ in state.values()],
+    )
+
+
+def _needs_full(con: sqlite3.Connection, state: Dict[str, dict]) -> bool:
+    """테이블·상태가 없거나 마지막 전체 동기화가 FULL_RESYNC_DAYS보다 오래됐으면 전체."""
+    fulls = []
+    for ent in ENTITIES:
+        st_ = state.get(ent.table)
+        if ent.incremental and (st_ is None or not st_.get("full_at") or not _has_table(con, ent.table)):
+            return True
+        if ent.incremental:
+            fulls.append(datetime.fromisoformat(st_["full_at"]))
+    return bool(fulls) and datetime.now(timezone.utc) - min(fulls) > timedelta(days=FULL_RESYNC_DAYS)
+
+
+# ─────────────────────────── 스테이징 (중단 후 이어 받기)
+# 수집 중 매핑된 페이지와 끝난 체인(엔드포인트 / 웹폼 하나의 제출)의 상태를 페이지마다 커밋해 둔다.
+# cursor는 다음 실행에서 재사용할 수 없으므로 이어 받을 때는 저장된 쪽까지 목록을 다시 넘기되,
+# 항목 id가 같은 쪽은 매핑·기록을 건너뛰고 끝난 체인은 요청 자체를 하지 않는다.
+# salesmap.db에는 모든 체인이 끝난 뒤에만 반영하고, 반영이 끝나면 스테이징 파일을 지운다.
+# 마지막 쪽 기록 후 이 시간이 지나면 버린다. 하루 한 번(cron) 실행이라 실패 다음 날 실행이 이어 받도록
+# 아티팩트 보관 기간(retention-days: 2)에 맞춘다
+STAGE_MAX_AGE_HOURS = float(os.getenv("SALESMAP_STAGE_MAX_AGE_HOURS", "48"))
+
+# journal_mode=DELETE: 커밋한 쪽이 파일 하나에 모두 들어 있어야 그대로 아티팩트로 올려 이어 받을 수 있다
+STAGE_SQL = """
+PRAGMA journal_mode=DELETE;
+PRAGMA synchronous=NORMAL;
+CREATE TABLE IF NOT EXISTS _stage_meta   (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS _stage_pages  (chain TEXT, page INTEGER, ids TEXT, rows_json TEXT,
+                                          PRIMARY KEY (chain, page));
+CREATE TABLE IF NOT EXISTS _stage_chains (chain TEXT PRIMARY KEY, state_json TEXT);
+"""
+
+
+def stage_path() -> Path:
+    """스테이징 SQLite 경로: SALESMAP_STAGE_PATH, 없으면 DB_PATH 옆 <이름>.stage.db"""
+    env = os.getenv("SALESMAP_STAGE_PATH")
+    return Path(env) if env else DB_PATH.with_name(f"{DB_PATH.stem}.stage.db")
+
+
+def _page_ids(batch: List[dict]) -> str:
+    return hashlib.sha1("\x1f".join(str(item.get("id")) for item in batch).encode()).hexdigest()
+
+
+class Stage:
+    """
+    스테이징 SQLite (스레드 공유 연결, 쓰기는 잠금으로 직렬화).
+    run_key(모드 + 시작 시 _sync_state)가 같고 마지막 기록(updated_at)이 STAGE_MAX_AGE_HOURS 안이면
+    이어 받고, 아니면 비우고 새로 시작.
+    """
+
+    def __init__(self, path: Path, run_key: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.con = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.con.executescript(STAGE_SQL)
+        meta = dict(self.con.execute("SELECT key, value FROM _stage_meta").fetchall())
+        touched = meta.get("updated_at") or meta.get("created_at")
+        fresh = touched and datetime.now(timezone.utc) - datetime.fromisoformat(touched) \
+            < timedelta(hours=STAGE_MAX_AGE_HOURS)
+        self.resumed = bool(meta.get("run_key") == run_key and fresh)
+        if not self.resumed:
+            self.con.executescript("DELETE FROM _stage_pages; DELETE FROM _stage_chains; DELETE FROM _stage_meta;")
+            now = _utcnow()
+            self.con.executemany("INSERT INTO _stage_meta VALUES (?, ?)",
+                                 [("run_key", run_key), ("created_at", now), ("updated_at", now)])
+
+    def _touch(self) -> None:
+        """마지막 기록 시각 (잠금 안에서 호출). 이어 받기 가능 기간은 여기서부터 센다."""
+        self.con.execute("INSERT OR REPLACE INTO _stage_meta VALUES ('updated_at', ?)", (_utcnow(),))
+
+    def summary(self) -> Tuple[int, int]:
+        """(끝난 체인 수, 저장된 쪽 수)"""
+        with self._lock:
+            chains = self.con.execute("SELECT COUNT(*) FROM _stage_chains").fetchone()[0]
+            pages = self.con.execute("SELECT COUNT(*) FROM _stage_pages").fetchone()[0]
+        return chains, pages
+
+    def done(self, chain: str) -> Optional[dict]:
+        with self._lock:
+            row = self.con.execute("SELECT state_json FROM _stage_chains WHERE chain = ?", (chain,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def page_ids(self, chain: str) -> Dict[int, str]:
+        with self._lock:
+            return dict(self.con.execute("SELECT page, ids FROM _stage_pages WHERE chain = ?", (chain,)).fetchall())
+
+    def put_page(self, chain: str, page: int, ids: str, rows: List[dict]) -> None:
+        data = json.dumps(rows, ensure_ascii=False)
+        with self._lock:
+            self.con.execute("BEGIN")
+            self.con.execute("INSERT OR REPLACE INTO _stage_pages VALUES (?, ?, ?, ?)", (chain, page, ids, data))
+            self._touch()
+            self.con.execute("COMMIT")
+
+    def finish(self, chain: str, pages: int, state: dict) -> None:
+        """체인 완료: 이번에 받은 쪽 수보다 뒤의 (이전 실행에서 남은) 쪽을 지우고 상태 기록."""
+        with self._lock:
+            self.con.execute("BEGIN")
+            self.con.execute("DELETE FROM _stage_pages WHERE chain = ? AND page > ?", (chain, pages))
+            self.con.execute("INSERT OR REPLACE INTO _stage_chains VALUES (?, ?)", (chain, json.dumps(state)))
+            self._touch()
+            self.con.execute("COMMIT")
+
+    def rows(self, chain: str, pages: Optional[int] = None) -> List[dict]:
+        """저장된 행 (쪽 순서). pages를 주면 그 쪽까지만 — 이전 실행에서 남은 뒤쪽은 finish 전에도 제외."""
+        sql, args = "SELECT rows_json FROM _stage_pages WHERE chain = ?", [chain]
+        if pages is not None:
+            sql, args = sql + " AND page <= ?", args + [pages]
+        with self._lock:
+            cur = self.con.execute(sql + " ORDER BY page", args)
+            return [row for (data,) in cur.fetchall() for row in json.loads(data)]
+
+    def close(self, remove: bool = False) -> None:
+        self.con.close()
+        if remove:
+            for suffix in ("", "-journal"):
+                Path(f"{self.path}{suffix}").unlink(missing_ok=True)
+
+
+def _run_key(full: bool, state: Dict[str, dict]) -> str:
+    return hashlib.sha256(json.dumps([full, state], sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _is_desc(stamps: List[str]) -> bool:
+    return len(stamps) > 1 and all(a >= b for a, b in zip(stamps, stamps[1:]))
+
+
+def _sync_entity(
+    session: requests.Session,
+    ent: Entity,
+    key: str,
+    state: Dict[str, dict],
+    full: bool,
+    path: Optional[str] = None,
+    extra: Optional[dict] = None,
+    stage: Optional[Stage] = None,
+) -> Tuple[List[dict], dict, int]:
+    """
+    한 엔티티(또는 웹폼 하나의 제출) 동기화 → (기록할 행, 새 상태, 페이지 수)
+    - 전체: 모든 페이지, 목록이 stamp 내림차순인지 기록
+    - 증분: 내림차순 목록이면 워터마크보다 오래된 행이 나온 페이지에서 중단,
+            아니면 전체 목록을 받고 워터마크 이후(stamp >= 워터마크, stamp 없는 행 포함)만 남김
+    - stage: 쪽마다 매핑 결과를 커밋. 이전 실행에서 끝난 체인이면 요청 없이 저장된 행·상태를 쓰고,
+             저장된 쪽과 항목 id가 같은 쪽은 다시 매핑하지 않는다
+    """
+    finished = stage.done(key) if stage else None
+    prev = state.get(key) or {}
+    mark = None if full or not ent.incremental else prev.get("watermark")
+    desc = bool(prev.get("order_desc"))
+
+    def stamp(item: dict) -> Optional[str]:
+        return ent.mapper({**item, **(extra or {})}).get(ent.stamp)
+
+    def older(batch: List[dict]) -> bool:
+        return any(s is not None and s < mark for s in map(stamp, batch))
+
+    params = {SINCE_PARAM: mark} if SINCE_PARAM and mark else None
+    pages = 0
+    if stage is None:
+        raw, pages = _fetch_list(session, path or ent.path, ent.list_key, params=params,
+                                 stop=older if mark and desc else None)
+        rows = [ent.mapper({**item, **(extra or {})}) for item in raw]
+    else:
+        if finished is None:
+            staged = stage.page_ids(key)
+
+            def put(page: int, batch: List[dict]) -> None:
+                ids = _page_ids(batch)
+                if staged.get(page) != ids:
+                    stage.put_page(key, page, ids, [ent.mapper({**item, **(extra or {})}) for item in batch])
+
+            _, pages = _fetch_list(session, path or ent.path, ent.list_key, params=params,
+                                   stop=older if mark and desc else None, on_page=put)
+        rows = stage.rows(key, pages if finished is None else None)
+    stamps = [r[ent.stamp] for r in rows if r.get(ent.stamp)]
+    if mark:
+        rows = [r for r in rows if not r.get(ent.stamp) or r[ent.stamp] >= mark]
+        if len(stamps) > 1:
+            desc = desc and _is_desc(stamps)   # 순서가 깨지면 이후엔 중단하지 않음
+    else:
+        desc = _is_desc(stamps)
+    now = _utcnow()
+    new = {
+        "entity": key,
+        "watermark": max([*stamps, *([mark] if mark else [])], default=prev.get("watermark")),
+        "order_desc": int(desc),
+        "full_at": now if full or not ent.incremental else prev.get("full_at"),   # 테이블을 통째로 바꾼 때만
+        "synced_at": now,
     }
-    return write_db(payload)
+    if stage is not None:
+        if finished is not None:
+            new = finished
+        else:
+            stage.finish(key, pages, new)
+    return rows, new, pages
+
+
+def _sync_form(wf: dict, state: Dict[str, dict], full: bool,
+               stage: Optional[Stage] = None) -> Tuple[List[dict], dict, int]:
+    """웹폼 하나의 제출 동기화 (현재 스레드의 세션 사용) → (행, 새 상태, 페이지 수)."""
+    key = f"{SUBMISSIONS.table}:{wf['id']}"
+    rows, new, pages = _sync_entity(
+        _thread_session(), SUBMISSIONS, key, state, full,
+        path=SUBMISSIONS.path.format(id=wf["id"]), extra={"webFormId": wf["id"]}, stage=stage,
+    )
+    new["submit_count"] = wf.get("submit_count")
+    return rows, new, pages
+
+
+def _sync_submissions(
+    webforms: List[dict],
+    state: Dict[str, dict],
+    full: bool,
+    stage: Optional[Stage] = None,
+) -> Tuple[List[dict], Dict[str, dict], int]:
+    """
+    웹폼별 제출 동기화 → (행, 웹폼별 새 상태, 페이지 수)
+    - 증분에서는 submitCount가 지난 동기화 때와 같은 웹폼을 요청 없이 건너뜀 (상태 유지)
+    - 나머지 웹폼은 SUBMIT_WORKERS개 스레드에서 동시에 (요청 속도는 공유 LIMITER), 끝날 때마다 진행 로그
+    """
+    rows: List[dict] = []
+    states: Dict[str, dict] = {}
+    pages = 0
+    todo: List[dict] = []
+    for wf in webforms:
+        if not wf.get("id"):
+            continue
+        prev = state.get(f"{SUBMISSIONS.table}:{wf['id']}")
+        count = wf.get("submit_count")
+        if not full and prev and count is not None and prev.get("submit_count") == count:
+            states[prev["entity"]] = prev
+        else:
+            todo.append(wf)
+    if states:
+        _log(f"[INFO] {SUBMISSIONS.table}: submitCount 그대로인 웹폼 {len(states)}개 건너뜀")
+
+    def done(i: int, wf: dict, result: Tuple[List[dict], dict, int]) -> None:
+        nonlocal pages
+        batch, new, n = result
+        rows.extend(batch)
+        states[new["entity"]] = new
+        pages += n
+        name = f" ({wf['name']})" if wf.get("name") else ""
+        _log(f"[INFO] 제출 {i}/{len(todo)} {wf['id']}{name}: {len(batch):,}행 ({n}쪽)")
+
+    if SUBMIT_WORKERS > 1 and len(todo) > 1:
+        with ThreadPoolExecutor(max_workers=SUBMIT_WORKERS, thread_name_prefix="salesmap-submit") as pool:
+            futs = {pool.submit(_sync_form, wf, state, full, stage): wf for wf in todo}
+            for i, fut in enumerate(as_completed(futs), 1):
+                done(i, futs[fut], fut.result())
+    else:
+        for i, wf in enumerate(todo, 1):
+            done(i, wf, _sync_form(wf, state, full, stage))
+    return rows, states, pages
+
+
+def _log(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def _report(mode: str, secs: float) -> None:
+    """수집 지표를 stderr에 남기고 LAST_RUN에 보관 (중간에 실패한 실행도)."""
+    endpoints = STATS.summary()
+    LAST_RUN.clear()
+    LAST_RUN.update({"mode": mode, "secs": round(secs, 2), "rate": round(LIMITER.rate, 2),
+                     "retry_budget_left": STATS.budget_left, "endpoints": endpoints})
+    _log(f"[INFO] 수집 {secs:.1f}s ({mode}, 동시 {max(1, FETCH_WORKERS)}/{max(1, SUBMIT_WORKERS)}, "
+         f"{RATE_LIMIT}회/{RATE_WINDOW:g}s, 종료 속도 {LIMITER.rate:.1f}회/s, "
+         f"재시도 예산 {STATS.budget_left}/{STATS.budget})")
+    for endpoint, m in endpoints.items():
+        _log(f"[INFO]   {endpoint}: 요청 {m['requests']}, 재시도 {m['retries']}, 429 {m['throttled']}, "
+             f"실패 {m['errors']}, 지연 p50/p90/p99 {m['p50_ms']}/{m['p90_ms']}/{m['p99_ms']}ms")
+
+
+def fetch_all(full: Optional[bool] = None) -> Path:
+    """
+    Salesmap → DB_PATH 동기화.
+    full=None: DB/상태가 없거나 마지막 전체 동기화가 FULL_RESYNC_DAYS보다 오래됐으면 전체, 아니면 증분.
+    전체는 테이블을 교체(삭제된 레코드 정리), 증분은 바뀐 행만 id 기준 upsert.
+    상태(_sync_state)는 데이터를 모두 기록한 뒤에 갱신하므로 중간에 실패하면 다음 실행이 같은 워터마크에서 다시 받는다.
+    엔드포인트별 cursor 체인은 FETCH_WORKERS개 스레드에서 동시에 돌고(스레드마다 세션), 요청 속도는
+    공유 토큰 버킷(LIMITER)이 레이트리밋 안으로 맞춘다. 제출은 웹폼 목록이 오면 웹폼별로 동시에 받는다(_sync_submissions).
+    끝나면(실패해도) 엔드포인트별 요청·재시도·429·지연 분위수를 로그로 남기고 LAST_RUN에 보관.
+    받은 쪽은 스테이징 SQLite(stage_path())에 바로 커밋되므로, 중간에 죽으면 다음 실행이 이어 받는다.
+    salesmap.db 반영은 모든 체인이 끝난 뒤, 반영을 커밋하면 스테이징 파일을 지운다.
+    """
+    con = sqlite3.connect(DB_PATH)
+    stage: Optional[Stage] = None
+    try:
+        state = _read_state(con)
+        if full is None:
+            full = _needs_full(con, state)
+        mode = "전체" if full else "증분"
+        stage = Stage(stage_path(), _run_key(full, state))
+        if stage.resumed:
+            chains, pages = stage.summary()
+            _log(f"[INFO] 스테이징 이어 받기: 끝난 체인 {chains}개, 저장된 쪽 {pages}개 ({stage.path})")
+        STATS.reset(RETRY_BUDGET)
+        t0 = time.perf_counter()
+        try:
+            if FETCH_WORKERS > 1:
+                with ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="salesmap-fetch") as pool:
+                    futs = {ent.table: pool.submit(_sync_entity, _session(), ent, ent.table, state, full,
+                                                   stage=stage)
+                            for ent in ENTITIES}
+                    subs = _sync_submissions(futs["webforms"].result()[0], state, full, stage)
+                    results = {table: f.result() for table, f in futs.items()}
+            else:
+                s = _session()
+                results = {ent.table: _sync_entity(s, ent, ent.table, state, full, stage=stage)
+                           for ent in ENTITIES}
+                subs = _sync_submissions(results["webforms"][0], state, full, stage)
+        finally:
+            _report(mode, time.perf_counter() - t0)
+
+        new_state: Dict[str, dict] = {}
+        rows: Dict[str, List[dict]] = {}
+        for table, (table_rows, table_state, pages) in results.items():
+            rows[table], new_state[table] = table_rows, table_state
+            _log(f"[INFO] {table}: {len(rows[table]):,}행 ({mode}, {pages}쪽)")
+        rows[SUBMISSIONS.table], sub_state, sub_pages = subs
+        new_state.update(sub_state)
+        _log(f"[INFO] {SUBMISSIONS.table}: {len(rows[SUBMISSIONS.table]):,}행 ({mode}, {sub_pages}쪽)")
+
+        for ent in [*ENTITIES, SUBMISSIONS]:
+            df = pd.DataFrame(rows[ent.table])
+            if full or not ent.incremental:
+                _write_table(con, ent.table, df, ent.index_cols)
+            else:
+                _upsert_table(con, ent.table, df, ent.index_cols)
+        if full:
+            # 전체 동기화에서 사라진 웹폼의 제출 상태도 정리
+            con.execute("DELETE FROM _sync_state WHERE entity LIKE ?", (f"{SUBMISSIONS.table}:%",))
+        _write_state(con, new_state)
+        con.commit()
+        stage.close(remove=True)
+        stage = None
+    finally:
+        con.close()
+        if stage is not None:
+            stage.close()
+    return DB_PATH
 
 
 # ─────────────────────────── Freshness 관리
@@ -280,6 +918,14 @@ def ensure_fresh_db(max_age_hours: int = 12, allow_fetch: Optional[bool] = None)
     return fetch_all()
 
 
-if __name__ == "__main__":
-    path = ensure_fresh_db()
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m salesmap_sync.fetch_salesmap")
+    ap.add_argument("--full", action="store_true", help="워터마크를 무시하고 전체 재동기화 (삭제분 정리)")
+    args = ap.parse_args(argv)
+    path = fetch_all(full=True if args.full else None)
     print(f"✅ salesmap synced -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
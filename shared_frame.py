@@ -0,0 +1,115 @@
+# shared_frame.py
+"""
+프로세스 공유 읽기 전용 DataFrame
+────────────────────────────────────────
+· st.cache_data는 호출마다 결과를 역직렬화한 사본을 돌려준다 → 큰 프레임은 세션·호출 수만큼 복사
+· share(df)로 만든 SharedFrame 하나를 st.cache_resource에 두고 모든 세션이 같은 객체를 읽는다
+· 제자리 변경(df[c] = …, .loc/.iloc/.at 대입, inplace=True, del, columns/index 교체)은
+  SharedFrameMutationError, 하부 numpy 버퍼는 writeable=False → 뷰를 통한 쓰기도 ValueError
+  (pandas 3 / copy-on-write 환경에서는 파생 Series·슬라이스 쓰기가 사본으로 분리된다)
+· 필터·groupby·merge·copy() 등 파생 결과는 일반 pd.DataFrame → 그대로 수정 가능
+· 사용 법:   sdf = share(df)
+             mine = sdf[sdf["생성년도"] == 2025].copy()   # 수정이 필요하면 사본으로
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+class SharedFrameMutationError(TypeError):
+    """공유 프레임을 제자리에서 바꾸려 할 때."""
+
+
+def _deny(*_args, **_kwargs):
+    raise SharedFrameMutationError(
+        "공유(읽기 전용) 프레임은 수정할 수 없습니다. .copy() 후 수정하세요.")
+
+
+class _ReadOnlyIndexer:
+    """.loc/.iloc/.at/.iat 래퍼: 조회는 그대로, 대입은 거부."""
+    __slots__ = ("_inner",)
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getitem__(self, key):
+        return self._inner[key]
+
+    __setitem__ = _deny
+
+    def __call__(self, *args, **kwargs):   # df.loc(axis=…) 형태
+        return _ReadOnlyIndexer(self._inner(*args, **kwargs))
+
+
+def _freeze_array(arr) -> None:
+    """컬럼 배열(numpy 또는 ExtensionArray)의 numpy 버퍼를 읽기 전용으로."""
+    if isinstance(arr, np.ndarray):
+        arr.flags.writeable = False
+        return
+    for name in ("_ndarray", "_data", "_mask", "_codes"):   # datetime / masked(Int64·boolean) / category
+        buf = getattr(arr, name, None)
+        if isinstance(buf, np.ndarray):
+            buf.flags.writeable = False
+
+
+class SharedFrame(pd.DataFrame):
+    """읽기 전용 DataFrame. 파생 연산 결과는 일반 pd.DataFrame으로 돌아온다."""
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    __setitem__ = __delitem__ = _deny
+    insert = pop = update = _deny
+    _update_inplace = _deny
+
+    loc = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.loc.fget(self)))
+    iloc = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.iloc.fget(self)))
+    at = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.at.fget(self)))
+    iat = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.iat.fget(self)))
+
+    def __setattr__(self, name, value):
+        # df.columns = … / df.index = … / df.컬럼 = … 거부 (내부 속성 '_…'은 통과)
+        if name in ("columns", "index") or (
+                not name.startswith("_") and name in getattr(self, "columns", ())):
+            _deny()
+        super().__setattr__(name, value)
+
+
+# inplace=True를 받는 메서드: 일부는 _update_inplace를 거치지 않고 직접 축을 바꾸므로 입구에서 막는다
+INPLACE_METHODS = [
+    "drop", "rename", "rename_axis", "fillna", "ffill", "bfill", "replace",
+    "sort_values", "sort_index", "reset_index", "set_index", "drop_duplicates",
+    "dropna", "where", "mask", "clip", "interpolate", "query", "eval",
+]
+
+
+def _no_inplace(name: str):
+    method = getattr(pd.DataFrame, name)
+
+    def wrapper(self, *args, **kwargs):
+        if kwargs.get("inplace"):
+            _deny()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in INPLACE_METHODS:
+    if hasattr(pd.DataFrame, _name):
+        setattr(SharedFrame, _name, _no_inplace(_name))
+
+
+def share(df: pd.DataFrame, copy: bool = True) -> SharedFrame:
+    """
+    df의 읽기 전용 공유본. 기본은 원본과 버퍼를 나누지 않도록 한 번 복사한 뒤 동결.
+    copy=False는 df를 다른 곳에서 더 쓰지 않을 때만 (원본 버퍼까지 읽기 전용이 된다).
+    """
+    out = SharedFrame(df.copy() if copy else df)
+    for arr in out._mgr.arrays:
+        _freeze_array(arr)
+    return out
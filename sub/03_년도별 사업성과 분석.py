@@ -50,10 +50,14 @@ def enrich_segments(df: pd.DataFrame) -> pd.DataFrame:
     retention_mask = online_mask & deal_type.str.contains("리텐션", na=False)
     out["온라인 리텐션"] = retention_mask
 
+    # 예전 SQLite 로더가 주던 표현(REAL 1.0/0.0)으로 맞춘 뒤 기존 매핑을 적용 → KPI 기준선 유지.
+    # 이 매핑은 1.0/0.0과 맞지 않아 지금까지 제외가 적용된 적이 없다. bool로 비교해 실제로 제외하면
+    # 2025 체결액이 168.6억 → 152.7억으로 바뀌므로, 그 규칙 변경은 페이지 담당 확인 후 별도로 (docs/pages.md)
     first_col = out.get("(온라인)최초 입과 여부")
     if first_col is not None:
         norm = (
-            first_col.astype(str)
+            pd.to_numeric(first_col, errors="coerce").astype("Float64")
+            .astype(str)
             .str.strip()
             .str.lower()
             .map({"true": True, "false": False, "1": True, "0": False})
@@ -14,9 +14,8 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 import altair as alt
-from datetime import datetime
-from zoneinfo import ZoneInfo
 from data import load_won_deal, load_all_deal
+from calendar_dim import calendar, day_pos, today_kst, week_window
 
 # ─────────────────────────── 기본 설정/상수
 st.set_page_config(page_title="사업부 운영 리소스 현황 (2025, 일간/주간)", layout="wide")
@@ -38,15 +37,11 @@ TEAMS = list(TEAM_RAW.keys())
 
 START = pd.Timestamp('2025-01-01')
 END   = pd.Timestamp('2025-12-31')
-DATE_INDEX = pd.date_range(START, END, freq='D', name='date')
-POS = pd.Series(np.arange(len(DATE_INDEX)), index=DATE_INDEX)
+DATE_INDEX = calendar().loc[START:END].index   # 공통 달력 차원의 일자 축 (name='date')
 
 # 한국 기준 오늘 & 금주(월~일)
-TODAY = pd.Timestamp(datetime.now(ZoneInfo('Asia/Seoul')).date())
-W0_START = TODAY - pd.Timedelta(days=TODAY.weekday())     # 이번 주 월요일
-WEEK_STARTS = [W0_START + pd.Timedelta(weeks=k) for k in range(-4, 5)]
-WEEK_ENDS   = [ws + pd.Timedelta(days=6) for ws in WEEK_STARTS]
-WEEK_LABELS = [f"{ws:%Y-%m-%d} ~ {we:%m-%d}" for ws, we in zip(WEEK_STARTS, WEEK_ENDS)]
+TODAY = today_kst()
+WEEK_STARTS, WEEK_ENDS, WEEK_LABELS = week_window(4, 4, TODAY)
 
 # ─────────────────────────── 유틸
 def _to_number(s: pd.Series) -> pd.Series:
@@ -211,8 +206,8 @@ def _prepare_deals():
         return comp.str.upper()
     won['FB_key'] = _fallback_key(won)
 
-    won['s_idx'] = won['시작'].dt.normalize().map(POS).astype('Int64')
-    won['e_idx'] = won['종료'].dt.normalize().map(POS).astype('Int64')
+    won['s_idx'] = day_pos(won['시작'], START)
+    won['e_idx'] = day_pos(won['종료'], START)
     won_keep = won[['팀','담당자_name','시작','종료','s_idx','e_idx','weight','코스ID_key','FB_key']].copy()
 
     # ── ALL (확정 + 유효기간 + 수주예정액>0)
@@ -255,8 +250,8 @@ def _prepare_deals():
     ].copy()
 
     # 인덱스 매핑
-    alld_dedup['s_idx'] = alld_dedup['시작'].dt.normalize().map(POS).astype('Int64')
-    alld_dedup['e_idx'] = alld_dedup['종료'].dt.normalize().map(POS).astype('Int64')
+    alld_dedup['s_idx'] = day_pos(alld_dedup['시작'], START)
+    alld_dedup['e_idx'] = day_pos(alld_dedup['종료'], START)
 
     alld_keep = alld_dedup[['팀','담당자_name','시작','종료','s_idx','e_idx','weight']].copy()
     won_keep2 = won_keep[['팀','담당자_name','시작','종료','s_idx','e_idx','weight']].copy()
@@ -1,6 +1,6 @@
 # pages/6_개인별_체결률_추이.py
 import streamlit as st, pandas as pd, re
-from data import load_all_deal
+from data import load_all_deal, load_deal_cube
 
 # ────────── 조직 매핑 ──────────
 TEAM_RAW = {
@@ -36,6 +36,13 @@ df['팀'] = df['담당자_name'].map(NAME2TEAM).fillna('기타')
 df['월'] = df['생성월'].astype(str).str.zfill(2)
 MONTHS  = sorted(df['월'].unique())
 
+# 상태 표는 적재 시 만든 집계 큐브에서 (팀은 이 페이지의 TEAM_RAW 기준이라 담당자로 거른다)
+CUBE_COLS = ['생성년도','생성월','담당자_name','기업 규모','딜 전환 유형','성사 가능성']
+cube = load_deal_cube(columns=CUBE_COLS, shared=True)
+cube = cube[cube['생성년도'] >= 2025].copy()
+cube['deals'] = cube['deals'].astype('int64')
+cube['월'] = cube['생성월'].astype(str).str.zfill(2)
+
 # ────────── Sidebar ──────────
 st.sidebar.header("개인별 체결률 추이")
 sel_team   = st.sidebar.selectbox("팀", TEAM_LIST)
@@ -45,15 +52,19 @@ sel_person = st.sidebar.selectbox("개인", ["전체"] + persons)
 df_team   = df[df['팀'] == sel_team]
 df_target = df_team if sel_person == "전체" else df_team[df_team['담당자_name'] == sel_person]
 
+owners      = [n for n, t in NAME2TEAM.items() if t == sel_team] if sel_person == "전체" else [sel_person]
+cube_target = cube[cube['담당자_name'].isin(owners)]
+
 # ────────── helper ──────────
-def status_table(data: pd.DataFrame) -> pd.DataFrame:
-    ct = data.groupby(['월','성사 가능성']).size().unstack(fill_value=0)
+def status_table(cb: pd.DataFrame) -> pd.DataFrame:
+    """cb: 큐브 행 (월, 성사 가능성, deals)"""
+    ct = cb.groupby(['월','성사 가능성'])['deals'].sum().unstack(fill_value=0)
     for col in ['확정','높음','낮음','LOST']:
         if col not in ct.columns:
             ct[col] = 0
     ct['미기재'] = (
-        data[data['성사 가능성'].isna() | (data['성사 가능성'] == '')]
-          .groupby('월').size()
+        cb[cb['성사 가능성'].isna() | (cb['성사 가능성'] == '')]
+          .groupby('월')['deals'].sum()
           .reindex(ct.index, fill_value=0)
     )
     ct['합계']   = ct[['확정','높음','낮음','LOST','미기재']].sum(axis=1)
@@ -97,13 +108,14 @@ for size in SIZE_ORDER:
     g_size = df_target[df_target['기업 규모'].fillna('미기재') == size]
     if g_size.empty:
         continue
+    c_size = cube_target[cube_target['기업 규모'].fillna('미기재') == size]
     for dtype in TYPE_ORDER:
         g = g_size[g_size['딜 전환 유형'] == dtype]
         if g.empty:
             continue
 
         st.markdown(f"#### {size} / {dtype}")
-        st.dataframe(status_table(g), use_container_width=True)
+        st.dataframe(status_table(c_size[c_size['딜 전환 유형'] == dtype]), use_container_width=True)
 
         st.markdown("*상세 딜 목록*")
         st.dataframe(detail_table(g), use_container_width=True, hide_index=True)
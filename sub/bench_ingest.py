@@ -0,0 +1,134 @@
+# bench_ingest.py
+"""
+적재 벤치마크
+1) SQLite 기록 단계: 이전 방식(to_sql, 테이블별 commit) vs 대량 기록(_bulk_write, 한 트랜잭션)
+   저장소의 TXT 4종을 한 번 파싱·전처리해 두고, 임시 DB 파일에 각 방식으로 기록 + 인덱스 생성 시간을 잰다.
+2) --rss N: all deal.txt 본문을 N번 이어 붙인 합성 파일을 전체 적재 / 청크 적재로 각각
+   별도 프로세스에서 (스냅샷 + SQLite) 적재하고 최대 RSS를 비교한다.
+실행:  python sub/bench_ingest.py [반복 횟수=3]
+       python sub/bench_ingest.py --rss 100
+"""
+
+import pathlib
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import data_core as data  # noqa: E402  (streamlit 없이 적재 코어만)
+from data_core import ingest, snapshot  # noqa: E402
+
+
+def _indexes(con: sqlite3.Connection, tables) -> None:
+    for table in tables:
+        for ddl in data.INDEX_SQL.get(table, []):
+            try:
+                con.execute(ddl)
+            except sqlite3.OperationalError:
+                pass
+
+
+def write_to_sql(path: pathlib.Path, frames: dict) -> None:
+    con = sqlite3.connect(path)
+    try:
+        con.executescript(data.SCHEMA_SQL)
+        for table, df in frames.items():
+            df.to_sql(table, con, if_exists="replace", index=False)
+        _indexes(con, frames)
+        con.commit()
+    finally:
+        con.close()
+
+
+def write_bulk(path: pathlib.Path, frames: dict) -> None:
+    con = sqlite3.connect(path, isolation_level=None)
+    try:
+        con.executescript(data.SCHEMA_SQL + data.BULK_PRAGMAS)
+        con.execute("BEGIN")
+        for table, df in frames.items():
+            ingest._bulk_write(con, table, df)
+        _indexes(con, frames)
+        con.execute("COMMIT")
+        con.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        con.close()
+
+
+def bench(repeat: int = 3) -> dict:
+    frames = {t: ingest._transform(t, ingest._read_txt(p, t))[0] for t, p in data.FILES.items() if p.exists()}
+    best = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in (("to_sql", write_to_sql), ("bulk", write_bulk)):
+            for i in range(repeat):
+                path = pathlib.Path(tmp) / f"{name}-{i}.db"
+                t0 = time.perf_counter()
+                fn(path, frames)
+                best[name] = min(best.get(name, float("inf")), time.perf_counter() - t0)
+    return {"rows": sum(len(df) for df in frames.values()), **best}
+
+
+def _peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # Linux: KiB
+
+
+def make_synthetic(src: pathlib.Path, dst: pathlib.Path, times: int) -> None:
+    """헤더 1줄 + 본문 × times (본문 블록 단위로 붙이므로 따옴표 안 줄바꿈도 안전)."""
+    text = src.read_bytes()
+    header, body = text.split(b"\n", 1)
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    with open(dst, "wb") as f:
+        f.write(header + b"\n")
+        for _ in range(times):
+            f.write(body)
+
+
+def rss_child(mode: str, txt: str, tmp: str) -> None:
+    """별도 프로세스에서 한 가지 방식으로 all_deal 적재 후 '기준 최대 RSS, 적재 후 최대 RSS, 행 수, 초' 출력."""
+    snapshot.SNAPSHOT_DIR = pathlib.Path(tmp) / "snapshot"
+    base = _peak_mb()
+    con = sqlite3.connect(pathlib.Path(tmp) / f"{mode}.db", isolation_level=None)
+    con.executescript(data.SCHEMA_SQL + data.BULK_PRAGMAS)
+    con.execute("BEGIN")
+    t0 = time.perf_counter()
+    if mode == "chunk":
+        rows, _, _ = ingest._ingest_chunked("all_deal", pathlib.Path(txt), 1, snapshot.pa is not None, con)
+    else:
+        df, _, _ = ingest._ingest("all_deal", pathlib.Path(txt), 1, snapshot.pa is not None)
+        ingest._bulk_write(con, "all_deal", df)
+        rows = len(df)
+    con.execute("COMMIT")
+    con.close()
+    print(base, _peak_mb(), rows, time.perf_counter() - t0)
+
+
+def bench_rss(times: int) -> None:
+    src = data.FILES["all_deal"]
+    with tempfile.TemporaryDirectory() as tmp:
+        txt = pathlib.Path(tmp) / "all deal x.txt"
+        make_synthetic(src, txt, times)
+        print(f"synthetic: {src.name} x{times} = {txt.stat().st_size / 2**20:.0f} MB, "
+              f"chunk rows={data.INGEST_CHUNK_ROWS:,}")
+        for mode in ("full", "chunk"):
+            out = subprocess.run([sys.executable, __file__, "--rss-child", mode, str(txt), tmp],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            base, peak, rows, secs = float(out[0]), float(out[1]), int(out[2]), float(out[3])
+            print(f"{mode:<6}: rows={rows:,}  peak RSS {peak:,.0f} MB (+{peak - base:,.0f} MB over import)  {secs:.1f}s")
+
+
+if __name__ == "__main__":
+    if "--rss-child" in sys.argv:
+        i = sys.argv.index("--rss-child")
+        rss_child(*sys.argv[i + 1:i + 4])
+    elif "--rss" in sys.argv:
+        i = sys.argv.index("--rss")
+        bench_rss(int(sys.argv[i + 1]) if len(sys.argv) > i + 1 else 100)
+    else:
+        res = bench(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
+        print(f"rows={res['rows']:,}")
+        print(f"to_sql : {res['to_sql']:.3f}s")
+        print(f"bulk   : {res['bulk']:.3f}s  (x{res['to_sql'] / res['bulk']:.1f})")
@@ -0,0 +1,194 @@
+# bench_salesmap.py
+"""
+Salesmap 수집 벤치마크 (로컬 목 서버)
+· 목 서버: 엔드포인트별 cursor 페이지 + 요청당 지연(--latency) + 워크스페이스 레이트리밋(10초 100회 초과 시 429)
+· 세 가지 방식으로 전체 동기화(fetch_all(full=True))를 임시 DB에 돌려 벽시계 시간·최대 10초 요청 수·429 횟수를 비교
+  legacy      : 예전 방식 — 엔드포인트·웹폼 순차 + 요청마다 고정 0.12초 sleep
+  bucket x1   : 공유 토큰 버킷, 순차 (SALESMAP_FETCH_WORKERS=SALESMAP_SUBMIT_WORKERS=1)
+  bucket xN   : 공유 토큰 버킷, 엔드포인트·웹폼 제출 동시 (기본 FETCH_WORKERS / SUBMIT_WORKERS)
+  이어서 같은 DB로 증분 동기화 (submitCount가 그대로인 웹폼은 요청 없이 건너뜀)
+· --faults P: 요청의 P 비율을 503으로 응답 (재시도 예산 확인), --server-limit N: 서버 한도를 클라이언트
+  설정보다 낮게 (429 → AIMD 감속 확인). 마지막 실행의 엔드포인트별 지표(LAST_RUN)를 함께 출력
+실행:  python sub/bench_salesmap.py [--pages 30] [--webforms 8] [--latency 0.25] [--faults 0] [--server-limit N]
+"""
+
+import argparse
+import collections
+import json
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SALESMAP_TOKEN", "bench")
+
+import requests  # noqa: E402
+
+import salesmap_sync.fetch_salesmap as fs  # noqa: E402
+
+PAGE_SIZE = 50
+LIST_KEYS = {"/organization": "organizationList", "/people": "peopleList", "/deal": "dealList",
+             "/memo": "memoList", "/webForm": "webFormList"}
+
+
+def make_dataset(pages: int, webforms: int = 8) -> dict:
+    """엔드포인트 → 항목 목록. 딜·메모는 다른 목록보다 길게 (실제 비율에 가깝게)."""
+    stamp = "2025-01-01T00:00:00.000Z"
+    sizes = {"/organization": pages, "/people": pages, "/deal": pages * 4 // 3, "/memo": pages * 4 // 3}
+    data = {path: [{"id": f"{path[1]}{i}", "이름": f"{path[1:]}-{i}", "수정 날짜": stamp, "updatedAt": stamp}
+                   for i in range(n * PAGE_SIZE)] for path, n in sizes.items()}
+    data["/webForm"] = [{"id": f"w{i}", "name": f"form {i}", "submitCount": 2 * PAGE_SIZE, "updatedAt": stamp}
+                        for i in range(webforms)]
+    for i in range(webforms):
+        data[f"/webForm/w{i}/submit"] = [{"id": f"s{i}-{j}", "createdAt": stamp} for j in range(2 * PAGE_SIZE)]
+    return data
+
+
+class MockServer:
+    def __init__(self, data: dict, latency: float, limit: int, window: float, faults: float = 0.0):
+        self.data, self.latency, self.limit, self.window = data, latency, limit, window
+        self.faults = faults
+        self.lock = threading.Lock()
+        self.reset()
+        handler = self._handler()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/api/v2"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def reset(self) -> None:
+        self.recent = collections.deque()
+        self.requests = self.rejected = self.peak = self.failed = 0
+
+    def _admit(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] >= self.window:
+                self.recent.popleft()
+            self.requests += 1
+            if len(self.recent) >= self.limit:
+                self.rejected += 1
+                return False
+            self.recent.append(now)
+            self.peak = max(self.peak, len(self.recent))
+            return True
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                path = url.path.removeprefix("/api/v2")
+                if not server._admit():
+                    self._send(429, {"message": "rate limited"}, {"Retry-After": "10"})
+                    return
+                time.sleep(server.latency)
+                if random.random() < server.faults:
+                    server.failed += 1
+                    self._send(503, {"message": "unavailable"})
+                    return
+                items = server.data.get(path)
+                if items is None:
+                    self._send(404, {"message": "not found"})
+                    return
+                start = int(parse_qs(url.query).get("cursor", ["0"])[0])
+                end = start + PAGE_SIZE
+                key = LIST_KEYS.get(path, "webFormSubmitList")
+                self._send(200, {"data": {key: items[start:end],
+                                          "nextCursor": str(end) if end < len(items) else None}})
+
+            def _send(self, code, body, headers=None):
+                raw = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return Handler
+
+
+def legacy_get(session: requests.Session, path: str, params=None) -> requests.Response:
+    """예전 _throttled_get: 요청 후 고정 0.12초 sleep + 429면 10초 대기."""
+    while True:
+        resp = session.get(f"{fs.BASE_URL}{path}", params=params, timeout=30)
+        if resp.status_code == 429:
+            time.sleep(10)
+            continue
+        resp.raise_for_status()
+        time.sleep(0.12)
+        return resp
+
+
+def run(server: MockServer, db: pathlib.Path, workers: int, submit_workers: int,
+        legacy: bool = False, full: bool = True) -> dict:
+    server.reset()
+    fs.DB_PATH, fs.LIMITER = db, fs._bucket()
+    fs.FETCH_WORKERS, fs.SUBMIT_WORKERS = workers, submit_workers
+    original = fs._throttled_get
+    if legacy:
+        fs._throttled_get = legacy_get
+    error = None
+    t0 = time.perf_counter()
+    try:
+        fs.fetch_all(full=full)
+    except requests.RequestException as e:   # 예전 방식은 5xx 한 번에 동기화 전체가 실패
+        error = f"{type(e).__name__}: {e}"[:80]
+    finally:
+        fs._throttled_get = original
+    secs = time.perf_counter() - t0
+    time.sleep(server.window)   # 다음 방식이 빈 레이트리밋 구간에서 시작하도록
+    return {"secs": secs, "requests": server.requests, "peak": server.peak, "rejected": server.rejected,
+            "failed": server.failed, "error": error}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=30, help="조직/사람 목록 페이지 수 (딜·메모는 4/3배)")
+    ap.add_argument("--webforms", type=int, default=8, help="웹폼 수 (웹폼당 제출 2쪽)")
+    ap.add_argument("--latency", type=float, default=0.25, help="요청당 서버 지연(초)")
+    ap.add_argument("--faults", type=float, default=0.0, help="503으로 응답할 요청 비율")
+    ap.add_argument("--server-limit", type=int, default=fs.RATE_LIMIT, help="목 서버의 10초당 허용 요청 수")
+    args = ap.parse_args()
+
+    server = MockServer(make_dataset(args.pages, args.webforms), args.latency, args.server_limit, fs.RATE_WINDOW,
+                        args.faults)
+    fs.BASE_URL = server.url
+    print(f"mock: {sum(-(-len(v) // PAGE_SIZE) for v in server.data.values())} pages, "
+          f"latency {args.latency * 1000:.0f}ms, limit {args.server_limit}/{fs.RATE_WINDOW:g}s "
+          f"(bucket burst {fs.LIMITER.capacity}, {fs.LIMITER.rate:.1f}/s)")
+    workers, submit_workers = max(2, fs.FETCH_WORKERS), max(2, fs.SUBMIT_WORKERS)
+    with tempfile.TemporaryDirectory() as tmp:
+        par = pathlib.Path(tmp) / "par.db"
+        results = [
+            ("legacy", run(server, pathlib.Path(tmp) / "legacy.db", 1, 1, legacy=True)),
+            ("bucket x1", run(server, pathlib.Path(tmp) / "seq.db", 1, 1)),
+            (f"bucket x{workers}/{submit_workers}", run(server, par, workers, submit_workers)),
+            ("incremental", run(server, par, workers, submit_workers, full=False)),
+        ]
+    base = None if results[0][1]["error"] else results[0][1]["secs"]
+    for name, r in results:
+        speedup = f"x{base / r['secs']:.2f}" if base else "-"
+        print(f"{name:<12}: {r['secs']:6.1f}s  ({speedup})  requests={r['requests']}  "
+              f"peak/{fs.RATE_WINDOW:g}s={r['peak']}  429={r['rejected']}  503={r['failed']}"
+              + (f"  FAILED ({r['error']})" if r["error"] else ""))
+    print(f"\nlast run ({fs.LAST_RUN['mode']}): rate {fs.LAST_RUN['rate']}/s, "
+          f"retry budget left {fs.LAST_RUN['retry_budget_left']}/{fs.RETRY_BUDGET}")
+    for endpoint, m in fs.LAST_RUN["endpoints"].items():
+        print(f"  {endpoint:<22} {m}")
+
+
+if __name__ == "__main__":
+    main()
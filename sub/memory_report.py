@@ -0,0 +1,24 @@
+# memory_report.py
+"""
+로더 결과의 메모리 사용량 비교: 기본 dtype vs compact=True (category / Arrow 문자열)
+실행:  python sub/memory_report.py            # 테이블별 요약
+       python sub/memory_report.py --columns  # all_deal 컬럼별 상세
+"""
+
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+from data_core import memory_report  # noqa: E402
+
+if __name__ == "__main__":
+    pd.set_option("display.width", 160)
+    if "--columns" in sys.argv:
+        rep = memory_report(["all_deal"], by_column=True)
+        print(rep.sort_values("before_mb", ascending=False).to_string(index=False))
+    else:
+        rep = memory_report()
+        print(rep.to_string(index=False))
+        print(f"\n합계: {rep['before_mb'].sum():.2f} MB → {rep['after_mb'].sum():.2f} MB")
@@ -1,53 +1,18 @@
 # prepare_db.py
 """
-매일 all deal / won deal / retention txt 파일을 갱신한 뒤
-이 스크립트를 실행하면 SQLite DB(deals.db)를 항상 최신 상태로 재생성한다.
+매일 all deal / won deal / retention / accounting txt 파일을 갱신한 뒤 실행하면
+앱과 같은 적재(data_core.load_to_db)로 deals.db + 스냅샷을 최신으로 맞추고 검증한다.
+(예전에는 별도 복사본 적재 코드였음 — accounting 전처리·인덱스가 빠져 있어 코어로 통일)
+실행:  python sub/prepare_db.py            # = python -m data_core prepare
+       python sub/prepare_db.py --check    # 적재 없이 검증만
 """
 
-import pandas as pd
-import sqlite3
 import pathlib
 import sys
 
-BASE = pathlib.Path(__file__).parent
-FILES = {
-    "all_deal":  BASE / "all deal.txt",
-    "won_deal":  BASE / "won deal.txt",
-    "retention": BASE / "retention corp.txt",
-}
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
-SCHEMA_SQL = """
-PRAGMA journal_mode=WAL;
-PRAGMA synchronous=NORMAL;
-
-/* 인덱스 재생성 */
-DROP INDEX IF EXISTS idx_all_deal_name;
-DROP INDEX IF EXISTS idx_won_deal_name;
-
-CREATE INDEX idx_all_deal_name ON all_deal ("담당자_name");
-CREATE INDEX idx_won_deal_name ON won_deal ("담당자_name");
-"""
-
-def _read_txt(path: pathlib.Path) -> pd.DataFrame:
-    """UTF-8 탭 구분 txt → DataFrame, 빈 행 제거"""
-    return pd.read_csv(path, sep="\t").dropna(how="all")
-
-def load_to_db(db_path: str = "deals.db") -> None:
-    con = sqlite3.connect(db_path)
-    try:
-        for table, txt in FILES.items():
-            if not txt.exists():
-                sys.stderr.write(f"[WARN] {txt} not found – skip\n")
-                continue
-            df = _read_txt(txt)
-            df.to_sql(table, con, if_exists="replace", index=False)
-            print(f"[OK] {table} : {len(df):,} rows")
-
-        # 인덱스 및 PRAGMA 적용
-        con.executescript(SCHEMA_SQL)
-        con.commit()
-    finally:
-        con.close()
+import data_core  # noqa: E402
 
 if __name__ == "__main__":
-    load_to_db()
+    sys.exit(data_core.main(["prepare", *sys.argv[1:]]))